@@ -0,0 +1,91 @@
+class AbrPolicy:
+    """ 码率自适应策略基类（按接收方报告选择质量阶梯档位  0 为最高质量  基类保持档位不变）
+
+    report 为会话最近一次接收方报告的指标字典：
+    fraction_lost（报告间隔内丢包率 0-1）  jitter_ms  rtt_ms（可能为 None）  send_kbps（报告间隔内发送码率）
+    """
+
+    def __init__(self, bitrates):
+        """ 类构造方法（bitrates 为各档位平均码率  bit/s  从高到低） """
+        self.bitrates = bitrates
+
+    def decide(self, rung, report):
+        """ 返回下一档位 """
+        return rung
+
+
+class LossPolicy(AbrPolicy):
+    """ 丢包 / 抖动阈值策略（超过上限立即降一档  连续若干个报告低于下限才升一档）
+
+    升档后的第一个报告即需降档时  升档所需报告数加倍（最多 max_hold）  避免在容量介于两档之间时反复切换
+    """
+
+    def __init__(self, bitrates, down_loss=0.05, up_loss=0.01, max_jitter_ms=40.0, up_reports=2, max_hold=8):
+        """ 类构造方法 """
+        super(LossPolicy, self).__init__(bitrates)
+        self.down_loss = down_loss          # 降档丢包率
+        self.up_loss = up_loss              # 升档丢包率
+        self.max_jitter_ms = max_jitter_ms  # 降档抖动
+        self.up_reports = up_reports        # 升档所需连续良好报告数
+        self.max_hold = max_hold            # 升档所需报告数上限
+        self.hold = up_reports              # 当前升档所需连续良好报告数
+        self.good_reports = 0               # 连续良好报告数
+        self.raised = False                 # 上一个决定为升档
+
+    def decide(self, rung, report):
+        """ 返回下一档位 """
+        if report['fraction_lost'] > self.down_loss or report['jitter_ms'] > self.max_jitter_ms:
+            if self.raised:
+                self.hold = min(self.hold * 2, self.max_hold)
+            self.raised = False
+            self.good_reports = 0
+            return min(rung + 1, len(self.bitrates) - 1)
+        if self.raised:
+            # 升档后链路保持良好  恢复默认升档间隔
+            self.raised = False
+            self.hold = self.up_reports
+        if report['fraction_lost'] > self.up_loss:
+            self.good_reports = 0
+            return rung
+        self.good_reports += 1
+        if self.good_reports >= self.hold and rung > 0:
+            self.good_reports = 0
+            self.raised = True
+            return rung - 1
+        return rung
+
+
+class BandwidthPolicy(AbrPolicy):
+    """ 带宽估计策略（送达码率 = 发送码率 × (1 - 丢包率)  选择码率不超过估计值 × 余量的最高档位）
+
+    有丢包时估计值降为送达码率（链路已饱和）  无丢包时每个报告按 growth 放大以探测更高档位（且不降档）
+    """
+
+    def __init__(self, bitrates, margin=0.9, growth=1.1, loss_threshold=0.02):
+        """ 类构造方法 """
+        super(BandwidthPolicy, self).__init__(bitrates)
+        self.margin = margin                    # 码率余量
+        self.growth = growth                    # 无丢包时的探测增长率
+        self.loss_threshold = loss_threshold    # 判定链路饱和的丢包率
+        self.estimate = None                    # 带宽估计（bit/s）
+
+    def decide(self, rung, report):
+        """ 返回下一档位 """
+        goodput = report['send_kbps'] * 1000 * (1 - report['fraction_lost'])
+        congested = report['fraction_lost'] > self.loss_threshold
+        if congested:
+            self.estimate = goodput if self.estimate is None else min(self.estimate, goodput)
+        else:
+            self.estimate = max(self.estimate or 0, goodput) * self.growth
+        for index, bitrate in enumerate(self.bitrates):
+            if bitrate <= self.estimate * self.margin:
+                return index if congested else min(index, rung)
+        return len(self.bitrates) - 1 if congested else rung
+
+
+# 策略名称 -> 策略类（--abr 选择  可在此注册新的策略）
+ABR_POLICIES = {
+    'fixed': AbrPolicy,
+    'loss': LossPolicy,
+    'bandwidth': BandwidthPolicy,
+}
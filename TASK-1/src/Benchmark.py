@@ -0,0 +1,1298 @@
+import os
+import re
+import sys
+import random
+import getopt
+import socket
+import selectors
+import subprocess
+import threading
+import time
+import tracemalloc
+import tempfile
+import json
+import io
+
+import Server
+from FrameScheduler import FrameScheduler, JitterStats
+from FrameCache import FrameCache
+from MediaContainer import MediaContainer, ContainerWriter, CONTAINER_EXT, listFrames, pack
+from MediaSource import MediaSource
+from RtpPacket import RtpPacket, RTP_VERSION, PT_JPEG, FRAGMENT_HEADER_SIZE
+from RtpFragment import fragmentFrame, FrameAssembler
+from RtpBatch import BatchSender
+from MediaChannel import MediaChannel
+from RtspParser import RtspParser, RtspError, parseRange
+from RtspReply import rtspReply, headerLine
+import RtpReceiver
+from PortPool import PortPool, PortExhausted
+from SessionRegistry import SessionRegistry, makeSessionKey, MIN_SESSION_ID, MAX_SESSION_ID
+from Rtcp import isRtcp, ReceptionStats, buildReceiverReport, buildSenderReport, parseRtcp
+from QualityLadder import QualityLadder, ladderRungs, LADDER_RUNGS
+import Ingest
+from MediaCatalog import MediaCatalog, CatalogItem, CATALOG_EXT, build
+from AbrPolicy import ABR_POLICIES
+
+BENCH_SERVER_PORT = 19999
+
+
+def readProcessCpuTime(pid):
+    """ 读取进程累计 CPU 时间（秒，仅 Linux） """
+    with open('/proc/%d/stat' % pid) as file:
+        fields = file.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def readProcessTreeCpuTime(pid):
+    """ 读取进程及其子进程（多进程服务端的工作进程）累计 CPU 时间（秒，仅 Linux） """
+    total = readProcessCpuTime(pid)
+    try:
+        with open('/proc/%d/task/%d/children' % (pid, pid)) as file:
+            children = [int(child) for child in file.read().split()]
+    except OSError:
+        children = []
+    for child in children:
+        total += readProcessTreeCpuTime(child)
+    return total
+
+
+def countProcessFds(pid):
+    """ 统计进程打开的文件描述符数（仅 Linux） """
+    return len(os.listdir('/proc/%d/fd' % pid))
+
+
+def openSession(server_port, index, url=None, multicast=False):
+    """ 建立一个模拟客户端会话（SETUP + PLAY）  返回 (RTSP 套接字, RTP 套接字) """
+    url = url or 'movie-%d' % index
+    rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp_socket.bind(('127.0.0.1', 0))
+    rtp_socket.setblocking(False)
+    rtsp_socket = socket.create_connection(('127.0.0.1', server_port))
+    transport = 'RTP/UDP;multicast;client_port=%d' if multicast else 'RTP/UDP;client_port=%d'
+    request = 'SETUP %s RTSP/1.0\nCSeq: 1\nTransport: %s\n\n' % (url, transport % rtp_socket.getsockname()[1])
+    rtsp_socket.send(request.encode())
+    reply = rtsp_socket.recv(1024).decode('utf-8')
+    session_id = '0'
+    for line in reply.split('\n'):
+        if line.startswith('Session:'):
+            session_id = line.split(' ')[1]
+    rtsp_socket.send(('PLAY %s RTSP/1.0\nCSeq: 2\nSession: %s\n\n' % (url, session_id)).encode())
+    rtsp_socket.recv(1024)
+    return rtsp_socket, rtp_socket
+
+
+def drainSockets(selector, duration):
+    """ 持续接收全部 RTP 套接字上的数据  返回接收到的帧数（marker 位置位的数据包数  不含复用端口的 RTCP） """
+    received = 0
+    start = time.monotonic()
+    while time.monotonic() - start < duration:
+        for key, mask in selector.select(timeout=0.1):
+            while True:
+                try:
+                    data = key.fileobj.recv(65535)
+                except BlockingIOError:
+                    break
+                if len(data) > 1 and data[1] & 0x80 and not isRtcp(data):
+                    received += 1
+    return received
+
+
+def benchServer(argv):
+    """ 服务端负载测试：比较 thread / async 模式下的单核会话承载能力（-w 工作进程数  -s 共享 RTP 套接字数  -b 批量发送方式） """
+    sessions = 200
+    duration = 10.0
+    modes = ['thread', 'async']
+    workers = 1
+    shared = 0
+    batch = 'auto'
+    opts, args = getopt.getopt(argv, 'n:t:m:w:s:b:', ['sessions=', 'time=', 'mode=', 'workers=', 'shared-rtp=', 'batch='])
+    for opt, arg in opts:
+        if opt in ('-n', '--sessions'):
+            sessions = int(arg)
+        elif opt in ('-t', '--time'):
+            duration = float(arg)
+        elif opt in ('-m', '--mode'):
+            modes = arg.split(',')
+        elif opt in ('-w', '--workers'):
+            workers = int(arg)
+        elif opt in ('-s', '--shared-rtp'):
+            shared = int(arg)
+        elif opt in ('-b', '--batch'):
+            batch = arg
+    if not os.path.exists('./pic/pic-00000.jpg'):
+        print('@ 请先在 src 目录下解压 pic/pic.zip')
+        sys.exit(1)
+    print('%-8s %8s %8s %6s %10s %10s %10s %14s' % ('mode', 'workers', 'sessions', 'fds', 'cpu(%)', 'fps/sess', 'delivery', 'sessions/core'))
+    for mode in modes:
+        process = subprocess.Popen([sys.executable, 'Server.py', '--mode', mode, '--port', str(BENCH_SERVER_PORT), '--quiet',
+                                    '--workers', str(workers), '--shared-rtp', str(shared), '--batch', batch],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        time.sleep(1.0)
+        selector = selectors.DefaultSelector()
+        connections = []
+        try:
+            for index in range(sessions):
+                rtsp_socket, rtp_socket = openSession(BENCH_SERVER_PORT, index)
+                connections.append((rtsp_socket, rtp_socket))
+                selector.register(rtp_socket, selectors.EVENT_READ)
+            # 预热后开始计时
+            drainSockets(selector, 1.0)
+            cpu_start = readProcessTreeCpuTime(process.pid)
+            wall_start = time.monotonic()
+            received = drainSockets(selector, duration)
+            wall = time.monotonic() - wall_start
+            cpu = readProcessTreeCpuTime(process.pid) - cpu_start
+            fds = countProcessFds(process.pid)
+        finally:
+            for rtsp_socket, rtp_socket in connections:
+                rtsp_socket.close()
+                rtp_socket.close()
+            selector.close()
+            # SIGTERM：多进程模式下由主进程结束工作进程
+            process.terminate()
+            process.wait()
+        utilization = cpu / wall
+        fps = received / wall / sessions
+        delivery = fps / Server.RTP_FRAME
+        # 以实际送达帧率折算的会话数 / 实际占用的核数
+        per_core = sessions * delivery / utilization if utilization > 0 else float('inf')
+        print('%-8s %8d %8d %6d %10.1f %10.2f %9.1f%% %14.0f' % (mode, workers, sessions, fds, utilization * 100, fps, delivery * 100, per_core))
+
+
+class PacingSession:
+    """ 模拟会话：每帧向丢弃端口发送一个数据包 """
+
+    def __init__(self, sink_addr, payload):
+        """ 类构造方法 """
+        self.rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sink_addr = sink_addr
+        self.payload = payload
+
+    def sendRtpFrame(self):
+        """ 发送一帧 """
+        self.rtp_socket.sendto(self.payload, self.sink_addr)
+
+
+def runLegacyPacing(sessions, duration):
+    """ 旧方式：每个会话一个线程  sleep(RTP_INTERVAL) 后发送 """
+    stats = [JitterStats() for _ in sessions]
+    stop_flag = []
+
+    def loop(session, session_stats):
+        start = time.monotonic()
+        frame = 0
+        while not stop_flag:
+            time.sleep(Server.RTP_INTERVAL)
+            session.sendRtpFrame()
+            frame += 1
+            now = time.monotonic()
+            session_stats.update(now - (start + frame * Server.RTP_INTERVAL), now, Server.RTP_INTERVAL)
+
+    threads = [threading.Thread(target=loop, args=(session, session_stats)) for session, session_stats in zip(sessions, stats)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop_flag.append(True)
+    for thread in threads:
+        thread.join()
+    return [session_stats.summary() for session_stats in stats]
+
+
+def runSchedulerPacing(sessions, duration):
+    """ 新方式：共享帧调度器 """
+    scheduler = FrameScheduler(Server.RTP_INTERVAL)
+    scheduler.start()
+    for session in sessions:
+        scheduler.schedule(session)
+    time.sleep(duration)
+    summaries = [scheduler.discard(session) for session in sessions]
+    scheduler.stop()
+    return summaries
+
+
+def benchPacing(argv):
+    """ 帧发送节奏测试：比较每会话线程与共享帧调度器的发送抖动 """
+    count = 200
+    duration = 10.0
+    verbose = False
+    opts, args = getopt.getopt(argv, 'n:t:v', ['sessions=', 'time=', 'verbose'])
+    for opt, arg in opts:
+        if opt in ('-n', '--sessions'):
+            count = int(arg)
+        elif opt in ('-t', '--time'):
+            duration = float(arg)
+        elif opt in ('-v', '--verbose'):
+            verbose = True
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    payload = bytes(8192)
+    print('%-10s %8s %8s %12s %12s %12s %12s' % ('mode', 'sessions', 'fps', 'mean(ms)', 'p99 max(ms)', 'jitter(ms)', 'skipped'))
+    for mode, runner in (('thread', runLegacyPacing), ('scheduler', runSchedulerPacing)):
+        sessions = [PacingSession(sink.getsockname(), payload) for _ in range(count)]
+        summaries = runner(sessions, duration)
+        for session in sessions:
+            session.rtp_socket.close()
+        if verbose:
+            for index, summary in enumerate(summaries):
+                print('  %s #%d %s' % (mode, index, summary))
+        worst = sorted(summary['max_ms'] for summary in summaries)
+        print('%-10s %8d %8.2f %12.2f %12.2f %12.2f %12d' % (
+            mode, count,
+            sum(summary['frames'] for summary in summaries) / count / duration,
+            sum(summary['mean_ms'] for summary in summaries) / count,
+            worst[min(len(worst) - 1, int(len(worst) * 0.99))],
+            sum(summary['jitter_ms'] for summary in summaries) / count,
+            sum(summary['skipped'] for summary in summaries)))
+    sink.close()
+
+
+def benchContainer(argv):
+    """ 帧读取测试：比较散列 JPEG 文件、帧缓存与打包媒体文件（mmap）的逐帧读取与发送开销 """
+    count = 20000
+    opts, args = getopt.getopt(argv, 'n:', ['frames='])
+    for opt, arg in opts:
+        if opt in ('-n', '--frames'):
+            count = int(arg)
+    paths = listFrames('./pic')
+    if not paths:
+        print('@ 请先在 src 目录下解压 pic/pic.zip')
+        sys.exit(1)
+    container_path = './bench' + CONTAINER_EXT
+    pack(paths, container_path)
+    container = MediaContainer(container_path)
+    frame_cache = FrameCache(64 * 1024 * 1024)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def readLoose(index):
+        with open(paths[index % len(paths)], 'rb') as file:
+            return file.read()
+
+    sources = (('loose', readLoose),
+               ('cache', lambda index: frame_cache.get(paths[index % len(paths)])),
+               ('container', lambda index: container.frame(index % len(container))))
+    print('%-10s %14s %10s %14s' % ('source', 'read(frame/s)', 'MB/s', 'send(frame/s)'))
+    for name, read in sources:
+        total = 0
+        start = time.perf_counter()
+        for index in range(count):
+            total += len(read(index))
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        for index in range(count):
+            rtp_packet = RtpPacket()
+            rtp_packet.encode(2, 0, 0, 0, 0, 0, index, 0, read(index))
+            sender.sendto(rtp_packet.get_packet(), sink.getsockname())
+            # 及时清空接收端  避免缓冲区溢出影响计时
+            sink.recv(65535)
+        send_elapsed = time.perf_counter() - start
+        # 释放对 mmap 切片的引用
+        del rtp_packet
+        print('%-10s %14.0f %10.1f %14.0f' % (name, count / elapsed, total / elapsed / 1024 / 1024, count / send_elapsed))
+    sender.close()
+    sink.close()
+    container.close()
+    os.remove(container_path)
+
+
+def benchRtpPacket(argv):
+    """ RTP 编码发送微基准：比较 encode + get_packet 拼接与 encode_into + sendmsg 分散发送 """
+    count = 50000
+    size = 8192
+    opts, args = getopt.getopt(argv, 'n:s:', ['packets=', 'size='])
+    for opt, arg in opts:
+        if opt in ('-n', '--packets'):
+            count = int(arg)
+        elif opt in ('-s', '--size'):
+            size = int(arg)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    sink.setblocking(False)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    address = sink.getsockname()
+    payload = memoryview(bytes(size))
+    reused = RtpPacket()
+
+    def before(seqnum):
+        rtp_packet = RtpPacket()
+        rtp_packet.encode(2, 0, 0, 0, 0, 26, seqnum, 0, payload)
+        sender.sendto(rtp_packet.get_packet(), address)
+
+    def after(seqnum):
+        reused.encode_into(2, 0, 0, 0, 0, 26, seqnum, 0, payload)
+        reused.send(sender, address)
+
+    def drain():
+        try:
+            while True:
+                sink.recv(65535)
+        except BlockingIOError:
+            pass
+
+    print('%-8s %12s %18s' % ('path', 'packets/s', 'alloc bytes/pkt'))
+    for name, send in (('before', before), ('after', after)):
+        # 吞吐量
+        start = time.perf_counter()
+        for seqnum in range(count):
+            send(seqnum)
+            if seqnum % 64 == 0:
+                drain()
+        elapsed = time.perf_counter() - start
+        drain()
+        # 每个数据包的临时分配峰值（tracemalloc）
+        samples = min(count, 1000)
+        allocated = 0
+        tracemalloc.start()
+        for seqnum in range(samples):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            send(seqnum)
+            allocated += tracemalloc.get_traced_memory()[1] - current
+            drain()
+        tracemalloc.stop()
+        print('%-8s %12.0f %18.0f' % (name, count / elapsed, allocated / samples))
+    sender.close()
+    sink.close()
+
+
+def benchBatch(argv):
+    """ 批量发送测试：比较逐包 sendmsg 与 GSO / sendmmsg 批量发送的系统调用数与数据包速率 """
+    count = 200
+    ticks = 100
+    size = 8192
+    opts, args = getopt.getopt(argv, 'n:t:s:', ['sessions=', 'ticks=', 'size='])
+    for opt, arg in opts:
+        if opt in ('-n', '--sessions'):
+            count = int(arg)
+        elif opt in ('-t', '--ticks'):
+            ticks = int(arg)
+        elif opt in ('-s', '--size'):
+            size = int(arg)
+    # 接收端不读取  数据包在内核队列满后直接丢弃
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    address = sink.getsockname()
+    frame = bytes(size)
+    sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(count)]
+    rtp_packet = RtpPacket()
+    print('%-8s %10s %12s %12s %14s %12s' % ('mode', 'packets', 'syscalls', 'syscalls/s', 'packets/s', 'us/packet'))
+    for mode in ('off', BatchSender.SENDTO, BatchSender.GSO, BatchSender.MMSG):
+        batch_sender = BatchSender(mode) if mode != 'off' else None
+        if batch_sender is not None and batch_sender.mode != mode:
+            print('%-8s 不支持' % mode)
+            continue
+        packets = 0
+        syscalls = 0
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        for tick in range(ticks):
+            for sock in sockets:
+                for offset, chunk, marker in fragmentFrame(frame, Server.RTP_MTU - FRAGMENT_HEADER_SIZE):
+                    rtp_packet.encode_into(RTP_VERSION, 0, 0, 0, marker, PT_JPEG, tick, 0, chunk, tick, (offset, size))
+                    if batch_sender is None:
+                        rtp_packet.send(sock, address)
+                        syscalls += 1
+                    else:
+                        batch_sender.add(sock, address, rtp_packet.get_header(), chunk)
+                    packets += 1
+            if batch_sender is not None:
+                batch_sender.flush()
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        if batch_sender is not None:
+            syscalls = batch_sender.syscalls
+        print('%-8s %10d %12d %12.0f %14.0f %12.2f' % (mode, packets, syscalls, syscalls / elapsed, packets / elapsed, cpu / packets * 1e6))
+    for sock in sockets:
+        sock.close()
+    sink.close()
+
+
+def benchReceive(argv):
+    """ 接收测试：比较逐包 recvfrom 与接收环批量读取（recvmsg_into / recvmmsg）的丢包与每包开销 """
+    rounds = 200
+    burst = 512
+    size = 32768
+    opts, args = getopt.getopt(argv, 'r:b:s:', ['rounds=', 'burst=', 'size='])
+    for opt, arg in opts:
+        if opt in ('-r', '--rounds'):
+            rounds = int(arg)
+        elif opt in ('-b', '--burst'):
+            burst = int(arg)
+        elif opt in ('-s', '--size'):
+            size = int(arg)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp_packet = RtpPacket()
+    # 预先编码一轮突发的数据包（连续多帧）
+    packets = []
+    frame_number = 0
+    while len(packets) < burst:
+        for offset, chunk, marker in fragmentFrame(bytes(size), Server.RTP_MTU - FRAGMENT_HEADER_SIZE):
+            rtp_packet.encode_into(RTP_VERSION, 0, 0, 0, marker, PT_JPEG, len(packets), 0, chunk,
+                                   frame_number * 9000, (offset, size))
+            packets.append(rtp_packet.get_packet())
+        frame_number += 1
+
+    def legacy(sock, assembler):
+        count = 0
+        while True:
+            try:
+                data, address = sock.recvfrom(102400)
+            except BlockingIOError:
+                return count, count + 1
+            received = RtpPacket()
+            received.decode(data)
+            assembler.feed(received)
+            count += 1
+
+    def ring(receiver, assembler):
+        count = 0
+        calls = 0
+        while True:
+            views = receiver.receive(0)
+            if not views:
+                # select 与 recvmmsg 各一次  逐包模式另有每包一次 recvmsg_into
+                return count, calls * 2 + 1 + (count + calls if receiver.recvmmsg is None else 0)
+            calls += 1
+            for data in views:
+                rtp_packet.decode(data)
+                assembler.feed(rtp_packet)
+            count += len(views)
+
+    print('%-8s %10s %10s %10s %10s %12s %12s' % ('path', 'sent', 'received', 'dropped', 'frames', 'syscalls', 'us/packet'))
+    load_recvmmsg = RtpReceiver.loadRecvmmsg
+    for name in ('recvfrom', 'ring', 'mmsg'):
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(('127.0.0.1', 0))
+        address = sink.getsockname()
+        if name == 'recvfrom':
+            sink.setblocking(False)
+        else:
+            RtpReceiver.loadRecvmmsg = load_recvmmsg if name == 'mmsg' else lambda: None
+            receiver = RtpReceiver.RtpReceiver(sink)
+        received = 0
+        frames = 0
+        syscalls = 0
+        cpu = 0
+        for index in range(rounds):
+            for packet in packets:
+                sender.sendto(packet, address)
+            # 每轮使用相同的时间戳  重新组装
+            assembler = FrameAssembler()
+            start = time.process_time()
+            count, calls = legacy(sink, assembler) if name == 'recvfrom' else ring(receiver, assembler)
+            cpu += time.process_time() - start
+            received += count
+            frames += assembler.completed
+            syscalls += calls
+        sent = rounds * len(packets)
+        print('%-8s %10d %10d %10d %10d %12d %12.2f' % (name, sent, received, sent - received, frames,
+                                                        syscalls, cpu / max(received, 1) * 1e6))
+        sink.close()
+    RtpReceiver.loadRecvmmsg = load_recvmmsg
+    sender.close()
+
+
+def benchMulticast(argv):
+    """ 组播测试：比较同一 URL 的 N 个观众以单播 / 组播接收时服务端的 CPU 占用 """
+    viewers = [1, 10, 100, 300]
+    duration = 5.0
+    opts, args = getopt.getopt(argv, 'n:t:', ['viewers=', 'time='])
+    for opt, arg in opts:
+        if opt in ('-n', '--viewers'):
+            viewers = [int(count) for count in arg.split(',')]
+        elif opt in ('-t', '--time'):
+            duration = float(arg)
+    if not os.path.exists('./pic/pic-00000.jpg'):
+        print('@ 请先在 src 目录下解压 pic/pic.zip')
+        sys.exit(1)
+    print('%-10s %8s %10s %16s' % ('transport', 'viewers', 'cpu(%)', 'cpu us/frame'))
+    for multicast in (False, True):
+        for count in viewers:
+            process = subprocess.Popen([sys.executable, 'Server.py', '--mode', 'async', '--port', str(BENCH_SERVER_PORT), '--quiet'],
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            time.sleep(1.0)
+            connections = []
+            try:
+                for index in range(count):
+                    connections.append(openSession(BENCH_SERVER_PORT, index, 'movie', multicast))
+                time.sleep(1.0)
+                cpu_start = readProcessCpuTime(process.pid)
+                time.sleep(duration)
+                cpu = readProcessCpuTime(process.pid) - cpu_start
+            finally:
+                for rtsp_socket, rtp_socket in connections:
+                    rtsp_socket.close()
+                    rtp_socket.close()
+                process.kill()
+                process.wait()
+            # 每个发送时刻（帧间隔）的服务端 CPU 时间
+            print('%-10s %8d %10.1f %16.0f' % ('multicast' if multicast else 'unicast', count, cpu / duration * 100,
+                                                cpu / (duration * Server.RTP_FRAME) * 1e6))
+
+
+def benchChannel(argv):
+    """ 媒体频道测试：比较同一媒体的 N 个会话逐会话切分编码与共享频道（只改写头部）的每时刻 CPU 开销 """
+    viewers = [1, 10, 100, 500]
+    ticks = 50
+    opts, args = getopt.getopt(argv, 'n:t:', ['viewers=', 'ticks='])
+    for opt, arg in opts:
+        if opt in ('-n', '--viewers'):
+            viewers = [int(count) for count in arg.split(',')]
+        elif opt in ('-t', '--ticks'):
+            ticks = int(arg)
+    if not os.path.exists('./pic/pic-00000.jpg'):
+        print('@ 请先在 src 目录下解压 pic/pic.zip')
+        sys.exit(1)
+    server = Server.BaseServer()
+    chunk_size = Server.RTP_MTU - FRAGMENT_HEADER_SIZE
+    # 接收端不读取  数据包在内核队列满后直接丢弃
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    address = sink.getsockname()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.setblocking(False)
+    batch_sender = BatchSender()
+    rtp_packet = RtpPacket()
+
+    def perSession(count, tick):
+        # 每个会话各自读取  切分并编码
+        for session in range(count):
+            frame = server.readFrame(tick + session)
+            for offset, chunk, marker in fragmentFrame(frame, chunk_size):
+                rtp_packet.encode_into(RTP_VERSION, 0, 0, 0, marker, PT_JPEG, tick, session, chunk, tick, (offset, len(frame)))
+                batch_sender.add(sender, address, rtp_packet.get_header(), chunk)
+
+    def shared(count, tick):
+        # 共享频道  每个会话只改写头部
+        for session in range(count):
+            for packet in channel.packets(tick + session):
+                packet.restamp(tick, tick, session)
+                batch_sender.add(sender, address, packet.get_header(), packet.get_payload())
+
+    print('%-8s %8s %14s %16s' % ('path', 'viewers', 'us/tick', 'us/viewer-frame'))
+    for name, send in (('session', perSession), ('channel', shared)):
+        for count in viewers:
+            channel = MediaChannel('movie', server.readFrame, server.frameCount(), chunk_size, Server.RTP_FRAME)
+            # 预热帧缓存与频道缓存
+            send(count, 0)
+            batch_sender.flush()
+            start = time.process_time()
+            for tick in range(1, ticks + 1):
+                send(count, tick)
+                batch_sender.flush()
+            cpu = time.process_time() - start
+            print('%-8s %8d %14.0f %16.1f' % (name, count, cpu / ticks * 1e6, cpu / ticks / count * 1e6))
+    sender.close()
+    sink.close()
+
+
+def makeRtspRequests(count):
+    """ 生成测试用 RTSP 请求（含 CRLF / LF 行结束与带消息体的请求） """
+    requests = []
+    for index in range(count):
+        cseq = index + 1
+        kind = index % 5
+        if kind == 0:
+            text = 'SETUP movie-%d RTSP/1.0\nCSeq: %d\nTransport: RTP/UDP;client_port=%d\n\n' % (index, cseq, 5000 + index % 5000)
+        elif kind == 1:
+            text = 'PLAY movie-%d RTSP/1.0\r\nCSeq: %d\r\nSession: %d\r\nRange: npt=%d-\r\n\r\n' % (index, cseq, 10000000 + index, index)
+        elif kind == 2:
+            text = 'PAUSE movie-%d RTSP/1.0\nCSeq: %d\nSession: %d\n\n' % (index, cseq, 10000000 + index)
+        elif kind == 3:
+            body = 'position: %d\r\n' % index
+            text = 'SET_PARAMETER movie-%d RTSP/1.0\r\nCSeq: %d\r\nSession: %d\r\nContent-Type: text/parameters\r\nContent-Length: %d\r\n\r\n%s' % (
+                index, cseq, 10000000 + index, len(body), body)
+        else:
+            text = 'TEARDOWN movie-%d RTSP/1.0\nCSeq: %d\nSession: %d\n\n' % (index, cseq, 10000000 + index)
+        requests.append(text.encode())
+    return requests
+
+
+def parseLegacyRequest(data):
+    """ 旧方式分析一条请求（按行切分  每行编译正则）  用作吞吐量对照 """
+    lines = str(data).split('\n')
+    request = {'Command': lines[0].split(' ')[0], 'URL': lines[0].split(' ')[1], 'CSeq': lines[1].split(' ')[1]}
+    for line in lines[1:]:
+        words = line.split(' ')
+        if 'Session' in words[0]:
+            request['Session'] = words[1]
+        elif 'Transport' in words[0]:
+            pattern = re.compile(r'client_port=\s*(\S*?)\s*(;|$)')
+            result = pattern.search(line)
+            if result:
+                request['client_port'] = result.group(1)
+        elif 'Range' in words[0]:
+            request['Range'] = words[1]
+    return request
+
+
+def benchRtsp(argv):
+    """ RTSP 解析测试：吞吐量（按不同读取大小切分的连续请求流）与模糊测试（随机切分/损坏的输入） """
+    count = 20000
+    rounds = 2000
+    opts, args = getopt.getopt(argv, 'n:f:', ['requests=', 'fuzz='])
+    for opt, arg in opts:
+        if opt in ('-n', '--requests'):
+            count = int(arg)
+        elif opt in ('-f', '--fuzz'):
+            rounds = int(arg)
+    requests = makeRtspRequests(count)
+    stream = b''.join(requests)
+    # --- 吞吐量 ---
+    print('%-16s %10s %14s' % ('path', 'messages', 'messages/s'))
+    start = time.perf_counter()
+    for request in requests:
+        parseLegacyRequest(request.decode('utf-8'))
+    elapsed = time.perf_counter() - start
+    print('%-16s %10d %14.0f' % ('legacy (framed)', count, count / elapsed))
+    for size in (1, 64, 1460, len(stream)):
+        rtsp_parser = RtspParser()
+        parsed = 0
+        start = time.perf_counter()
+        for offset in range(0, len(stream), size):
+            parsed += len(rtsp_parser.feed(stream[offset:offset + size]))
+        elapsed = time.perf_counter() - start
+        name = 'read %d' % size if size < len(stream) else 'read all'
+        print('%-16s %10d %14.0f%s' % (name, parsed, parsed / elapsed, '' if parsed == count else '  MISMATCH'))
+    # --- 模糊测试 ---
+    random.seed(1)
+    sample = stream[:64 * 1024]
+    reference = [(message.start_line, message.headers, message.body) for message in RtspParser().feed(sample)]
+    split_failures = 0
+    errors = 0
+    crashes = 0
+    for index in range(rounds):
+        # 随机切分：结果必须与整体输入一致
+        rtsp_parser = RtspParser()
+        messages = []
+        offset = 0
+        while offset < len(sample):
+            size = random.randint(1, 300)
+            messages.extend(rtsp_parser.feed(sample[offset:offset + size]))
+            offset += size
+        if [(message.start_line, message.headers, message.body) for message in messages] != reference:
+            split_failures += 1
+        # 随机损坏：只允许抛出 RtspError
+        data = bytearray(random.choice(requests) * 3)
+        for mutation in range(random.randint(1, 8)):
+            position = random.randrange(len(data))
+            choice = random.random()
+            if choice < 0.4:
+                data[position] = random.randrange(256)
+            elif choice < 0.7:
+                del data[position:position + random.randint(1, 16)]
+            else:
+                data[position:position] = random.choice([b'\n\n', b'\r\n', b':', b'Content-Length: 99999999\n', os.urandom(8)])
+        try:
+            RtspParser(lenient=bool(index % 2)).feed(bytes(data))
+        except RtspError:
+            errors += 1
+        except Exception as error:
+            crashes += 1
+            if crashes <= 3:
+                print('@ crash: %r on %r' % (error, bytes(data)))
+    print('fuzz rounds %d  split mismatches %d  rejected %d  crashes %d' % (rounds, split_failures, errors, crashes))
+
+
+def benchReply(argv):
+    """ RTSP 回复构造微基准：比较列表拼接 + encode 与预编码模板（状态行/CSeq 字段名/会话 Session 行）的单核回复速率 """
+    count = 200000
+    opts, args = getopt.getopt(argv, 'n:', ['replies='])
+    for opt, arg in opts:
+        if opt in ('-n', '--replies'):
+            count = int(arg)
+    session_id = '12345678'
+    session_header = headerLine('Session', session_id)
+
+    def beforePlay(cseq):
+        line_1 = ['RTSP/1.0', '200', 'OK']
+        line_2 = ['CSeq:', cseq]
+        line_3 = ['Session:', session_id]
+        return (' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n' + '\n').encode()
+
+    def afterPlay(cseq):
+        return rtspReply(200, cseq, session_header)
+
+    def beforeSetup(cseq):
+        line_1 = ['RTSP/1.0', '200', 'OK']
+        line_2 = ['CSeq:', cseq]
+        line_3 = ['Transport:', 'RTP/UDP;client_port=' + '5004' + ';server_port=' + str(6000) + ';ssrc=%08X' % 0x1234ABCD]
+        line_4 = ['Session:', session_id]
+        return (' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n' + ' '.join(line_4) + '\n' + '\n').encode()
+
+    def afterSetup(cseq):
+        transport = 'RTP/UDP;client_port=%s;server_port=%d;ssrc=%08X' % ('5004', 6000, 0x1234ABCD)
+        return rtspReply(200, cseq, headerLine('Transport', transport), session_header)
+
+    def beforeKeepAlive(cseq):
+        body = 'position: %d\r\n' % 42
+        line_1 = ['RTSP/1.0', '200', 'OK']
+        line_2 = ['CSeq:', cseq]
+        line_3 = ['Session:', session_id]
+        line_4 = ['Content-Type:', 'text/parameters']
+        line_5 = ['Content-Length:', str(len(body))]
+        return (' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n' + ' '.join(line_4) + '\n'
+                + ' '.join(line_5) + '\n' + '\n' + body).encode()
+
+    def afterKeepAlive(cseq):
+        return rtspReply(200, cseq, session_header, body=b'position: %d\r\n' % 42)
+
+    cseqs = [str(index) for index in range(1000)]
+    print('%-24s %12s %18s' % ('reply', 'replies/s', 'alloc bytes/reply'))
+    for name, build in (('PLAY before', beforePlay), ('PLAY after', afterPlay),
+                        ('SETUP before', beforeSetup), ('SETUP after', afterSetup),
+                        ('GET_PARAMETER before', beforeKeepAlive), ('GET_PARAMETER after', afterKeepAlive)):
+        start = time.perf_counter()
+        for index in range(count):
+            build(cseqs[index % 1000])
+        elapsed = time.perf_counter() - start
+        # 每条回复的临时分配峰值（tracemalloc）
+        samples = 1000
+        allocated = 0
+        tracemalloc.start()
+        for index in range(samples):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            build(cseqs[index])
+            allocated += tracemalloc.get_traced_memory()[1] - current
+        tracemalloc.stop()
+        print('%-24s %12.0f %18.0f' % (name, count / elapsed, allocated / samples))
+    # 两种构造方式输出必须一致
+    for before, after in ((beforePlay, afterPlay), (beforeSetup, afterSetup), (beforeKeepAlive, afterKeepAlive)):
+        if before('7') != after('7'):
+            print('@ output mismatch: %r != %r' % (before('7'), after('7')))
+
+def benchSessions(argv):
+    """ 会话注册测试：比较随机重试分配 + 全局集合与注册表（置换分配  按 URL 索引）的分配、按 URL 查找与多进程标识唯一性 """
+    counts = [1000, 10000, 100000]
+    urls = 100
+    opts, args = getopt.getopt(argv, 'n:u:', ['sessions=', 'urls='])
+    for opt, arg in opts:
+        if opt in ('-n', '--sessions'):
+            counts = [int(count) for count in arg.split(',')]
+        elif opt in ('-u', '--urls'):
+            urls = int(arg)
+    print('%-10s %8s %14s %14s %16s' % ('path', 'sessions', 'alloc us/sess', 'retries', 'url lookup us'))
+    for count in counts:
+        # 旧方式：随机数重试直到不在集合中  按 URL 查找需遍历全部会话
+        used_session_id_list = set()
+        sessions = []
+        retries = 0
+        start = time.perf_counter()
+        for index in range(count):
+            while True:
+                session_id = str(random.randint(MIN_SESSION_ID, MAX_SESSION_ID))
+                if session_id not in used_session_id_list:
+                    used_session_id_list.add(session_id)
+                    break
+                retries += 1
+            sessions.append((session_id, 'movie-%d' % (index % urls)))
+        alloc = (time.perf_counter() - start) / count
+        start = time.perf_counter()
+        for index in range(100):
+            found = [session for session in sessions if session[1] == 'movie-%d' % (index % urls)]
+        lookup = (time.perf_counter() - start) / 100
+        print('%-10s %8d %14.2f %14d %16.1f' % ('random', count, alloc * 1e6, retries, lookup * 1e6))
+        # 注册表
+        registry = SessionRegistry(makeSessionKey())
+        start = time.perf_counter()
+        for index in range(count):
+            registry.register(index, ('127.0.0.1', index), 'movie-%d' % (index % urls))
+        alloc = (time.perf_counter() - start) / count
+        start = time.perf_counter()
+        for index in range(100):
+            found = registry.getByUrl('movie-%d' % (index % urls))
+        lookup = (time.perf_counter() - start) / 100
+        print('%-10s %8d %14.2f %14d %16.1f' % ('registry', count, alloc * 1e6, 0, lookup * 1e6))
+    # 唯一性：4 个工作进程共用置换参数  各分配 count 个标识
+    count = max(counts)
+    key = makeSessionKey()
+    issued = set()
+    total = 0
+    for worker_index in range(4):
+        registry = SessionRegistry(key, worker_index, 4)
+        for index in range(count):
+            issued.add(registry.register(index, index, 'movie'))
+            total += 1
+    # 多线程并发注册
+    registry = SessionRegistry(key)
+    threads = [threading.Thread(target=lambda base: [registry.register((base, index), (base, index), 'movie') for index in range(count // 8)],
+                                args=(base,)) for base in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print('unique ids: %d/%d across 4 workers  %d/%d from 8 threads' % (len(issued), total, len(registry), 8 * (count // 8)))
+
+
+def benchPorts(argv):
+    """ RTP 端口分配测试：比较随机端口绑定重试与端口池在不同占用率下的分配开销与耗尽处理 """
+    first = 40000
+    pairs = 2000
+    samples = 200
+    opts, args = getopt.getopt(argv, 'p:n:', ['pairs=', 'samples='])
+    for opt, arg in opts:
+        if opt in ('-p', '--pairs'):
+            pairs = int(arg)
+        elif opt in ('-n', '--samples'):
+            samples = int(arg)
+    last = first + 2 * pairs
+    print('%-8s %8s %14s %14s' % ('path', 'used(%)', 'alloc us', 'binds/alloc'))
+    for fill in (0.0, 0.5, 0.9, 0.99):
+        # 旧方式：随机端口  绑定失败则重试
+        held = []
+        try:
+            while len(held) < int(pairs * fill):
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                try:
+                    sock.bind(('127.0.0.1', random.randrange(first, last, 2)))
+                    held.append(sock)
+                except OSError:
+                    sock.close()
+            binds = 0
+            start = time.perf_counter()
+            for index in range(samples):
+                while True:
+                    binds += 1
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                    try:
+                        sock.bind(('127.0.0.1', random.randrange(first, last, 2)))
+                        break
+                    except OSError:
+                        sock.close()
+                sock.close()
+            elapsed = time.perf_counter() - start
+        finally:
+            for sock in held:
+                sock.close()
+        print('%-8s %8.0f %14.1f %14.2f' % ('random', fill * 100, elapsed / samples * 1e6, binds / samples))
+        # 端口池
+        pool = PortPool(first, last)
+        held = [pool.open('127.0.0.1') for index in range(int(pairs * fill))]
+        binds = pool.bind_failures
+        start = time.perf_counter()
+        for index in range(samples):
+            sock, port = pool.open('127.0.0.1')
+            sock.close()
+            pool.release(port)
+        elapsed = time.perf_counter() - start
+        print('%-8s %8.0f %14.1f %14.2f' % ('pool', fill * 100, elapsed / samples * 1e6, 1 + (pool.bind_failures - binds) / samples))
+        for sock, port in held:
+            sock.close()
+    # 耗尽：端口池立即报告  旧方式会无限重试
+    pool = PortPool(first, first + 20)
+    held = [pool.open('127.0.0.1') for index in range(10)]
+    start = time.perf_counter()
+    try:
+        pool.open('127.0.0.1')
+    except PortExhausted as error:
+        print('exhausted after %.1f us: %s' % ((time.perf_counter() - start) * 1e6, error))
+    for sock, port in held:
+        sock.close()
+
+
+def benchRtcp(argv):
+    """ RTCP 测试：接收统计的每包开销与精度（注入丢包 / 乱序 / 到达抖动）  服务端处理接收方报告的开销 """
+    packets = 200000
+    opts, args = getopt.getopt(argv, 'n:', ['packets='])
+    for opt, arg in opts:
+        if opt in ('-n', '--packets'):
+            packets = int(arg)
+    clock_rate = Server.RTP_CLOCK_RATE
+    generator = random.Random(1)
+    print('%-10s %8s %10s %12s %12s %14s %14s' % ('loss(%)', 'jitter', 'ns/packet', 'lost', 'reported', 'fraction(%)', 'jitter ms'))
+    for loss, noise in ((0.0, 0.0), (0.01, 0.002), (0.05, 0.005), (0.2, 0.01)):
+        # 生成到达序列：每帧 5 个分片  序列号回绕  按比例丢包  相邻数据包偶尔交换
+        arrivals = []
+        lost = 0
+        for index in range(packets):
+            seqnum = (60000 + index) & 0xFFFF
+            frame = index // 5
+            if generator.random() < loss:
+                lost += 1
+                continue
+            arrivals.append((seqnum, frame * clock_rate // 10, frame / 10 + generator.random() * noise))
+        for index in range(1, len(arrivals) - 1, 97):
+            arrivals[index], arrivals[index + 1] = arrivals[index + 1], arrivals[index]
+        stats = ReceptionStats(clock_rate)
+        update = stats.update
+        start = time.perf_counter()
+        for seqnum, timestamp, arrival in arrivals:
+            update(1, seqnum, timestamp, arrival)
+        elapsed = time.perf_counter() - start
+        block = stats.reportBlock(time.monotonic())
+        print('%-10.1f %8.3f %10.0f %12d %12d %14.1f %14.3f' % (loss * 100, noise * 1000, elapsed / len(arrivals) * 1e9, lost,
+                                                                 block.cumulative_lost, block.fraction_lost / 2.56, block.jitter * 1000 / clock_rate))
+    # 服务端：解析接收方报告并更新会话指标
+    server = Server.BaseServer()
+    handler = Server.Handler(None, ('127.0.0.1', 0), server)
+    report = buildReceiverReport(0x1234, [stats.reportBlock(time.monotonic())._replace(ssrc=handler.rtp_ssrc)])
+    reports = 100000
+    start = time.perf_counter()
+    for index in range(reports):
+        handler.handleRtcp(report, ('127.0.0.1', 0))
+    elapsed = time.perf_counter() - start
+    sender_report = buildSenderReport(handler.rtp_ssrc, 0, 0, 0)
+    start = time.perf_counter()
+    for index in range(reports):
+        parseRtcp(sender_report)
+    parse = time.perf_counter() - start
+    print('\n@ 接收方报告处理 %.2f us/report  发送方报告解析 %.2f us/report' % (elapsed / reports * 1e6, parse / reports * 1e6))
+    print('@ 报告大小 SR %d 字节 / RR %d 字节  每 %d 秒每会话各一个' % (len(sender_report), len(report), Server.RTCP_INTERVAL))
+
+
+def simulateLink(policy, bitrates, capacities, base_loss, generator):
+    """ 模拟链路：每个报告间隔按容量计算送达率（超出部分丢弃）与排队抖动  由策略选择下一间隔的档位
+
+    返回 (各间隔 (容量, 档位, 丢包率) 列表, 平均送达码率 bit/s, 平均丢包率, 切换次数)
+    """
+    rung = 0
+    timeline = []
+    delivered = 0
+    losses = 0
+    switches = 0
+    for capacity in capacities:
+        rate = bitrates[rung]
+        goodput = min(rate, capacity)
+        loss = min(1.0, 1 - goodput / rate + generator.random() * base_loss)
+        # 链路饱和时队列增长  抖动随利用率上升
+        jitter = 5 * rate / capacity if rate <= capacity else 60 + 100 * (rate / capacity - 1)
+        report = {'fraction_lost': int(loss * 256) / 256, 'jitter_ms': jitter, 'rtt_ms': 20 + jitter, 'send_kbps': rate / 1000}
+        timeline.append((capacity, rung, loss))
+        delivered += rate * (1 - loss)
+        losses += loss
+        next_rung = policy.decide(rung, report)
+        switches += next_rung != rung
+        rung = next_rung
+    return timeline, delivered / len(capacities), losses / len(capacities), switches
+
+
+def benchAbr(argv):
+    """ 码率自适应测试：在容量变化的模拟丢包链路上比较各策略的送达码率、丢包率与切换次数 """
+    ladder = ''
+    intervals = 20
+    base_loss = 0.005
+    verbose = False
+    opts, args = getopt.getopt(argv, 'l:n:b:v', ['ladder=', 'intervals=', 'base-loss=', 'verbose'])
+    for opt, arg in opts:
+        if opt in ('-l', '--ladder'):
+            ladder = arg
+        elif opt in ('-n', '--intervals'):
+            intervals = int(arg)
+        elif opt in ('-b', '--base-loss'):
+            base_loss = float(arg)
+        elif opt in ('-v', '--verbose'):
+            verbose = True
+    if ladder:
+        server = Server.BaseServer()
+        quality_ladder = QualityLadder(ladderRungs(ladder), server.frameCount(), server.mediaBytes(), Server.RTP_FRAME)
+        names, bitrates = quality_ladder.names, quality_ladder.bitrates
+    else:
+        # 未指定质量阶梯时使用按比例缩小的合成档位
+        names, bitrates = ['high', 'medium', 'low'], [2000000, 1000000, 450000]
+    print('@ 档位: ' + '  '.join('%s %.0f kbps' % (name, bitrate / 1000) for name, bitrate in zip(names, bitrates)))
+    # 容量变化：充足 -> 降到中档以下 -> 降到低档附近 -> 恢复
+    top = bitrates[0]
+    phases = [1.5, 0.7, 0.3, 1.2]
+    capacities = [top * factor for factor in phases for index in range(intervals)]
+    print('%-10s %14s %10s %10s %s' % ('policy', 'goodput kbps', 'loss(%)', 'switches', '  '.join('%s(%%)' % name for name in names)))
+    for name, policy_class in ABR_POLICIES.items():
+        timeline, goodput, loss, switches = simulateLink(policy_class(bitrates), bitrates, capacities, base_loss, random.Random(1))
+        shares = ['%*.0f' % (len(rung) + 3, sum(1 for entry in timeline if entry[1] == index) * 100 / len(timeline))
+                  for index, rung in enumerate(names)]
+        print('%-10s %14.0f %10.1f %10d %s' % (name, goodput / 1000, loss * 100, switches, '  '.join(shares)))
+        if verbose:
+            print('    ' + ' '.join('%s%s' % (names[rung][0], '!' if loss > 0.05 else '') for capacity, rung, loss in timeline))
+
+
+def benchIngest(argv):
+    """ 导入测试：比较不同进程数下编码质量阶梯的吞吐量（帧/秒）与加速比 """
+    source = './pic'
+    jobs = [1, 2, 4, os.cpu_count() or 1]
+    opts, args = getopt.getopt(argv, 's:j:', ['source=', 'jobs='])
+    for opt, arg in opts:
+        if opt in ('-s', '--source'):
+            source = arg
+        elif opt in ('-j', '--jobs'):
+            jobs = [int(count) for count in arg.split(',')]
+    rungs = LADDER_RUNGS
+    if Ingest.Image is None:
+        # 没有 Pillow 时只能复制原始档位（只测试读取写入与进程间传输开销）
+        print('@ 未安装 Pillow  只测试原始档位复制')
+        rungs = LADDER_RUNGS[:1]
+    print('@ CPU 核数 %d' % (os.cpu_count() or 1))
+    print('%8s %10s %12s %10s' % ('jobs', 'seconds', 'frames/s', 'speedup'))
+    baseline = None
+    with tempfile.TemporaryDirectory() as directory:
+        for count in sorted(set(jobs)):
+            manifest = Ingest.ingest(source, os.path.join(directory, 'bench'), rungs, jobs=count)
+            seconds = manifest['ingest_seconds']
+            baseline = baseline or seconds
+            print('%8d %10.3f %12.0f %10.2f' % (count, seconds, manifest['frames'] / seconds, baseline / seconds))
+
+
+def benchCatalog(argv):
+    """ 媒体目录测试：比较 JSON 列表加载 + 线性子串过滤与媒体目录（mmap  二分查找）的加载、按名称查找与检索开销 """
+    counts = [1000, 10000, 100000]
+    page = Server.CATALOG_PAGE_SIZE
+    opts, args = getopt.getopt(argv, 'n:p:', ['items=', 'page='])
+    for opt, arg in opts:
+        if opt in ('-n', '--items'):
+            counts = [int(count) for count in arg.split(',')]
+        elif opt in ('-p', '--page'):
+            page = int(arg)
+    words = ['river', 'night', 'city', 'ocean', 'garden', 'winter', 'storm', 'light', 'forest', 'desert']
+    print('%-8s %8s %10s %12s %12s %14s %8s' % ('path', 'items', 'load ms', 'lookup us', 'prefix us', 'substring us', 'matches'))
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            rng = random.Random(count)
+            names = ['%s-%s/%s-%06d' % (rng.choice(words), rng.choice(words), rng.choice(words), index) for index in range(count)]
+            items = [CatalogItem(name, os.path.join(directory, name), ('source',), 183, 10, 1, 1581118) for name in names]
+            queries = rng.sample(names, 100)
+            # 旧方式：加载完整列表（JSON  相当于 DESCRIBE 回复整个列表）  按名称查找与检索均线性扫描
+            listing = os.path.join(directory, 'catalog-%d.json' % count)
+            with open(listing, 'w') as file:
+                json.dump([item._asdict() for item in items], file)
+            start = time.perf_counter()
+            with open(listing) as file:
+                loaded = json.load(file)
+            load = time.perf_counter() - start
+            start = time.perf_counter()
+            for query in queries:
+                found = next(entry for entry in loaded if entry['name'] == query)
+            lookup = (time.perf_counter() - start) / len(queries)
+            start = time.perf_counter()
+            for word in words:
+                found = [entry['name'] for entry in loaded if entry['name'].startswith(word)][:page]
+            prefix = (time.perf_counter() - start) / len(words)
+            start = time.perf_counter()
+            for word in words:
+                found = [entry['name'] for entry in loaded if 'y-' + word in entry['name']]
+            substring = (time.perf_counter() - start) / len(words)
+            print('%-8s %8d %10.2f %12.1f %12.1f %14.1f %8d' % ('list', count, load * 1e3, lookup * 1e6, prefix * 1e6,
+                                                                substring * 1e6, len(found)))
+            # 媒体目录
+            path = os.path.join(directory, 'catalog-%d%s' % (count, CATALOG_EXT))
+            build(items, path)
+            start = time.perf_counter()
+            catalog = MediaCatalog(path)
+            load = time.perf_counter() - start
+            start = time.perf_counter()
+            for query in queries:
+                found = catalog.lookup(query)
+            lookup = (time.perf_counter() - start) / len(queries)
+            start = time.perf_counter()
+            for word in words:
+                found = catalog.search(word, True, 0, page)
+            prefix = (time.perf_counter() - start) / len(words)
+            start = time.perf_counter()
+            for word in words:
+                total, found = catalog.search('y-' + word, False, 0, page)
+            substring = (time.perf_counter() - start) / len(words)
+            print('%-8s %8d %10.2f %12.1f %12.1f %14.1f %8d' % ('catalog', count, load * 1e3, lookup * 1e6, prefix * 1e6,
+                                                                substring * 1e6, total))
+            catalog.close()
+
+
+def benchSeek(argv):
+    """ 随机定位测试：比较无索引（从头逐帧查找 JPEG 结束标记）与 Range 定位（npt 换算帧序号 + 索引表）的定位耗时随媒体长度的变化 """
+    counts = [10000, 100000, 1000000]
+    seeks = 200
+    frame_rate = 25
+    opts, args = getopt.getopt(argv, 'n:s:', ['frames=', 'seeks='])
+    for opt, arg in opts:
+        if opt in ('-n', '--frames'):
+            counts = [int(count) for count in arg.split(',')]
+        elif opt in ('-s', '--seeks'):
+            seeks = int(arg)
+    print('%-8s %9s %9s %7s %10s %10s' % ('method', 'frames', 'media MB', 'seeks', 'mean us', 'max us'))
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            rng = random.Random(count)
+            path = os.path.join(directory, 'seek-%d%s' % (count, CONTAINER_EXT))
+            with ContainerWriter(path, count, frame_rate) as writer:
+                for index in range(count):
+                    writer.write(b'\xff\xd8' + b'%08d' % index * rng.randint(2, 8) + b'\xff\xd9')
+            size = os.path.getsize(path) / 1024 / 1024
+            targets = ['npt=%.3f-' % rng.uniform(0, count / frame_rate) for _ in range(seeks)]
+            # 旧方式：没有索引  按帧率换算帧序号后从数据起始处逐帧查找 JPEG 结束标记（相当于未索引的 MJPEG 流  只测少量定位）
+            container = MediaContainer(path)
+            data = container.mmap
+            times = []
+            for target in targets[:min(seeks, 10)]:
+                start = time.perf_counter()
+                frame_number = int(parseRange(target)[1] * frame_rate)
+                position = container.frameRange(0)[0]
+                for _ in range(frame_number):
+                    position = data.find(b'\xff\xd9', position) + 2
+                frame = data[position:data.find(b'\xff\xd9', position) + 2]
+                times.append(time.perf_counter() - start)
+                assert frame == container.frame(frame_number)
+            print('%-8s %9d %9.1f %7d %10.1f %10.1f' % ('scan', count, size, len(times), sum(times) / len(times) * 1e6, max(times) * 1e6))
+            # Range 定位：服务端 PLAY 的定位路径（解析 Range  换算并对齐关键帧  经媒体频道读取并切分第一帧）
+            source = MediaSource(path, None, frame_rate)
+            channel = MediaChannel('seek', source.readFrame, len(source), Server.RTP_MTU - FRAGMENT_HEADER_SIZE, frame_rate)
+            times = []
+            for target in targets:
+                start = time.perf_counter()
+                packets = channel.packets(source.frameAt(parseRange(target)[1]))
+                times.append(time.perf_counter() - start)
+            print('%-8s %9d %9.1f %7d %10.1f %10.1f' % ('index', count, size, len(times), sum(times) / len(times) * 1e6, max(times) * 1e6))
+            del frame, packets, channel
+            source.media.close()
+            container.close()
+
+
+def benchTrick(argv):
+    """ 快进 / 倒放测试：按不同 Scale 播放同一媒体  比较每秒发送的帧数与字节数（跳帧时码率应与 1 倍速相当） """
+    scales = [1.0, 2.0, 4.0, 16.0, -4.0, 0.5]
+    duration = 3.0
+    opts, args = getopt.getopt(argv, 'x:t:', ['scales=', 'time='])
+    for opt, arg in opts:
+        if opt in ('-x', '--scales'):
+            scales = [float(scale) for scale in arg.split(',')]
+        elif opt in ('-t', '--time'):
+            duration = float(arg)
+    if not os.path.exists('./pic/pic-00000.jpg'):
+        print('@ 请先在 src 目录下解压 pic/pic.zip')
+        sys.exit(1)
+    process = subprocess.Popen([sys.executable, 'Server.py', '--port', str(BENCH_SERVER_PORT), '--quiet'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rtp_socket.bind(('127.0.0.1', 0))
+    rtp_socket.settimeout(0.1)
+    rtsp_socket = socket.create_connection(('127.0.0.1', BENCH_SERVER_PORT))
+    try:
+        request = 'SETUP movie RTSP/1.0\nCSeq: 1\nTransport: RTP/UDP;client_port=%d\n\n' % rtp_socket.getsockname()[1]
+        rtsp_socket.send(request.encode())
+        session_id = '0'
+        for line in rtsp_socket.recv(1024).decode('utf-8').split('\n'):
+            if line.startswith('Session:'):
+                session_id = line.split(' ')[1]
+        count = len(listFrames('./pic'))
+        print('%8s %10s %10s %12s' % ('scale', 'frames/s', 'kB/s', 'bytes/frame'))
+        for cseq, scale in enumerate(scales, 2):
+            # 倒放从最后一帧开始（测试时间内到达第一帧后不再发送  帧数偏低）
+            rtsp_socket.send(('PLAY movie RTSP/1.0\nCSeq: %d\nSession: %s\nRange: frames=%d-\nScale: %g\n\n'
+                              % (cseq * 2, session_id, 0 if scale > 0 else count - 1, scale)).encode())
+            rtsp_socket.recv(1024)
+            frames = size = 0
+            end = time.monotonic() + duration
+            while time.monotonic() < end:
+                try:
+                    data = rtp_socket.recv(65535)
+                except socket.timeout:
+                    continue
+                if isRtcp(data):
+                    continue
+                size += len(data)
+                if data[1] & 0x80:
+                    frames += 1
+            rtsp_socket.send(('PAUSE movie RTSP/1.0\nCSeq: %d\nSession: %s\n\n' % (cseq * 2 + 1, session_id)).encode())
+            rtsp_socket.recv(1024)
+            print('%8g %10.1f %10.1f %12.0f' % (scale, frames / duration, size / 1024 / duration, size / max(frames, 1)))
+    finally:
+        rtsp_socket.close()
+        rtp_socket.close()
+        process.kill()
+        process.wait()
+
+
+def benchDecode(argv):
+    """ 客户端帧显示测试：比较写入缓存 JPEG 文件再打开解码与直接在内存中解码的每帧耗时（按帧率定时  统计超出帧间隔的帧） """
+    frame_rates = [30, 60]
+    seconds = 3.0
+    directory = None
+    opts, args = getopt.getopt(argv, 'f:t:d:', ['fps=', 'time=', 'directory='])
+    for opt, arg in opts:
+        if opt in ('-f', '--fps'):
+            frame_rates = [int(rate) for rate in arg.split(',')]
+        elif opt in ('-t', '--time'):
+            seconds = float(arg)
+        elif opt in ('-d', '--directory'):
+            directory = arg
+    frames = []
+    for path in listFrames('./pic'):
+        with open(path, 'rb') as file:
+            frames.append(file.read())
+    if Ingest.Image is None:
+        # 没有 Pillow 时只能比较文件系统往返（写入 + 读回）与内存路径的开销
+        print('@ 未安装 Pillow  只测试缓存文件写入与读回')
+
+    def decode(source):
+        """ 解码一帧（客户端 Image.open / QPixmap.loadFromData 的等价操作） """
+        if Ingest.Image is None:
+            return source.read() if hasattr(source, 'read') else source
+        image = Ingest.Image.open(source)
+        image.load()
+        return image
+
+    def viaFile(frame, cache_name):
+        """ 旧路径：写入缓存 JPEG 文件后按路径打开解码 """
+        with open(cache_name, 'wb') as file:
+            file.write(frame)
+        with open(cache_name, 'rb') as file:
+            return decode(file)
+
+    def inMemory(frame, cache_name):
+        """ 新路径：直接从重组后的帧数据解码 """
+        return decode(io.BytesIO(frame))
+
+    print('%-8s %5s %8s %10s %10s %10s %10s' % ('path', 'fps', 'frames', 'mean(ms)', 'p99(ms)', 'max(ms)', 'late'))
+    with tempfile.TemporaryDirectory(dir=directory) as cache:
+        cache_name = os.path.join(cache, 'ClientCache-0.jpg')
+        for frame_rate in frame_rates:
+            interval = 1 / frame_rate
+            for name, display in (('file', viaFile), ('memory', inMemory)):
+                times = []
+                deadline = time.perf_counter()
+                end = deadline + seconds
+                while deadline < end:
+                    start = time.perf_counter()
+                    display(frames[len(times) % len(frames)], cache_name)
+                    times.append(time.perf_counter() - start)
+                    deadline += interval
+                    delay = deadline - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                times.sort()
+                print('%-8s %5d %8d %10.3f %10.3f %10.3f %10d' % (name, frame_rate, len(times), sum(times) / len(times) * 1e3,
+                                                                   times[int(len(times) * 0.99)] * 1e3, times[-1] * 1e3,
+                                                                   sum(1 for value in times if value > interval)))
+
+
+BENCHMARKS = {
+    'server': benchServer,
+    'pacing': benchPacing,
+    'container': benchContainer,
+    'rtppacket': benchRtpPacket,
+    'batch': benchBatch,
+    'receive': benchReceive,
+    'multicast': benchMulticast,
+    'channel': benchChannel,
+    'rtsp': benchRtsp,
+    'reply': benchReply,
+    'sessions': benchSessions,
+    'ports': benchPorts,
+    'rtcp': benchRtcp,
+    'abr': benchAbr,
+    'ingest': benchIngest,
+    'catalog': benchCatalog,
+    'decode': benchDecode,
+    'seek': benchSeek,
+    'trick': benchTrick,
+}
+
+
+def main(argv):
+    """ 程序主入口 """
+    if not argv or argv[0] not in BENCHMARKS:
+        print('usage: Benchmark.py <%s> [options]' % '|'.join(BENCHMARKS))
+        sys.exit(2)
+    BENCHMARKS[argv[0]](argv[1:])
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -4,22 +4,30 @@ from PIL import Image, ImageTk
 import socket
 import threading
 import sys
-import traceback
-import os
+import getopt
+import time
 import random
+import io
 
 from RtpPacket import RtpPacket
+from RtpFragment import FrameAssembler
+from RtpReceiver import RtpReceiver
+from RtspParser import RtspParser, RtspError, parseTransport
+from PortPool import PortPool, PortExhausted
+from Rtcp import RTCP_SR, ReceptionStats, isRtcp, parseRtcp, buildReceiverReport
 
 DISPLAY_MODE = True
 SERVER_ADDR = '127.0.0.1'
 SERVER_PORT = 9999
+RTSP_RECV_SIZE = 4096
 RTP_MIN_PORT = 5000
 RTP_MAX_PORT = 10000
-RTP_PACKET_MAX_SIZE = 102400
-
-CACHE_FILE_PATH = './cache/'
-CACHE_FILE_NAME = 'cache-'
-CACHE_FILE_EXT = '.jpg'
+RTP_RECV_BUFFER_SIZE = 4 * 1024 * 1024   # RTP/UDP 套接字接收缓冲区大小（受内核 rmem_max 限制）
+RTP_RECV_TIMEOUT = 0.5                   # RTP/UDP 等待超时（秒）  超时后检查线程关闭标识
+RTP_CLOCK_RATE = 90000                   # RTP/UDP 时间戳时钟频率
+RTCP_INTERVAL = 5                        # RTCP 接收方报告间隔（秒）
+MULTICAST_MODE = False                   # 以组播方式接收（同一 URL 的观众共享一个发送流）
+MULTICAST_INTERFACE = '127.0.0.1'        # 加入组播组的接口（默认回环  便于单机测试）
 
 
 class Client:
@@ -51,15 +59,22 @@ class Client:
         self.rtsp_seq = 0                        # RTSP/TCP 请求序列号
         self.rtsp_request = ''                   # RTSP/TCP 请求（字符串）
         self.rtsp_request_code = self.NONE       # RTSP/TCP 请求代码
+        self.rtsp_pending = {}                   # RTSP/TCP 未回复的请求（CSeq -> 请求代码）
         self.rtsp_reply = {}                     # RTSP/TCP 回复（字典）
         self.session_id = '0'                    # RTSP/TCP 会话标识
         # --- RTP/UDP 初始化 ---
         self.rtp_server_port = 0                 # RTP/UDP 服务端端口
         self.rtp_client_port = 0                 # RTP/UDP 客户端端口
         self.rtp_socket = None                   # RTP/UDP 套接字
+        self.rtp_ports = PortPool(RTP_MIN_PORT, RTP_MAX_PORT)  # RTP/RTCP 端口池
+        self.rtp_pool_port = 0                   # 从端口池分配的端口（0 表示未分配）
         self.rtp_thread = None                   # RTP/UDP 当前线程
         self.rtp_play_event = threading.Event()  # RTP/UDP 播放事件
         self.rtp_teardown_flag = False           # RTP/UDP 线程关闭标识
+        self.rtp_receiver = None                 # RTP/UDP 批量接收
+        self.rtp_assembler = FrameAssembler()    # RTP/UDP 帧重组
+        self.rtcp_stats = ReceptionStats(RTP_CLOCK_RATE)  # RTCP 接收统计（丢包  抖动）
+        self.rtcp_ssrc = random.getrandbits(32)  # RTCP 接收方报告的同步信源标识
         self.filename = filename                 # 文件名（URL）
         self.frame_number = 0                    # 当前帧序号
         # --- 客户端 初始化 ---
@@ -83,10 +98,16 @@ class Client:
             if self.state == self.INIT:
                 # 初始化
                 self.frame_number = 0
+                self.rtp_assembler = FrameAssembler()
+                self.rtcp_stats = ReceptionStats(RTP_CLOCK_RATE)
                 # 建立会话
                 self.session_id = self.rtsp_reply['Session']
                 # 建立 RTP 连接 -- 连接的建立移到发送指令时
                 self.rtp_server_port = int(self.rtsp_reply['server_port'])
+                # 组播 -- 改为接收组播地址
+                if 'destination' in self.rtsp_reply:
+                    if not self.joinMulticast(self.rtsp_reply['destination'], int(self.rtsp_reply['port'])):
+                        return False
                 self.rtp_play_event.clear()
                 self.rtp_teardown_flag = False
                 self.rtp_thread = threading.Thread(target=self.handleRtpConnection)
@@ -143,9 +164,7 @@ class Client:
                 # 关闭会话
                 self.session_id = '0'
                 # 关闭 RTP 套接字
-                self.rtp_socket.shutdown(socket.SHUT_RDWR)
-                self.rtp_socket.close()
-                self.rtp_socket = None
+                self.closeRtpConnection()
                 # 设置 RTP 线程关闭标识
                 self.rtp_teardown_flag = True
                 # 设置播放事件  防止线程阻塞无法关闭
@@ -175,12 +194,15 @@ class Client:
         if requestCode == self.SETUP:
             if not self.state == self.INIT:
                 return False
-            while not self.createRtpConnection():   # 建立 RTP 连接
-                pass
+            if not self.createRtpConnection():      # 建立 RTP 连接
+                return False
             self.rtsp_seq += 1
             line_1 = ['SETUP', self.filename, 'RTSP/1.0']
             line_2 = ['CSeq:', str(self.rtsp_seq)]
-            line_3 = ['Transport:', 'RTP/UDP;client_port=' + str(self.rtp_client_port)]
+            if MULTICAST_MODE:
+                line_3 = ['Transport:', 'RTP/UDP;multicast;client_port=' + str(self.rtp_client_port)]
+            else:
+                line_3 = ['Transport:', 'RTP/UDP;client_port=' + str(self.rtp_client_port)]
             self.rtsp_request = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n'
             self.rtsp_request_code = self.SETUP
         # PLAY 命令
@@ -219,134 +241,199 @@ class Client:
             self.rtsp_request_code = self.TEARDOWN
         else:
             return False
-        # 通过RTSP套接字发送命令
-        self.rtsp_socket.send(self.rtsp_request.encode())
+        # 通过RTSP套接字发送命令（空行结束请求）
+        self.rtsp_request += '\n'
+        self.rtsp_pending[str(self.rtsp_seq)] = self.rtsp_request_code
+        self.rtsp_socket.sendall(self.rtsp_request.encode())
         if DISPLAY_MODE:
             print('\n@ Data sent:\n' + self.rtsp_request)
         return True
 
     def recvRtspReply(self):
         """ 接收 RTSP/TCP 回复（循环阻塞） """
+        rtsp_parser = RtspParser()
         # 进行回复处理循环
         while True:
             # *** 接收 RTSP/TCP 回复  recvRtspReply ***
-            reply = self.rtsp_socket.recv(1024)
-            if not reply:
+            data = self.rtsp_socket.recv(RTSP_RECV_SIZE)
+            if not data:
                 break
-            data = reply.decode('utf-8')
-            if DISPLAY_MODE:
-                print('\n@ Data recv:\n' + data)
-            # *** 处理 RTSP/TCP 回复  handleRtspReply ***
             try:
-                # 分析 RTSP/TCP 回复
-                if not self.parseRtspReply(data):
-                    raise KeyError
-                # Code 判断
-                if self.rtsp_reply['Code'] != '200':
-                    raise RuntimeError
-                # session_id 判断
-                if (not self.rtsp_request_code == self.SETUP) and (not self.rtsp_request_code == self.TEARDOWN) and (not self.session_id == self.rtsp_reply['Session']):
-                    raise KeyError
-                # LIST 命令
-                if self.rtsp_request_code == self.LIST:
-                    if not self.__list():
-                        raise RuntimeError
-                # SETUP 命令
-                elif self.rtsp_request_code == self.SETUP:
-                    if not self.__setup():
-                        raise RuntimeError
-                # PLAY 命令
-                elif self.rtsp_request_code == self.PLAY:
-                    pass
-                # PAUSE 命令
-                elif self.rtsp_request_code == self.PAUSE:
-                    pass
-                # TEARDOWN 命令
-                elif self.rtsp_request_code == self.TEARDOWN:
-                    if not self.__teardown():
-                        raise RuntimeError
-                # 其他命令
-                else:
-                    raise NotImplementedError
-            except KeyError:
+                replies = rtsp_parser.feed(data)
+            except RtspError:
                 print('客户端回复格式错误')
-            except NotImplementedError:
-                print('未实现命令')
-            except RuntimeError:
-                print('命令执行错误')
+                break
+            for reply in replies:
+                self.handleRtspReply(reply)
         # 关闭连接套接字
         self.rtsp_socket.shutdown(socket.SHUT_RDWR)
         self.rtsp_socket.close()
 
-    def parseRtspReply(self, data):
+    def handleRtspReply(self, reply):
+        """ 处理一条 RTSP/TCP 回复 """
+        if DISPLAY_MODE:
+            print('\n@ Data recv:\n' + str(reply))
+        # *** 处理 RTSP/TCP 回复  handleRtspReply ***
+        try:
+            # 按 CSeq 找到对应的请求（支持连续发送多个请求  错误回复同样取出  不残留）
+            request_code = self.rtsp_pending.pop(reply.get('CSeq'), self.rtsp_request_code)
+            # 分析 RTSP/TCP 回复
+            if not self.parseRtspReply(reply):
+                raise KeyError
+            # Code 判断
+            if self.rtsp_reply['Code'] != '200':
+                raise RuntimeError
+            # session_id 判断
+            if (not request_code == self.SETUP) and (not request_code == self.TEARDOWN) and (not self.session_id == self.rtsp_reply['Session']):
+                raise KeyError
+            # LIST 命令
+            if request_code == self.LIST:
+                if not self.__list():
+                    raise RuntimeError
+            # SETUP 命令
+            elif request_code == self.SETUP:
+                if not self.__setup():
+                    raise RuntimeError
+            # PLAY 命令
+            elif request_code == self.PLAY:
+                pass
+            # PAUSE 命令
+            elif request_code == self.PAUSE:
+                pass
+            # TEARDOWN 命令
+            elif request_code == self.TEARDOWN:
+                if not self.__teardown():
+                    raise RuntimeError
+            # 其他命令
+            else:
+                raise NotImplementedError
+        except KeyError:
+            print('客户端回复格式错误')
+        except NotImplementedError:
+            print('未实现命令')
+        except RuntimeError:
+            print('命令执行错误')
+
+    def parseRtspReply(self, reply):
         """ 分析 RTSP/TCP 回复 """
         try:
             # 创建参数字典
-            lines = str(data).split('\n')
-            self.rtsp_reply = {'Code': lines[0].split(' ')[1], 'Describe': ' '.join(lines[0].split(' ')[2:])}
+            self.rtsp_reply = {'Code': reply.start_line[1], 'Describe': ' '.join(reply.start_line[2:])}
+            self.rtsp_reply['CSeq'] = reply.headers['cseq']
             if not self.rtsp_reply['Code'] == '200':
                 return True
-            else:
-                self.rtsp_reply['CSeq'] = lines[1].split(' ')[1]
-            # 字段信息提取
-            for line in lines[1:]:
-                words = line.split(' ')
-                # 提取 Session
-                if 'Session' in words[0]:
-                    self.rtsp_reply['Session'] = words[1]
-                # 提取 Transport
-                elif 'Transport' in words[0]:
-                    # 提取 server_port
-                    pattern = re.compile(r'server_port=\s*(\S*?)\s*(;|$)')
-                    result = pattern.search(line)
-                    if result:
-                        self.rtsp_reply['server_port'] = result.group(1)
-                    else:
-                        raise KeyError
+            # 提取 Session
+            if 'Session' in reply:
+                self.rtsp_reply['Session'] = reply.get('Session').split(';')[0].strip()
+            # 提取 Transport
+            if 'Transport' in reply:
+                transport = parseTransport(reply.get('Transport'))
+                # 提取 server_port
+                self.rtsp_reply['server_port'] = transport['server_port']
+                # 提取 destination/port（组播）
+                if 'destination' in transport:
+                    self.rtsp_reply['destination'] = transport['destination']
+                    self.rtsp_reply['port'] = transport['port'].split('-')[0]
             return True
         except KeyError:
             self.rtsp_reply = {}
             return False
 
     def createRtpConnection(self):
-        """ 创建 RTP/UDP 连接 """
-        # 创建 RTP/UDP 套接字
+        """ 创建 RTP/UDP 连接（从端口池分配端口对） """
+        self.closeRtpConnection()
+        try:
+            self.rtp_socket, self.rtp_client_port = self.rtp_ports.open()
+            self.rtp_pool_port = self.rtp_client_port
+            self.rtp_receiver = RtpReceiver(self.rtp_socket, RTP_RECV_BUFFER_SIZE)
+            return True
+        except PortExhausted:
+            tkinter.messagebox.showwarning('Unable to Bind', 'No free RTP port in %d-%d' % (RTP_MIN_PORT, RTP_MAX_PORT))
+            return False
+
+    def closeRtpConnection(self):
+        """ 关闭 RTP/UDP 套接字并归还端口 """
         if self.rtp_socket:
-            self.rtp_socket.shutdown(socket.SHUT_RDWR)
+            # 未连接的 UDP 套接字 shutdown 会抛出 OSError
+            try:
+                self.rtp_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.rtp_socket.close()
             self.rtp_socket = None
+        if self.rtp_pool_port:
+            self.rtp_ports.release(self.rtp_pool_port)
+            self.rtp_pool_port = 0
+
+    def joinMulticast(self, destination, port):
+        """ 创建 RTP/UDP 组播接收套接字并加入组播组 """
+        self.closeRtpConnection()
         self.rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # 同一主机上的多个观众绑定同一组播端口
+        self.rtp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
-            # 绑定套接字  使用随机的端口
-            self.rtp_client_port = random.randint(RTP_MIN_PORT, RTP_MAX_PORT)
-            self.rtp_socket.bind(("", self.rtp_client_port))
+            self.rtp_socket.bind(('', port))
+            self.rtp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                                       socket.inet_aton(destination) + socket.inet_aton(MULTICAST_INTERFACE))
+            self.rtp_client_port = port
+            self.rtp_receiver = RtpReceiver(self.rtp_socket, RTP_RECV_BUFFER_SIZE)
             return True
         except OSError:
-            # TODO 错误处理
-            tkinter.messagebox.showwarning('Unable to Bind', 'Unable to bind PORT=%d' % self.rtp_client_port)
+            tkinter.messagebox.showwarning('Unable to Join', 'Unable to join multicast group %s:%d' % (destination, port))
+            self.rtp_socket.close()
             self.rtp_socket = None
             return False
 
+    def sendReceiverReport(self):
+        """ 发送 RTCP 接收方报告（与 RTP 复用端口  发往服务端 RTP 端口  组播不发送） """
+        if MULTICAST_MODE or not self.rtcp_stats.received:
+            return
+        try:
+            report = buildReceiverReport(self.rtcp_ssrc, [self.rtcp_stats.reportBlock(time.monotonic())])
+            self.rtp_socket.sendto(report, (self.server_addr, self.rtp_server_port))
+        except OSError:
+            pass
+
     def handleRtpConnection(self):
         """ 处理 RTP/UDP 连接 """
-        # TODO
+        rtp_packet = RtpPacket()
+        rtcp_deadline = time.monotonic() + RTCP_INTERVAL
         while True:
             try:
                 self.rtp_play_event.wait()
                 if self.rtp_teardown_flag:
                     raise OSError
-                data, addr = self.rtp_socket.recvfrom(RTP_PACKET_MAX_SIZE)
-                if data:
-                    rtp_packet = RtpPacket()
-                    rtp_packet.decode(data)
-                    current_frame_number = rtp_packet.seqnum()
-                    print('@ ' + str(current_frame_number))
-
-                    if current_frame_number > self.frame_number:
-                        self.frame_number = current_frame_number
-                        self.updateMovie(self.writeFrame(rtp_packet.get_payload()))
-            except OSError:
+                # 一次读取全部已到达的数据包（指向接收环  不复制）
+                for data in self.rtp_receiver.receive(RTP_RECV_TIMEOUT):
+                    arrival = time.monotonic()
+                    # RTCP 发送方报告（与 RTP 复用端口）
+                    if isRtcp(data):
+                        for report in parseRtcp(data):
+                            if report.kind == RTCP_SR:
+                                self.rtcp_stats.onSenderReport(report, arrival)
+                        continue
+                    try:
+                        rtp_packet.decode(data)
+                        self.rtcp_stats.update(rtp_packet.ssrc(), rtp_packet.seqnum(), rtp_packet.timestamp(), arrival)
+                        # 按时间戳重组分片  帧完整时显示
+                        frame = self.rtp_assembler.feed(rtp_packet)
+                    except IndexError:
+                        # 数据包过短  忽略
+                        continue
+                    if frame is not None:
+                        self.frame_number += 1
+                        if DISPLAY_MODE:
+                            print('@ ' + str(self.frame_number))
+                        self.updateMovie(frame)
+                # 定期发送接收方报告
+                if time.monotonic() >= rtcp_deadline:
+                    rtcp_deadline = time.monotonic() + RTCP_INTERVAL
+                    self.sendReceiverReport()
+            except (OSError, ValueError):
+                # 套接字已关闭
                 break
+        if DISPLAY_MODE and self.rtp_receiver is not None:
+            print('@ Receiver: ' + str(self.rtp_receiver.stats()) + ' ' + str(self.rtp_assembler.stats()) + ' ' + str(self.rtcp_stats.stats()))
         print('@ 客户端线程已退出')
 
 
@@ -388,10 +475,6 @@ class Client:
         """ Teardown button handler. """
         self.sendRtspRequest(self.TEARDOWN)
         self.master.destroy()  # Close the gui window
-        try:
-            os.remove(CACHE_FILE_PATH + CACHE_FILE_NAME + str(self.session_id) + CACHE_FILE_EXT)  # Delete the cache image from video
-        except OSError:
-            pass
 
     def pauseMovie(self):
         """Pause button handler."""
@@ -402,22 +485,12 @@ class Client:
         """Play button handler."""
         self.sendRtspRequest(self.PLAY)
 
-    def writeFrame(self, data):
-        """Write the received frame to a temp image file. Return the image file."""
-        cachename = CACHE_FILE_PATH + CACHE_FILE_NAME + str(self.session_id) + CACHE_FILE_EXT
-        while True:
-            try:
-                file = open(cachename, "wb")
-                file.write(data)
-                file.close()
-            except OSError or PermissionError:
-                continue
-            break
-        return cachename
-
-    def updateMovie(self, imageFile):
-        """Update the image file as video frame in the GUI."""
-        photo = ImageTk.PhotoImage(Image.open(imageFile))
+    def updateMovie(self, frame):
+        """ 以重组后的 JPEG 帧数据更新 GUI 画面（直接在内存中解码  解码失败的帧跳过） """
+        try:
+            photo = ImageTk.PhotoImage(Image.open(io.BytesIO(frame)))
+        except OSError:
+            return
         self.label.configure(image=photo, height=288)
         self.label.image = photo
 
@@ -430,11 +503,23 @@ class Client:
             self.playMovie()
 
 
-def main():
+def main(argv):
+    """ 程序主入口 """
+    global MULTICAST_MODE, MULTICAST_INTERFACE
+    try:
+        opts, args = getopt.getopt(argv, 'm', ['multicast', 'multicast-if='])
+    except getopt.GetoptError:
+        print('usage: Client.py [--multicast] [--multicast-if <interface ip>]')
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ('-m', '--multicast'):
+            MULTICAST_MODE = True
+        elif opt == '--multicast-if':
+            MULTICAST_INTERFACE = arg
     root = Tk()
     client = Client(root, '127.0.0.1', SERVER_PORT, "")
     root.mainloop()
 
 
 if __name__ == '__main__':
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+
+class FrameCache:
+    """ 帧缓存类（全部会话共享  按字节数限制容量  LRU 淘汰） """
+
+    def __init__(self, capacity):
+        """ 类构造方法 """
+        self.capacity = capacity          # 容量上限（字节）
+        self.frames = OrderedDict()       # 路径 -> 帧数据（按最近使用排序）
+        self.lock = threading.Lock()      # 多线程访问锁
+        self.size = 0                     # 当前缓存字节数
+        self.hits = 0                     # 命中次数
+        self.misses = 0                   # 未命中次数
+        self.evictions = 0                # 淘汰次数
+        self.loaded_bytes = 0             # 从磁盘读取的累计字节数
+
+    def get(self, path):
+        """ 读取帧数据  未命中时从磁盘加载 """
+        with self.lock:
+            data = self.frames.get(path)
+            if data is not None:
+                self.frames.move_to_end(path)
+                self.hits += 1
+                return data
+            self.misses += 1
+        # 在锁外读取文件  避免阻塞其他会话
+        data = self.load(path)
+        with self.lock:
+            self.loaded_bytes += len(data)
+            self.insert(path, data)
+        return data
+
+    def prewarm(self, paths):
+        """ 预加载帧数据  直到缓存写满  返回已加载帧数 """
+        count = 0
+        for path in paths:
+            with self.lock:
+                if path in self.frames:
+                    continue
+            data = self.load(path)
+            with self.lock:
+                if self.size + len(data) > self.capacity:
+                    break
+                self.loaded_bytes += len(data)
+                self.insert(path, data)
+            count += 1
+        return count
+
+    def insert(self, path, data):
+        """ 写入缓存并淘汰最久未使用的帧（调用方需持有锁） """
+        if len(data) > self.capacity or path in self.frames:
+            return
+        self.frames[path] = data
+        self.size += len(data)
+        while self.size > self.capacity:
+            evicted_path, evicted_data = self.frames.popitem(last=False)
+            self.size -= len(evicted_data)
+            self.evictions += 1
+
+    @staticmethod
+    def load(path):
+        """ 从磁盘读取帧数据 """
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def stats(self):
+        """ 返回缓存统计 """
+        with self.lock:
+            total = self.hits + self.misses
+            return {'frames': len(self.frames), 'bytes': self.size, 'capacity': self.capacity,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'loaded_bytes': self.loaded_bytes, 'hit_ratio': self.hits / total if total else 0.0}
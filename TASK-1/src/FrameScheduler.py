@@ -0,0 +1,196 @@
+import heapq
+import itertools
+import threading
+import asyncio
+import time
+import traceback
+
+
+class JitterStats:
+    """ 会话发送抖动统计类 """
+
+    def __init__(self):
+        """ 类构造方法 """
+        self.frames = 0           # 已发送帧数
+        self.skipped = 0          # 因过载跳过的发送时刻数
+        self.lateness_mean = 0.0  # 相对计划时刻的平均延迟（秒）
+        self.lateness_m2 = 0.0    # 延迟方差累计量（Welford 算法）
+        self.lateness_max = 0.0   # 最大延迟（秒）
+        self.jitter = 0.0         # 发送间隔抖动（RFC 3550 平滑估计，秒）
+        self.last_send = None     # 上次发送时刻
+
+    def update(self, lateness, now, interval):
+        """ 记录一次发送 """
+        self.frames += 1
+        delta = lateness - self.lateness_mean
+        self.lateness_mean += delta / self.frames
+        self.lateness_m2 += delta * (lateness - self.lateness_mean)
+        if lateness > self.lateness_max:
+            self.lateness_max = lateness
+        if self.last_send is not None:
+            self.jitter += (abs(now - self.last_send - interval) - self.jitter) / 16
+        self.last_send = now
+
+    def summary(self):
+        """ 返回统计摘要（毫秒） """
+        std = (self.lateness_m2 / self.frames) ** 0.5 if self.frames else 0.0
+        return {'frames': self.frames, 'skipped': self.skipped, 'mean_ms': self.lateness_mean * 1000,
+                'std_ms': std * 1000, 'max_ms': self.lateness_max * 1000, 'jitter_ms': self.jitter * 1000}
+
+
+class FrameScheduler:
+    """ 帧调度器类（全部会话共享一个定时器  每个时刻统一发送到期帧）
+
+    会话可按各自媒体的帧率指定帧间隔  相同帧间隔的会话在同一网格时刻被唤醒
+    """
+
+    def __init__(self, interval, clock=time.monotonic, flush=None):
+        """ 类构造方法 """
+        self.interval = interval                  # 默认帧间隔（秒）
+        self.clock = clock                        # 单调时钟
+        self.flush = flush                        # 每个时刻发送结束后的回调（批量发送）
+        self.origin = clock()                     # 时刻网格原点
+        self.heap = []                            # 到期堆 [deadline, seq, session, valid, interval]
+        self.entries = {}                         # 会话 -> 堆条目
+        self.stats = {}                           # 会话 -> JitterStats
+        self.counter = itertools.count()          # 堆条目序号（保证同时刻有序）
+        self.condition = threading.Condition()    # 线程模式唤醒条件
+        self.async_wakeup = None                  # 协程模式唤醒事件
+        self.running = False
+
+    def nextTick(self, now, interval=None):
+        """ 返回 now 之后的下一个网格时刻  使相同帧间隔的会话在同一时刻被唤醒 """
+        interval = interval or self.interval
+        ticks = int((now - self.origin) / interval) + 1
+        return self.origin + ticks * interval
+
+    def schedule(self, session, interval=None):
+        """ 开始调度会话（PLAY  interval 为会话的帧间隔  默认为调度器的帧间隔）  已在调度中则忽略 """
+        interval = interval or self.interval
+        with self.condition:
+            if session in self.entries:
+                return
+            entry = [self.nextTick(self.clock(), interval), next(self.counter), session, True, interval]
+            self.entries[session] = entry
+            self.stats.setdefault(session, JitterStats())
+            heapq.heappush(self.heap, entry)
+            self.condition.notify()
+        if self.async_wakeup is not None:
+            self.async_wakeup.set()
+
+    def unschedule(self, session):
+        """ 停止调度会话（PAUSE/TEARDOWN）  统计保留 """
+        with self.condition:
+            entry = self.entries.pop(session, None)
+            if entry is not None:
+                entry[3] = False
+
+    def discard(self, session):
+        """ 停止调度并删除会话统计  返回统计摘要 """
+        self.unschedule(session)
+        with self.condition:
+            stats = self.stats.pop(session, None)
+        return stats.summary() if stats else None
+
+    def runDue(self):
+        """ 发送所有到期帧  返回下一个到期时刻（无会话时为 None）
+
+        到期条目在锁内取出  发送在锁外进行（发送期间 schedule / unschedule 不被阻塞）  发送后在锁内重新排期
+        """
+        with self.condition:
+            now = self.clock()
+            due = []
+            while self.heap and self.heap[0][0] <= now:
+                entry = heapq.heappop(self.heap)
+                if entry[3]:
+                    due.append(entry)
+        failed = set()
+        for entry in due:
+            if not entry[3]:
+                # 发送前已被 unschedule
+                continue
+            session = entry[2]
+            try:
+                session.sendRtpFrame()
+            except BlockingIOError:
+                # 发送缓冲区已满  丢弃本帧
+                pass
+            except OSError:
+                # 套接字已失效  停止调度
+                failed.add(session)
+            except Exception:
+                # 单个会话的异常不影响其他会话与调度线程  停止调度该会话
+                traceback.print_exc()
+                failed.add(session)
+        if self.flush is not None:
+            self.flush()
+        with self.condition:
+            for entry in due:
+                deadline, session, interval = entry[0], entry[2], entry[4]
+                if self.entries.get(session) is not entry:
+                    # 发送期间已被 unschedule（或重新 schedule）
+                    continue
+                if session in failed:
+                    self.entries.pop(session)
+                    continue
+                stats = self.stats[session]
+                stats.update(now - deadline, now, interval)
+                # 按绝对时刻推进  不累积发送耗时造成的漂移
+                deadline += interval
+                if deadline <= now:
+                    # 落后超过一帧  跳到下一个网格时刻  避免突发补发
+                    stats.skipped += int((now - deadline) / interval) + 1
+                    deadline = self.nextTick(now, interval)
+                entry = [deadline, next(self.counter), session, True, interval]
+                self.entries[session] = entry
+                heapq.heappush(self.heap, entry)
+            # 清理堆顶已失效条目
+            while self.heap and not self.heap[0][3]:
+                heapq.heappop(self.heap)
+            return self.heap[0][0] if self.heap else None
+
+    def run(self):
+        """ 线程模式调度循环（循环阻塞） """
+        self.running = True
+        while self.running:
+            self.runDue()
+            with self.condition:
+                # 在持有锁时重新读取堆顶  防止错过 schedule 的唤醒
+                deadline = self.heap[0][0] if self.heap else None
+                if deadline is None:
+                    self.condition.wait()
+                else:
+                    timeout = deadline - self.clock()
+                    if timeout > 0:
+                        self.condition.wait(timeout)
+
+    def start(self):
+        """ 在后台线程中启动调度循环 """
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    async def runAsync(self):
+        """ 协程模式调度循环 """
+        self.async_wakeup = asyncio.Event()
+        self.running = True
+        while self.running:
+            deadline = self.runDue()
+            self.async_wakeup.clear()
+            if deadline is None:
+                await self.async_wakeup.wait()
+            else:
+                timeout = deadline - self.clock()
+                if timeout > 0:
+                    try:
+                        await asyncio.wait_for(self.async_wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+
+    def stop(self):
+        """ 停止调度循环 """
+        self.running = False
+        with self.condition:
+            self.condition.notify()
+        if self.async_wakeup is not None:
+            self.async_wakeup.set()
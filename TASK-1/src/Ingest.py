@@ -0,0 +1,161 @@
+import io
+import os
+import sys
+import time
+import getopt
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from MediaContainer import MediaContainer, ContainerWriter, MANIFEST_EXT, listFrames, writeManifest
+from QualityLadder import LADDER_RUNGS, rungPath
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None    # 只有需要重新编码的档位依赖 Pillow（原始档位直接复制）
+
+INGEST_FPS = 10             # 默认帧率（原始图片序列不含帧率）
+INGEST_CHUNK_SIZE = 8       # 每个任务处理的帧数（减少进程间通信次数）
+INGEST_PENDING_CHUNKS = 4   # 每个工作进程同时在途的最大任务数（已编码未写入的帧数有上限）
+
+source_frames = None        # 工作进程中的原始帧来源（帧文件路径列表或打包媒体文件）
+
+
+def transcode(data, quality, scale):
+    """ 重新编码一帧 JPEG（按比例缩放后以指定质量压缩）  原始档位直接返回原数据 """
+    if quality is None and scale == 1.0:
+        return bytes(data)
+    image = Image.open(io.BytesIO(data))
+    if scale != 1.0:
+        image = image.resize((max(1, int(image.width * scale)), max(1, int(image.height * scale))), Image.BILINEAR)
+    output = io.BytesIO()
+    image.convert('RGB').save(output, 'JPEG', quality=quality or 90)
+    return output.getvalue()
+
+
+def openSource(source):
+    """ 打开原始帧来源（帧目录返回路径列表  否则返回打包媒体文件） """
+    if os.path.isdir(source):
+        return listFrames(source)
+    return MediaContainer(source)
+
+
+def initWorker(source):
+    """ 工作进程初始化：各进程自行打开原始帧来源（任务只传递帧序号） """
+    global source_frames
+    source_frames = openSource(source)
+
+
+def readSourceFrame(index):
+    """ 读取第 index 帧原始数据 """
+    if isinstance(source_frames, list):
+        with open(source_frames[index], 'rb') as file:
+            return file.read()
+    return source_frames.frame(index)
+
+
+def transcodeFrame(index, rungs):
+    """ 将第 index 帧编码为各档位  返回各档位帧数据列表（工作进程中执行） """
+    data = readSourceFrame(index)
+    return [transcode(data, quality, scale) for name, quality, scale in rungs]
+
+
+def transcodeChunk(start, stop, rungs):
+    """ 将第 start 至 stop - 1 帧编码为各档位  返回各帧的档位帧数据列表（工作进程中执行） """
+    return [transcodeFrame(index, rungs) for index in range(start, stop)]
+
+
+def writeChunk(writers, chunk):
+    """ 将一个任务的编码结果按顺序逐帧写入各档位文件 """
+    for encoded in chunk:
+        for writer, frame in zip(writers, encoded):
+            writer.write(frame)
+
+
+def ingest(source, base, rungs=LADDER_RUNGS, fps=INGEST_FPS, jobs=None):
+    """ 导入原始帧序列：多进程编码各质量档位  写入打包媒体文件与媒体清单  返回媒体清单
+
+    帧按序号分块提交给进程池（同时在途的分块数有上限）  结果按顺序逐帧写入各档位文件（内存占用与帧数无关）
+    出错时删除未完成的档位文件
+    """
+    if not rungs:
+        raise ValueError('no quality rungs selected')
+    if Image is None and any(quality is not None or scale != 1.0 for name, quality, scale in rungs):
+        raise RuntimeError('re-encoding rungs requires Pillow (use --rungs %s to copy only)' % LADDER_RUNGS[0][0])
+    frames = openSource(source)
+    frame_count = len(frames)
+    if isinstance(frames, MediaContainer):
+        frames.close()
+    if not frame_count:
+        raise ValueError('%s contains no frames' % source)
+    writers = []
+    start = time.perf_counter()
+    try:
+        for name, quality, scale in rungs:
+            writers.append(ContainerWriter(rungPath(base, name), frame_count, fps))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=initWorker, initargs=(source,)) as executor:
+            max_pending = INGEST_PENDING_CHUNKS * (jobs or os.cpu_count() or 1)
+            pending = deque()
+            for chunk_start in range(0, frame_count, INGEST_CHUNK_SIZE):
+                pending.append(executor.submit(transcodeChunk, chunk_start, min(chunk_start + INGEST_CHUNK_SIZE, frame_count), rungs))
+                if len(pending) >= max_pending:
+                    writeChunk(writers, pending.popleft().result())
+            while pending:
+                writeChunk(writers, pending.popleft().result())
+        for writer in writers:
+            writer.close()
+    except BaseException:
+        for writer in writers:
+            writer.file.close()
+            try:
+                os.remove(writer.path)
+            except OSError:
+                pass
+        raise
+    elapsed = time.perf_counter() - start
+    manifest = {'name': os.path.basename(base), 'fps': fps, 'frames': frame_count, 'rungs': []}
+    for (name, quality, scale), writer in zip(rungs, writers):
+        size = sum(writer.sizes)
+        manifest['rungs'].append({'name': name, 'quality': quality, 'scale': scale,
+                                  'path': os.path.basename(writer.path), 'bytes': size,
+                                  'kbps': round(size * 8 * fps / frame_count / 1000, 1), 'max_frame': max(writer.sizes)})
+    manifest['ingest_seconds'] = round(elapsed, 3)
+    writeManifest(base + MANIFEST_EXT, manifest)
+    return manifest
+
+
+def main(argv):
+    """ 程序主入口 """
+    fps = INGEST_FPS
+    jobs = None
+    rungs = LADDER_RUNGS
+    try:
+        opts, args = getopt.getopt(argv, 'f:j:r:', ['fps=', 'jobs=', 'rungs='])
+    except getopt.GetoptError:
+        args = []
+    if len(args) != 2:
+        print('usage: Ingest.py [--fps <fps>] [--jobs <processes>] [--rungs <%s>] <frame directory|container> <output base>'
+              % ','.join(name for name, quality, scale in LADDER_RUNGS))
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ('-f', '--fps'):
+            fps = int(arg)
+        elif opt in ('-j', '--jobs'):
+            jobs = int(arg)
+        elif opt in ('-r', '--rungs'):
+            names = arg.split(',')
+            rungs = [rung for rung in LADDER_RUNGS if rung[0] in names]
+    try:
+        manifest = ingest(args[0], args[1], rungs, fps, jobs)
+    except (RuntimeError, ValueError, OSError) as error:
+        print('@ %s' % error)
+        sys.exit(1)
+    print('@ %d 帧  %d fps  耗时 %.2f 秒 (%.0f 帧/秒)' % (manifest['frames'], fps, manifest['ingest_seconds'],
+                                                  manifest['frames'] / max(manifest['ingest_seconds'], 1e-9)))
+    for rung in manifest['rungs']:
+        print('@ %-8s %8.1f kbps  最大帧 %6d bytes -> %s' % (rung['name'], rung['kbps'], rung['max_frame'], rung['path']))
+    print('@ 媒体清单 -> %s%s' % (args[1], MANIFEST_EXT))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
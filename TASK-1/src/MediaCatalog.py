@@ -0,0 +1,224 @@
+import os
+import sys
+import mmap
+import json
+import struct
+from collections import namedtuple
+
+from MediaContainer import MediaContainer, CONTAINER_EXT, MANIFEST_EXT, listFrames, readManifest
+
+# 文件格式（小端序）：
+#   文件头   magic(4s) version(H) reserved(H) item_count(I) keys_size(I) text_size(I)
+#   条目表   item_count 个条目（按检索键排序）：key_offset(I) text_offset(I) frame_count(I) frame_rate(H  0 表示未知)
+#            keyframe_interval(H) bytes(Q)
+#   键区     各条目名称的小写形式（检索键）以 '\n' 结束依次相连（子串检索直接在整个键区上查找）
+#   文本区   各条目 名称 \t 媒体路径（相对于目录文件） \t 档位名称（逗号分隔） \n 依次相连（UTF-8）
+CATALOG_MAGIC = b'RTPC'
+CATALOG_VERSION = 1
+CATALOG_HEADER = struct.Struct('<4sHHIII')
+CATALOG_ENTRY = struct.Struct('<IIIHHQ')
+CATALOG_EXT = '.rtpc'
+CATALOG_SOURCE_VARIANT = 'source'   # 散列帧文件 / 打包媒体文件只有原始档位
+
+# 媒体条目：名称  媒体路径（帧目录 / 打包媒体文件 / 媒体清单）  档位名称  帧数  帧率  关键帧间隔  原始档位字节数
+CatalogItem = namedtuple('CatalogItem', 'name path variants frame_count frame_rate keyframe_interval bytes')
+
+
+class MediaNotFound(LookupError):
+    """ 媒体目录中没有所请求的媒体 """
+    pass
+
+
+class MediaCatalog:
+    """ 媒体目录类（mmap 映射  启动时只读取文件头  按名称二分查找  前缀 / 子串检索与分页） """
+
+    def __init__(self, path):
+        """ 类构造方法 """
+        self.path = path
+        self.directory = os.path.dirname(path)
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, reserved, self.item_count, keys_size, text_size = CATALOG_HEADER.unpack_from(self.mmap, 0)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            self.mmap.close()
+            raise ValueError('%s is not a media catalog' % path)
+        self.keys_start = CATALOG_HEADER.size + self.item_count * CATALOG_ENTRY.size   # 键区起始偏移
+        self.keys_end = self.keys_start + keys_size                                     # 键区结束偏移
+        self.text_start = self.keys_end                                                 # 文本区起始偏移
+
+    def __len__(self):
+        """ 返回条目数 """
+        return self.item_count
+
+    def entry(self, index):
+        """ 返回第 index 个条目的 (键偏移, 文本偏移, 帧数, 帧率, 关键帧间隔, 字节数) """
+        return CATALOG_ENTRY.unpack_from(self.mmap, CATALOG_HEADER.size + index * CATALOG_ENTRY.size)
+
+    def key(self, index):
+        """ 返回第 index 个条目的检索键（bytes） """
+        start = self.keys_start + self.entry(index)[0]
+        return self.mmap[start:self.mmap.find(b'\n', start, self.keys_end)]
+
+    def name(self, index):
+        """ 返回第 index 个条目的名称 """
+        start = self.text_start + self.entry(index)[1]
+        return self.mmap[start:self.mmap.find(b'\t', start)].decode()
+
+    def item(self, index):
+        """ 返回第 index 个条目 """
+        key_offset, text_offset, frame_count, frame_rate, keyframe_interval, size = self.entry(index)
+        start = self.text_start + text_offset
+        name, path, variants = self.mmap[start:self.mmap.find(b'\n', start)].decode().split('\t')
+        return CatalogItem(name, os.path.join(self.directory, path), tuple(variants.split(',')),
+                           frame_count, frame_rate, keyframe_interval, size)
+
+    def bisect(self, key):
+        """ 返回第一个检索键不小于 key 的条目序号 """
+        low, high = 0, self.item_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, name):
+        """ 按名称查找条目（不区分大小写）  不存在时返回 None """
+        key = searchKey(name)
+        index = self.bisect(key)
+        if index < self.item_count and self.key(index) == key:
+            return self.item(index)
+        return None
+
+    def indexAt(self, position):
+        """ 返回键区偏移 position 所在的条目序号（条目表按键偏移递增） """
+        low, high = 0, self.item_count
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.keys_start + self.entry(middle)[0] <= position:
+                low = middle
+            else:
+                high = middle
+        return low
+
+    def search(self, query='', prefix=False, offset=0, limit=None):
+        """ 检索名称包含（prefix 为真时以其开头）query 的条目（不区分大小写）  返回 (匹配总数, 第 offset 起最多 limit 个条目名称) """
+        key = searchKey(query)
+        if prefix or not key:
+            # 前缀检索 -- 检索键有序  匹配条目连续（UTF-8 中不出现 0xFF 字节  可作为上界）
+            first = self.bisect(key)
+            total = self.bisect(key + b'\xff') - first
+            indexes = range(first + offset, first + min(total, offset + (total if limit is None else limit)))
+        else:
+            # 子串检索 -- 在整个键区上查找（每个条目只计一次  键中不含 '\n'  匹配不会跨条目）  只为本页的匹配查找条目序号
+            if b'\n' in key:
+                return 0, []
+            positions = []
+            position = self.mmap.find(key, self.keys_start, self.keys_end)
+            while position >= 0:
+                positions.append(position)
+                position = self.mmap.find(key, self.mmap.find(b'\n', position, self.keys_end) + 1, self.keys_end)
+            total = len(positions)
+            indexes = [self.indexAt(position) for position in positions[offset:None if limit is None else offset + limit]]
+        return total, [self.name(index) for index in indexes]
+
+    def close(self):
+        """ 关闭映射 """
+        self.mmap.close()
+
+
+def searchKey(name):
+    """ 返回名称的检索键（小写 UTF-8） """
+    return name.lower().encode()
+
+
+def scanMedia(directory):
+    """ 扫描目录中的媒体：媒体清单  未被清单引用的打包媒体文件  含帧文件的子目录  返回条目列表（路径为绝对路径） """
+    items = []
+    referenced = set()
+    for root, directories, files in os.walk(directory):
+        directories.sort()
+        name_prefix = os.path.relpath(root, directory).replace(os.sep, '/')
+        name_prefix = '' if name_prefix == '.' else name_prefix + '/'
+        # 媒体清单（Ingest.py 生成）-- 各档位文件不再单独列出
+        for filename in sorted(files):
+            if filename.endswith(MANIFEST_EXT):
+                path = os.path.join(root, filename)
+                try:
+                    manifest = readManifest(path)
+                    rungs = manifest['rungs']
+                    items.append(CatalogItem(name_prefix + filename[:-len(MANIFEST_EXT)], path, tuple(rung['name'] for rung in rungs),
+                                             manifest['frames'], manifest['fps'], 1, rungs[0]['bytes']))
+                except (ValueError, KeyError, IndexError, TypeError):
+                    continue    # 不是媒体清单的 JSON 文件
+                referenced.update(os.path.abspath(rung['path']) for rung in rungs)
+        # 打包媒体文件
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            if filename.endswith(CONTAINER_EXT) and os.path.abspath(path) not in referenced:
+                container = MediaContainer(path)
+                size = container.frameRange(len(container) - 1)[1] - container.frameRange(0)[0] if len(container) else 0
+                items.append(CatalogItem(name_prefix + filename[:-len(CONTAINER_EXT)], path, (CATALOG_SOURCE_VARIANT,),
+                                         len(container), container.frame_rate, 1, size))
+                container.close()
+        # 帧目录（pic-%05d.jpg 序列）
+        frames = listFrames(root)
+        if frames and root != directory:
+            items.append(CatalogItem(name_prefix[:-1], root, (CATALOG_SOURCE_VARIANT,), len(frames), 0, 1,
+                                     sum(os.path.getsize(frame) for frame in frames)))
+    return items
+
+
+def build(items, output):
+    """ 将媒体条目写入目录文件（按检索键排序  名称不区分大小写唯一）  返回条目数 """
+    directory = os.path.dirname(os.path.abspath(output))
+    items = sorted(items, key=lambda item: searchKey(item.name))
+    entries, keys, text = [], [], []
+    keys_size = text_size = 0
+    for index, item in enumerate(items):
+        if '\t' in item.name or '\n' in item.name or not item.name:
+            raise ValueError('invalid media name %r' % item.name)
+        if index and searchKey(item.name) == searchKey(items[index - 1].name):
+            raise ValueError('duplicate media name %r' % item.name)
+        key = searchKey(item.name) + b'\n'
+        line = ('%s\t%s\t%s\n' % (item.name, os.path.relpath(os.path.abspath(item.path), directory),
+                                  ','.join(item.variants))).encode()
+        entries.append(CATALOG_ENTRY.pack(keys_size, text_size, item.frame_count, item.frame_rate,
+                                          item.keyframe_interval, item.bytes))
+        keys.append(key)
+        text.append(line)
+        keys_size += len(key)
+        text_size += len(line)
+    with open(output, 'wb') as file:
+        file.write(CATALOG_HEADER.pack(CATALOG_MAGIC, CATALOG_VERSION, 0, len(items), keys_size, text_size))
+        file.writelines(entries)
+        file.writelines(keys)
+        file.writelines(text)
+    return len(items)
+
+
+def duration(item, default_frame_rate):
+    """ 返回条目时长（秒  帧率未知时按 default_frame_rate 计算） """
+    return item.frame_count / (item.frame_rate or default_frame_rate)
+
+
+def main(argv):
+    """ 程序主入口 """
+    if len(argv) == 3 and argv[0] == 'build':
+        count = build(scanMedia(argv[1]), argv[2])
+        print('@ 已索引 %d 个媒体 -> %s (%d bytes)' % (count, argv[2], os.path.getsize(argv[2])))
+    elif len(argv) in (2, 3) and argv[0] in ('search', 'prefix'):
+        catalog = MediaCatalog(argv[1])
+        total, names = catalog.search(argv[2] if len(argv) == 3 else '', argv[0] == 'prefix', 0, 20)
+        print('@ 匹配 %d 个媒体' % total)
+        for name in names:
+            print(json.dumps(catalog.lookup(name)._asdict(), ensure_ascii=False))
+    else:
+        print('usage: MediaCatalog.py build <media directory> <catalog%s>\n'
+              '       MediaCatalog.py search|prefix <catalog> [<query>]' % CATALOG_EXT)
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,61 @@
+import time
+import threading
+from collections import OrderedDict
+
+from RtpPacket import RtpPacket, RTP_VERSION, PT_JPEG
+from RtpFragment import fragmentFrame
+
+CHANNEL_CACHE_FRAMES = 256   # 每个频道缓存的已切分帧数（覆盖整段媒体时各会话任意位置均命中）
+
+
+class MediaChannel:
+    """ 媒体频道类（同一媒体的全部会话共享  每帧只读取切分编码一次  会话只改写序列号/时间戳/SSRC） """
+
+    def __init__(self, url, read_frame, frame_count, chunk_size, frame_rate, cache_frames=CHANNEL_CACHE_FRAMES):
+        """ 类构造方法 """
+        self.url = url                      # 文件名（URL）
+        self.read_frame = read_frame        # 读取帧数据的函数（帧序号 -> 帧数据）
+        self.frame_count = frame_count      # 媒体总帧数
+        self.chunk_size = chunk_size        # 分片负载大小
+        self.frame_rate = frame_rate        # 帧率（直播位置按频道打开后的时间推算）
+        self.cache_frames = cache_frames    # 缓存帧数上限
+        self.frames = OrderedDict()         # 帧序号 -> 已编码数据包列表（按最近使用排序）
+        self.lock = threading.Lock()        # 多线程访问锁
+        self.start_time = time.monotonic()  # 频道打开时刻
+        self.subscribers = 0                # 订阅会话数
+        self.builds = 0                     # 切分编码次数
+        self.hits = 0                       # 命中次数
+
+    def liveFrame(self):
+        """ 返回当前直播位置（频道打开后经过的帧数） """
+        return int((time.monotonic() - self.start_time) * self.frame_rate)
+
+    def packets(self, frame_number):
+        """ 返回第 frame_number 帧的已编码数据包列表
+
+        头部中的序列号/时间戳/SSRC 为占位值  发送方需调用 restamp 改写后立即发送（或由批量发送复制头部）
+        """
+        index = frame_number % self.frame_count
+        with self.lock:
+            packets = self.frames.get(index)
+            if packets is not None:
+                self.frames.move_to_end(index)
+                self.hits += 1
+                return packets
+        frame = self.read_frame(index)
+        packets = []
+        for offset, chunk, marker in fragmentFrame(frame, self.chunk_size):
+            rtp_packet = RtpPacket()
+            rtp_packet.encode_into(RTP_VERSION, 0, 0, 0, marker, PT_JPEG, 0, 0, chunk, 0, (offset, len(frame)))
+            packets.append(rtp_packet)
+        with self.lock:
+            self.builds += 1
+            self.frames[index] = packets
+            while len(self.frames) > self.cache_frames:
+                self.frames.popitem(last=False)
+        return packets
+
+    def stats(self):
+        """ 返回频道统计 """
+        with self.lock:
+            return {'subscribers': self.subscribers, 'frames': len(self.frames), 'builds': self.builds, 'hits': self.hits}
@@ -0,0 +1,182 @@
+import os
+import sys
+import mmap
+import json
+import struct
+
+# 文件格式（小端序）：
+#   文件头   magic(4s) version(H) frame_rate(H  0 表示未知) frame_count(I)
+#   索引表   (frame_count + 1) 个 Q  各帧在文件中的起始偏移  最后一项为数据结束偏移
+#   帧数据   各帧 JPEG 数据依次相连
+CONTAINER_MAGIC = b'RTPM'
+CONTAINER_VERSION = 1
+CONTAINER_HEADER = struct.Struct('<4sHHI')
+CONTAINER_OFFSET = struct.Struct('<QQ')
+CONTAINER_EXT = '.rtpm'
+MANIFEST_EXT = '.json'      # 媒体清单（Ingest.py 生成  记录帧数 / 帧率 / 各质量档位的媒体文件）
+
+FRAME_PATTERN = 'pic-%05d.jpg'
+
+
+class MediaContainer:
+    """ 打包媒体文件类（mmap 映射  按索引返回零拷贝帧切片） """
+
+    def __init__(self, path):
+        """ 类构造方法 """
+        self.path = path
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.frame_rate, self.frame_count = CONTAINER_HEADER.unpack_from(self.mmap, 0)
+        if magic != CONTAINER_MAGIC or version != CONTAINER_VERSION:
+            self.mmap.close()
+            raise ValueError('%s is not a media container' % path)
+        self.view = memoryview(self.mmap)
+
+    def __len__(self):
+        """ 返回帧总数 """
+        return self.frame_count
+
+    def frameRange(self, index):
+        """ 返回第 index 帧的 (起始偏移, 结束偏移) """
+        if not 0 <= index < self.frame_count:
+            raise IndexError(index)
+        return CONTAINER_OFFSET.unpack_from(self.mmap, CONTAINER_HEADER.size + index * 8)
+
+    def frame(self, index):
+        """ 返回第 index 帧数据（memoryview  不复制） """
+        start, end = self.frameRange(index)
+        return self.view[start:end]
+
+    def frameSize(self, index):
+        """ 返回第 index 帧字节数 """
+        start, end = self.frameRange(index)
+        return end - start
+
+    def close(self):
+        """ 关闭映射（需先释放所有帧切片） """
+        self.view.release()
+        self.mmap.close()
+
+
+def listFrames(directory, pattern=FRAME_PATTERN):
+    """ 列出目录中从 0 开始连续编号的帧文件 """
+    paths = []
+    while os.path.exists(os.path.join(directory, pattern % len(paths))):
+        paths.append(os.path.join(directory, pattern % len(paths)))
+    return paths
+
+
+def writeHeader(file, sizes, frame_rate=0):
+    """ 写入文件头与索引表（sizes 为各帧字节数） """
+    offset = CONTAINER_HEADER.size + (len(sizes) + 1) * 8
+    offsets = []
+    for size in sizes:
+        offsets.append(offset)
+        offset += size
+    offsets.append(offset)
+    file.write(CONTAINER_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION, frame_rate, len(sizes)))
+    file.write(struct.pack('<%dQ' % len(offsets), *offsets))
+
+
+class ContainerWriter:
+    """ 打包媒体文件顺序写入类（帧数已知  先预留索引表  逐帧写入数据  关闭时回填索引） """
+
+    def __init__(self, path, frame_count, frame_rate=0):
+        """ 类构造方法 """
+        self.path = path
+        self.frame_count = frame_count
+        self.frame_rate = frame_rate
+        self.sizes = []                     # 已写入各帧字节数
+        self.file = open(path, 'wb')
+        self.file.seek(CONTAINER_HEADER.size + (frame_count + 1) * 8)
+
+    def write(self, frame):
+        """ 写入下一帧 """
+        self.file.write(frame)
+        self.sizes.append(len(frame))
+
+    def close(self):
+        """ 回填文件头与索引表并关闭文件 """
+        try:
+            if len(self.sizes) != self.frame_count:
+                raise ValueError('%s: wrote %d frames, expected %d' % (self.path, len(self.sizes), self.frame_count))
+            self.file.seek(0)
+            writeHeader(self.file, self.sizes, self.frame_rate)
+        finally:
+            self.file.close()
+
+    def __enter__(self):
+        """ with 语句入口 """
+        return self
+
+    def __exit__(self, kind, value, trace):
+        """ with 语句出口（出错时只关闭文件  不回填索引） """
+        if kind is None:
+            self.close()
+        else:
+            self.file.close()
+
+
+def pack(paths, output, frame_rate=0):
+    """ 将帧文件打包为媒体文件  返回帧数 """
+    with ContainerWriter(output, len(paths), frame_rate) as writer:
+        for path in paths:
+            with open(path, 'rb') as frame_file:
+                writer.write(frame_file.read())
+    return len(paths)
+
+
+def packFrames(frames, output, frame_rate=0):
+    """ 将内存中的帧数据打包为媒体文件  返回帧数 """
+    with ContainerWriter(output, len(frames), frame_rate) as writer:
+        for frame in frames:
+            writer.write(frame)
+    return len(frames)
+
+
+def writeManifest(path, manifest):
+    """ 写入媒体清单（档位文件路径相对于清单所在目录） """
+    with open(path, 'w') as file:
+        json.dump(manifest, file, indent=2)
+
+
+def readFrameRate(path):
+    """ 读取媒体清单或打包媒体文件头部记录的帧率（0 表示未知） """
+    if path.endswith(MANIFEST_EXT):
+        return readManifest(path)['fps']
+    with open(path, 'rb') as file:
+        return CONTAINER_HEADER.unpack(file.read(CONTAINER_HEADER.size))[2]
+
+
+def readManifest(path):
+    """ 读取媒体清单  档位文件路径转换为可直接打开的路径 """
+    with open(path) as file:
+        manifest = json.load(file)
+    directory = os.path.dirname(path)
+    for rung in manifest['rungs']:
+        rung['path'] = os.path.join(directory, rung['path'])
+    return manifest
+
+
+def main(argv):
+    """ 程序主入口 """
+    if len(argv) == 3 and argv[0] == 'pack':
+        paths = listFrames(argv[1])
+        if not paths:
+            print('@ 目录 %s 中没有 %s 格式的帧文件' % (argv[1], FRAME_PATTERN))
+            sys.exit(1)
+        count = pack(paths, argv[2])
+        print('@ 已打包 %d 帧 -> %s (%d bytes)' % (count, argv[2], os.path.getsize(argv[2])))
+    elif len(argv) == 2 and argv[0] == 'info':
+        container = MediaContainer(argv[1])
+        sizes = [container.frameSize(index) for index in range(len(container))]
+        print('@ %s: %d 帧  %s fps  总计 %d bytes  最大帧 %d bytes' % (argv[1], len(container), container.frame_rate or '?',
+                                                                 sum(sizes), max(sizes, default=0)))
+    else:
+        print('usage: MediaContainer.py pack <frame directory> <output%s>\n'
+              '       MediaContainer.py info <container>' % CONTAINER_EXT)
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
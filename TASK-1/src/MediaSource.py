@@ -0,0 +1,96 @@
+import os
+import math
+
+from MediaContainer import MediaContainer, CONTAINER_EXT, MANIFEST_EXT, FRAME_PATTERN, listFrames, readManifest
+from QualityLadder import QualityLadder, ladderRungs
+
+
+class MediaSource:
+    """ 媒体源类（一个可播放的媒体：散列帧文件 / 打包媒体文件 / 媒体清单  清单中第 1 档起的档位组成质量阶梯） """
+
+    def __init__(self, path, frame_cache, frame_rate, ladder_base='', default_frame_count=0, keyframe_interval=1):
+        """ 类构造方法
+
+        path -- 媒体清单  打包媒体文件  帧目录  或帧文件路径模板（如 ./pic/pic-%05d.jpg）
+        frame_cache -- 散列帧文件经由的帧缓存（服务端共享）
+        frame_rate -- 帧率（npt 时间与帧序号换算  估算档位码率）
+        ladder_base -- 质量阶梯媒体文件前缀（--ladder  媒体清单自带档位时忽略）
+        default_frame_count -- 帧文件无法计数时的帧总数
+        keyframe_interval -- 关键帧间隔（定位时向前对齐到关键帧  JPEG 帧均可独立解码  为 1）
+        """
+        self.path = path
+        self.frame_cache = frame_cache
+        self.frame_rate = frame_rate
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.manifest = readManifest(path) if path.endswith(MANIFEST_EXT) else None     # 媒体清单
+        self.media = None                                                               # 打包媒体文件（媒体清单的第 0 档）
+        self.frame_pattern = None                                                       # 散列帧文件路径模板
+        if self.manifest is not None:
+            self.media = MediaContainer(self.manifest['rungs'][0]['path'])
+        elif path.endswith(CONTAINER_EXT):
+            self.media = MediaContainer(path)
+        else:
+            self.frame_pattern = os.path.join(path, FRAME_PATTERN) if os.path.isdir(path) else path
+        if self.media is not None:
+            self.frame_count = len(self.media)
+        else:
+            # 散列帧文件按目录中实际连续编号的文件计数
+            self.frame_count = len(listFrames(os.path.dirname(self.frame_pattern), os.path.basename(self.frame_pattern))) \
+                or default_frame_count
+        if not self.frame_count:
+            raise ValueError('%s contains no frames' % path)
+        self.ladder = self.loadLadder(frame_rate, ladder_base)   # 质量阶梯
+
+    def __len__(self):
+        """ 返回帧总数 """
+        return self.frame_count
+
+    def loadLadder(self, frame_rate, ladder_base):
+        """ 加载质量阶梯（媒体清单中的档位或 ladder_base 前缀下的档位文件）  未启用时返回 None """
+        if self.manifest is not None and len(self.manifest['rungs']) > 1:
+            rungs = [(rung['name'], rung['path']) for rung in self.manifest['rungs'][1:]]
+            return QualityLadder(rungs, self.frame_count, self.mediaBytes(), frame_rate, self.manifest['rungs'][0]['name'])
+        if ladder_base:
+            return QualityLadder(ladderRungs(ladder_base), self.frame_count, self.mediaBytes(), frame_rate)
+        return None
+
+    def keyframe(self, frame_number):
+        """ 返回不晚于 frame_number 的关键帧序号（超出媒体范围时取最后一个关键帧） """
+        frame_number = min(max(frame_number, 0), self.frame_count - 1)
+        return frame_number - frame_number % self.keyframe_interval
+
+    def frameAt(self, seconds):
+        """ 返回 npt 时间所在帧对应的关键帧序号（按帧率换算  O(1)  帧数据由索引表直接定位） """
+        return self.keyframe(int(seconds * self.frame_rate + 1e-9))
+
+    def lastFrameBefore(self, seconds):
+        """ 返回 npt 时间之前的最后一帧序号（Range 结束时间不含该时刻所在帧） """
+        return min(math.ceil(seconds * self.frame_rate - 1e-9), self.frame_count) - 1
+
+    def timeOf(self, frame_number):
+        """ 返回帧序号对应的 npt 时间（秒） """
+        return frame_number / self.frame_rate
+
+    def mediaBytes(self):
+        """ 返回原始媒体总字节数 """
+        if self.media is not None:
+            return sum(self.media.frameSize(index) for index in range(len(self.media)))
+        return sum(os.path.getsize(self.frame_pattern % index) for index in range(self.frame_count))
+
+    def rungName(self, rung):
+        """ 返回质量档位名称 """
+        return self.ladder.names[rung] if self.ladder is not None else 'source'
+
+    def readFrame(self, frame_number, rung=0):
+        """ 读取帧数据  打包媒体文件返回零拷贝 memoryview  否则经帧缓存读取散列文件（rung 为质量档位） """
+        if rung:
+            return self.ladder.frame(rung, frame_number % self.frame_count)
+        if self.media is not None:
+            return self.media.frame(frame_number % self.frame_count)
+        return self.frame_cache.get(self.frame_pattern % (frame_number % self.frame_count))
+
+    def framePaths(self):
+        """ 返回散列帧文件路径（帧缓存预加载  打包媒体文件返回空） """
+        if self.frame_pattern is None:
+            return []
+        return [self.frame_pattern % index for index in range(self.frame_count)]
@@ -0,0 +1,51 @@
+import os
+
+from MediaContainer import MediaContainer, CONTAINER_EXT
+
+# 质量阶梯（从高到低  第 0 档为原始媒体）：(名称, JPEG 质量, 缩放比例)  由 Ingest.py 编码生成
+LADDER_RUNGS = [
+    ('high', None, 1.0),
+    ('medium', 60, 0.75),
+    ('low', 35, 0.5),
+]
+
+
+def rungPath(base, name):
+    """ 返回档位媒体文件路径 """
+    return '%s-%s%s' % (base, name, CONTAINER_EXT)
+
+
+def ladderRungs(base):
+    """ 返回前缀 base 下已生成的第 1 档及以下各档位 [(名称, 媒体文件路径)] """
+    return [(name, rungPath(base, name)) for name, quality, scale in LADDER_RUNGS[1:] if os.path.exists(rungPath(base, name))]
+
+
+class QualityLadder:
+    """ 质量阶梯类（第 0 档为原始媒体  其余档位为预先转码的打包媒体文件  各档位帧序号一一对应） """
+
+    def __init__(self, rungs, frame_count, source_bytes, frame_rate, source_name=LADDER_RUNGS[0][0]):
+        """ 类构造方法（rungs 为第 1 档起的 [(名称, 媒体文件路径)]  source_bytes 为原始媒体总字节数  用于估算第 0 档码率） """
+        self.names = [source_name]                                      # 各档位名称
+        self.bitrates = [source_bytes * 8 * frame_rate / frame_count]   # 各档位平均码率（bit/s）
+        self.containers = [None]                                        # 各档位媒体文件（第 0 档由服务端读取）
+        for name, path in rungs:
+            container = MediaContainer(path)
+            if len(container) != frame_count:
+                container.close()
+                raise ValueError('%s has %d frames, expected %d' % (path, len(container), frame_count))
+            size = sum(container.frameSize(index) for index in range(frame_count))
+            self.names.append(name)
+            self.bitrates.append(size * 8 * frame_rate / frame_count)
+            self.containers.append(container)
+
+    def __len__(self):
+        """ 返回档位数 """
+        return len(self.names)
+
+    def frame(self, rung, index):
+        """ 返回第 rung 档（rung >= 1）第 index 帧数据（memoryview  不复制） """
+        return self.containers[rung].frame(index)
+
+    def stats(self):
+        """ 返回各档位码率（kbit/s） """
+        return {name: round(bitrate / 1000, 1) for name, bitrate in zip(self.names, self.bitrates)}
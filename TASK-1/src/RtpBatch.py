@@ -0,0 +1,204 @@
+import socket
+import struct
+import ctypes
+import ctypes.util
+import time
+
+SOL_UDP = getattr(socket, 'SOL_UDP', 17)
+UDP_SEGMENT = 103               # Linux UDP GSO 套接字选项
+GSO_MAX_SEGMENTS = 64           # 单次 GSO 发送的最大分段数
+GSO_MAX_BYTES = 65000           # 单次 GSO 发送的最大字节数
+MMSG_MAX_MESSAGES = 1024        # 单次 sendmmsg 的最大消息数（UIO_MAXIOV）
+ARENA_SIZE = 2 * 1024 * 1024    # sendmmsg 模式下的数据包暂存区大小
+
+
+class iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class msghdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(iovec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+
+class mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', msghdr), ('msg_len', ctypes.c_uint)]
+
+
+def loadSendmmsg():
+    """ 加载 libc sendmmsg  不支持时返回 None """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(mmsghdr), ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+
+def probeGso():
+    """ 检测内核是否支持 UDP GSO """
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.getsockopt(SOL_UDP, UDP_SEGMENT)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class BatchSender:
+    """ RTP 批量发送类（按时刻收集全部会话的数据包  以 UDP GSO / sendmmsg 合并发送） """
+    GSO = 'gso'         # 同一目的地址的连续分片合并为一次 sendmsg（内核分段）
+    MMSG = 'mmsg'       # 同一套接字的全部数据包合并为一次 sendmmsg
+    SENDTO = 'sendto'   # 逐包发送（回退方式）
+
+    def __init__(self, mode='auto'):
+        """ 类构造方法 """
+        self.sendmmsg = loadSendmmsg()
+        if mode == 'auto':
+            mode = self.GSO if probeGso() else self.MMSG if self.sendmmsg else self.SENDTO
+        elif mode == self.GSO and not probeGso():
+            mode = self.MMSG if self.sendmmsg else self.SENDTO
+        elif mode == self.MMSG and not self.sendmmsg:
+            mode = self.SENDTO
+        self.mode = mode
+        self.queue = []                         # 待发送 (套接字, 地址, 头部, 负载)
+        self.addresses = {}                     # 地址 -> sockaddr_in 缓存
+        if self.mode == self.MMSG:
+            self.arena = bytearray(ARENA_SIZE)  # 数据包暂存区
+            self.arena_address = ctypes.addressof((ctypes.c_char * ARENA_SIZE).from_buffer(self.arena))
+            self.iovecs = (iovec * MMSG_MAX_MESSAGES)()
+            self.messages = (mmsghdr * MMSG_MAX_MESSAGES)()
+            # 每条消息固定使用一个 iovec  只需在发送时填写地址与长度
+            for index in range(MMSG_MAX_MESSAGES):
+                self.messages[index].msg_hdr.msg_iov = ctypes.pointer(self.iovecs[index])
+                self.messages[index].msg_hdr.msg_iovlen = 1
+        # --- 统计 ---
+        self.start_time = time.monotonic()
+        self.syscalls = 0
+        self.packets = 0
+        self.bytes = 0
+        self.dropped = 0
+
+    def add(self, sock, address, header, payload):
+        """ 加入一个数据包（头部被复制  负载仅保存引用） """
+        self.queue.append((sock, address, bytes(header), payload))
+
+    def flush(self):
+        """ 发送全部待发送数据包 """
+        if not self.queue:
+            return
+        queue, self.queue = self.queue, []
+        if self.mode == self.GSO:
+            self.flushGso(queue)
+        elif self.mode == self.MMSG:
+            self.flushMmsg(queue)
+        else:
+            self.flushSendto(queue)
+
+    def flushSendto(self, queue):
+        """ 逐包发送 """
+        for sock, address, header, payload in queue:
+            try:
+                self.bytes += sock.sendmsg([header, payload], [], 0, address)
+                self.packets += 1
+            except OSError:
+                self.dropped += 1
+            self.syscalls += 1
+
+    def flushGso(self, queue):
+        """ 按 (套接字, 地址) 合并连续的等长分片  一次 sendmsg 由内核切分 """
+        index = 0
+        while index < len(queue):
+            sock, address, header, payload = queue[index]
+            segment = len(header) + len(payload)
+            buffers = [header, payload]
+            end = index + 1
+            limit = min(GSO_MAX_SEGMENTS, GSO_MAX_BYTES // segment)
+            # 除最后一段外  各段长度必须等于 segment
+            while end < len(queue) and end - index < limit and segment == len(queue[end - 1][2]) + len(queue[end - 1][3]):
+                next_sock, next_address, next_header, next_payload = queue[end]
+                if next_sock is not sock or next_address != address or len(next_header) + len(next_payload) > segment:
+                    break
+                buffers.append(next_header)
+                buffers.append(next_payload)
+                end += 1
+            try:
+                if end - index > 1:
+                    self.bytes += sock.sendmsg(buffers, [(SOL_UDP, UDP_SEGMENT, struct.pack('=H', segment))], 0, address)
+                else:
+                    self.bytes += sock.sendmsg(buffers, [], 0, address)
+                self.packets += end - index
+            except BlockingIOError:
+                self.dropped += end - index
+            except OSError:
+                if end - index > 1:
+                    # 网卡或内核拒绝 GSO  此后改为逐包发送
+                    self.mode = self.SENDTO
+                    self.flushSendto(queue[index:end])
+                else:
+                    self.dropped += 1
+            self.syscalls += 1
+            index = end
+
+    def flushMmsg(self, queue):
+        """ 按套接字合并全部数据包  一次 sendmmsg 发送 """
+        groups = {}
+        for packet in queue:
+            groups.setdefault(packet[0], []).append(packet)
+        for sock, packets in groups.items():
+            for start in range(0, len(packets), MMSG_MAX_MESSAGES):
+                self.sendMmsgGroup(sock, packets[start:start + MMSG_MAX_MESSAGES])
+
+    def sendMmsgGroup(self, sock, packets):
+        """ 将同一套接字的数据包复制到暂存区并调用 sendmmsg """
+        offset = 0
+        count = 0
+        names = []  # 保持 sockaddr 引用直到 sendmmsg 返回
+        for packet_sock, address, header, payload in packets:
+            size = len(header) + len(payload)
+            if offset + size > ARENA_SIZE:
+                break
+            self.arena[offset:offset + len(header)] = header
+            self.arena[offset + len(header):offset + size] = payload
+            name = self.sockaddr(address)
+            names.append(name)
+            vector = self.iovecs[count]
+            vector.iov_base = self.arena_address + offset
+            vector.iov_len = size
+            message = self.messages[count].msg_hdr
+            message.msg_name = ctypes.addressof(name)
+            message.msg_namelen = len(name)
+            offset += size
+            count += 1
+        sent = self.sendmmsg(sock.fileno(), self.messages, count, 0)
+        self.syscalls += 1
+        if sent < 0:
+            self.dropped += len(packets)
+            return
+        self.packets += sent
+        self.bytes += sum(self.messages[index].msg_len for index in range(sent))
+        self.dropped += len(packets) - sent
+
+    def sockaddr(self, address):
+        """ 返回地址对应的 sockaddr_in（缓存） """
+        name = self.addresses.get(address)
+        if name is None:
+            if len(self.addresses) >= 65536:
+                self.addresses.clear()
+            data = struct.pack('=H', socket.AF_INET) + struct.pack('!H', address[1]) + socket.inet_aton(address[0]) + bytes(8)
+            name = ctypes.create_string_buffer(data, len(data))
+            self.addresses[address] = name
+        return name
+
+    def stats(self):
+        """ 返回发送统计（含每秒系统调用数与数据包数） """
+        elapsed = max(time.monotonic() - self.start_time, 1e-9)
+        return {'mode': self.mode, 'syscalls': self.syscalls, 'packets': self.packets, 'bytes': self.bytes,
+                'dropped': self.dropped, 'syscalls_per_sec': self.syscalls / elapsed,
+                'packets_per_sec': self.packets / elapsed}
@@ -0,0 +1,91 @@
+from collections import OrderedDict
+
+FRAME_MAX_SIZE = 16 * 1024 * 1024   # 单帧最大字节数（防止异常数据包导致大量分配）
+FRAME_MAX_PENDING = 4               # 同时组装中的最大帧数
+
+
+def fragmentFrame(frame, chunk_size):
+    """ 将一帧切分为不超过 chunk_size 的分片  依次返回 (帧内偏移, 分片 memoryview, marker) """
+    view = memoryview(frame)
+    size = len(view)
+    offset = 0
+    while True:
+        end = min(offset + chunk_size, size)
+        yield offset, view[offset:end], int(end == size)
+        if end == size:
+            break
+        offset = end
+
+
+def isNewer(timestamp, other):
+    """ 判断 RTP 时间戳 timestamp 是否晚于 other（考虑 32 位回绕） """
+    return 0 < ((timestamp - other) & 0xFFFFFFFF) < 0x80000000
+
+
+class PendingFrame:
+    """ 组装中的帧 """
+
+    def __init__(self, size):
+        """ 类构造方法 """
+        self.data = bytearray(size)   # 帧数据
+        self.offsets = set()          # 已收到的分片偏移
+        self.received = 0             # 已收到的字节数
+
+
+class FrameAssembler:
+    """ 帧重组类（按 RTP 时间戳归并分片  容忍乱序  丢弃不完整帧） """
+
+    def __init__(self, max_pending=FRAME_MAX_PENDING):
+        """ 类构造方法 """
+        self.max_pending = max_pending
+        self.pending = OrderedDict()   # 时间戳 -> PendingFrame
+        self.last_timestamp = None     # 最近一个完成帧的时间戳
+        self.completed = 0             # 完成帧数
+        self.dropped = 0               # 丢弃的不完整帧数
+        self.duplicates = 0            # 重复分片数
+        self.late = 0                  # 迟到分片数（所属帧已输出或已过期）
+
+    def feed(self, rtp_packet):
+        """ 输入一个 RTP 数据包  帧组装完成时返回帧数据（bytearray）  否则返回 None """
+        fragment = rtp_packet.fragment()
+        payload = rtp_packet.get_payload()
+        timestamp = rtp_packet.timestamp()
+        if fragment is None:
+            # 未分片的数据包即为完整帧
+            self.completed += 1
+            self.last_timestamp = timestamp
+            return bytearray(payload)
+        offset, size = fragment
+        if self.last_timestamp is not None and not isNewer(timestamp, self.last_timestamp):
+            self.late += 1
+            return None
+        if size > FRAME_MAX_SIZE or offset + len(payload) > size:
+            return None
+        frame = self.pending.get(timestamp)
+        if frame is None:
+            frame = PendingFrame(size)
+            self.pending[timestamp] = frame
+            if len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+        if offset in frame.offsets:
+            self.duplicates += 1
+            return None
+        frame.data[offset:offset + len(payload)] = payload
+        frame.offsets.add(offset)
+        frame.received += len(payload)
+        if frame.received < len(frame.data):
+            return None
+        # 帧完成  丢弃更早的不完整帧
+        del self.pending[timestamp]
+        for other in [other for other in self.pending if isNewer(timestamp, other)]:
+            del self.pending[other]
+            self.dropped += 1
+        self.last_timestamp = timestamp
+        self.completed += 1
+        return frame.data
+
+    def stats(self):
+        """ 返回重组统计 """
+        return {'completed': self.completed, 'dropped': self.dropped, 'duplicates': self.duplicates,
+                'late': self.late, 'pending': len(self.pending)}
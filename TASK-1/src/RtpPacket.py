@@ -1,7 +1,18 @@
 # coding=utf-8
 import sys
+import struct
 from time import time
 HEADER_SIZE = 12
+HEADER_STRUCT = struct.Struct('!BBHII')
+STAMP_STRUCT = struct.Struct('!HII')   # 每个接收方不同的字段：序列号 时间戳 SSRC
+
+# 分片头部扩展（RFC 3550 5.3.1）：profile(16) length(16)=2 | 帧内偏移(32) | 帧总长度(32)
+EXTENSION_PROFILE_FRAGMENT = 0x4652
+EXTENSION_STRUCT = struct.Struct('!HHII')
+FRAGMENT_HEADER_SIZE = HEADER_SIZE + EXTENSION_STRUCT.size
+
+RTP_VERSION = 2
+PT_JPEG = 96        # 动态负载类型：完整 JFIF 图像的分片（非 RFC 2435 格式）
 
 
 # =============================
@@ -47,16 +58,56 @@ class RtpPacket:
         self.payload = payload
         return
 
+    def encode_into(self, version, padding, extension, cc, marker, pt, seqnum, ssrc, payload, timestamp=None, fragment=None):
+        """ Encode the RTP packet into a reused header buffer without copying the payload.
+
+        fragment -- (offset, frame size) of this payload inside its frame, carried in a header extension.
+        """
+        if timestamp is None:
+            timestamp = int(time())
+        size = HEADER_SIZE if fragment is None else FRAGMENT_HEADER_SIZE
+        if not isinstance(getattr(self, 'header', None), bytearray) or len(self.header) != size:
+            self.header = bytearray(size)
+        if fragment is not None:
+            extension = 1
+            EXTENSION_STRUCT.pack_into(self.header, HEADER_SIZE, EXTENSION_PROFILE_FRAGMENT, 2, fragment[0], fragment[1])
+        HEADER_STRUCT.pack_into(self.header, 0,
+                                (version << 6) | (padding << 5) | (extension << 4) | cc,
+                                (marker << 7) | pt,
+                                seqnum & 0xFFFF,
+                                timestamp & 0xFFFFFFFF,
+                                ssrc & 0xFFFFFFFF)
+        self.payload = payload
+        return
+
+    def restamp(self, seqnum, timestamp, ssrc):
+        """ Patch sequence number, timestamp and SSRC in place, keeping the rest of an encoded header. """
+        STAMP_STRUCT.pack_into(self.header, 2, seqnum & 0xFFFF, timestamp & 0xFFFFFFFF, ssrc & 0xFFFFFFFF)
+
+    def send(self, sock, address):
+        """ Send header and payload with one scatter-gather call (no payload copy). """
+        if hasattr(sock, 'sendmsg'):
+            return sock.sendmsg([self.header, self.payload], [], 0, address)
+        return sock.sendto(self.get_packet(), address)
+
     def decode(self, byteStream):
         """ Decode the RTP packet. """
-        self.header = bytearray(byteStream[:HEADER_SIZE])
-        self.payload = byteStream[HEADER_SIZE:]
+        # 跳过 CSRC 列表（CC 个）与头部扩展（X 位置位时）
+        size = HEADER_SIZE + (byteStream[0] & 0x0F) * 4
+        if byteStream[0] & 0x10:
+            size += 4 + (byteStream[size + 2] << 8 | byteStream[size + 3]) * 4
+        self.header = bytearray(byteStream[:size])
+        self.payload = byteStream[size:]
         return
 
     def version(self):
         """ Return RTP version. """
         return int(self.header[0] >> 6)
 
+    def marker(self):
+        """ Return marker bit (last packet of a frame). """
+        return int(self.header[1] >> 7)
+
     def seqnum(self):
         """ Return sequence (frame) number. """
         seqnum = self.header[2] << 8 | self.header[3]
@@ -67,11 +118,26 @@ class RtpPacket:
         timestamp = self.header[4] << 24 | self.header[5] << 16 | self.header[6] << 8 | self.header[7]
         return int(timestamp)
 
+    def ssrc(self):
+        """ Return SSRC identifier. """
+        ssrc = self.header[8] << 24 | self.header[9] << 16 | self.header[10] << 8 | self.header[11]
+        return int(ssrc)
+
     def payload_type(self):
         """ Return payload type. """
         pt = self.header[1] & 127
         return int(pt)
 
+    def fragment(self):
+        """ Return (offset, frame size) of a fragment, or None for a packet without fragment extension. """
+        offset = HEADER_SIZE + (self.header[0] & 0x0F) * 4
+        if not self.header[0] & 0x10 or len(self.header) < offset + EXTENSION_STRUCT.size:
+            return None
+        profile, length, frame_offset, frame_size = EXTENSION_STRUCT.unpack_from(self.header, offset)
+        if profile != EXTENSION_PROFILE_FRAGMENT:
+            return None
+        return frame_offset, frame_size
+
     def get_header(self):
         """ Return header. """
         return self.header
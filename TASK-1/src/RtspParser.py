@@ -0,0 +1,189 @@
+import re
+
+RTSP_VERSION = 'RTSP/1.0'
+MAX_HEADER_SIZE = 64 * 1024         # 单条消息头部最大字节数（超过则视为格式错误）
+MAX_BODY_SIZE = 1024 * 1024         # 消息体最大字节数（Content-Length 上限）
+
+HEADER_END = re.compile(rb'\r?\n\r?\n')              # 头部结束（空行）
+LINE_SPLIT = re.compile(r'\r?\n')                    # 行分隔
+HEADER_LINE = re.compile(r'([^:\s]+)\s*:\s*(.*?)\s*$')  # 头部字段 "名称: 值"
+NPT_CLOCK = re.compile(r'(\d+):(\d{1,2}):(\d{1,2}(?:\.\d*)?)$', re.ASCII)  # npt 时间 "时:分:秒[.小数]"
+NPT_SECONDS = re.compile(r'\d+(?:\.\d*)?$', re.ASCII)                      # npt 时间 "秒[.小数]"
+RANGE_FRAMES = 'frames'     # 按帧序号定位的 Range 单位（frames=<开始帧>-[<结束帧>]）
+RANGE_NPT = 'npt'           # 按时间定位的 Range 单位（RFC 2326 npt=<开始>-[<结束>]  开始可为 now）
+
+
+class RtspError(ValueError):
+    """ RTSP 消息格式错误 """
+    pass
+
+
+class InvalidRange(ValueError):
+    """ Range 字段格式错误或范围无效 """
+    pass
+
+
+class RtspMessage:
+    """ RTSP 消息类（请求或回复  头部字段名不区分大小写） """
+
+    def __init__(self, start_line, headers, body=b''):
+        """ 类构造方法 """
+        self.start_line = start_line    # 起始行（按空白切分）
+        self.headers = headers          # 小写字段名 -> 值
+        self.body = body                # 消息体（bytes）
+
+    def isReply(self):
+        """ 是否为回复消息 """
+        return self.start_line[0].startswith('RTSP/')
+
+    def get(self, name, default=None):
+        """ 返回头部字段值 """
+        return self.headers.get(name.lower(), default)
+
+    def __contains__(self, name):
+        """ 是否包含头部字段 """
+        return name.lower() in self.headers
+
+    def __str__(self):
+        """ 返回消息文本（用于显示） """
+        lines = [' '.join(self.start_line)] + ['%s: %s' % item for item in self.headers.items()]
+        return '\n'.join(lines) + '\n'
+
+
+def parseTransport(value):
+    """ 分析 Transport 字段  返回参数字典（无值参数为 True） """
+    params = {}
+    for item in value.split(';'):
+        name, sep, arg = item.strip().partition('=')
+        if name:
+            params[name] = arg.strip() if sep else True
+    return params
+
+
+def isNumber(value):
+    """ 是否为 ASCII 十进制数字串（str.isdigit 也接受 '²' 等字符  int() 却无法转换） """
+    return value.isascii() and value.isdigit()
+
+
+def parseNptTime(value):
+    """ 分析 npt 时间（秒 如 12.5  或 时:分:秒 如 0:01:02.5）  返回秒数 """
+    match = NPT_CLOCK.match(value)
+    if match is not None:
+        hours, minutes, seconds = match.groups()
+        if int(minutes) >= 60 or float(seconds) >= 60:
+            raise InvalidRange(value)
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    if NPT_SECONDS.match(value) is None:
+        raise InvalidRange(value)
+    return float(value)
+
+
+def parseRange(value):
+    """ 分析 Range 字段  返回 (单位, 开始, 结束)  格式错误时抛出 InvalidRange
+
+    npt=<开始>-[<结束>] -- 时间（秒）  开始为 now 时表示直播位置（返回 'now'）
+    frames=<开始帧>-[<结束帧>] -- 帧序号（整数）
+    结束省略时为 None  ;time= 等参数忽略
+    """
+    unit, sep, spec = value.split(';')[0].strip().partition('=')
+    start, dash, end = spec.strip().partition('-')
+    start, end = start.strip(), end.strip()
+    if not sep or not dash:
+        raise InvalidRange(value)
+    if unit == RANGE_NPT:
+        start = 'now' if start == 'now' else parseNptTime(start)
+        end = parseNptTime(end) if end else None
+    elif unit == RANGE_FRAMES:
+        if not isNumber(start) or (end and not isNumber(end)):
+            raise InvalidRange(value)
+        start, end = int(start), int(end) if end else None
+    else:
+        raise InvalidRange(value)
+    if end is not None and (start == 'now' or end < start):
+        raise InvalidRange(value)
+    return unit, start, end
+
+
+class RtspParser:
+    """ 增量 RTSP 解析类（缓存字节流  按空行与 Content-Length 切分消息  支持一次读取多条消息）
+
+    lenient -- 兼容不以空行结束消息的旧端：对端尚未发送过空行时  以行结束的缓冲区视为一条完整消息
+    """
+
+    def __init__(self, lenient=False):
+        """ 类构造方法 """
+        self.buffer = bytearray()   # 未解析的字节
+        self.scanned = 0            # 已确认不含空行的前缀长度（避免逐字节输入时重复扫描）
+        self.lenient = lenient
+        self.framed = False         # 对端已发送过以空行结束的消息（不再使用兼容切分）
+
+    def feed(self, data):
+        """ 输入接收到的字节  返回已完整接收的消息列表 """
+        self.buffer += data
+        messages = []
+        while True:
+            message = self.next()
+            if message is None:
+                break
+            messages.append(message)
+        return messages
+
+    def next(self):
+        """ 从缓冲区中取出一条完整消息  不完整时返回 None """
+        # 跳过消息之间多余的空行
+        start = 0
+        while start < len(self.buffer) and self.buffer[start] in b'\r\n':
+            start += 1
+        if start:
+            del self.buffer[:start]
+            self.scanned = 0
+        if not self.buffer:
+            return None
+        match = HEADER_END.search(self.buffer, max(self.scanned - 3, 0))
+        if match is None:
+            self.scanned = len(self.buffer)
+            if len(self.buffer) > MAX_HEADER_SIZE:
+                raise RtspError('header too long')
+            if self.lenient and not self.framed and self.buffer.endswith(b'\n'):
+                end = len(self.buffer)
+            else:
+                return None
+        else:
+            self.framed = True
+            end = match.end()
+        start_line, headers = self.parseHeader(bytes(self.buffer[:end]))
+        length = headers.get('content-length', '0')
+        if not isNumber(length) or int(length) > MAX_BODY_SIZE:
+            raise RtspError('bad Content-Length: %r' % length)
+        length = int(length)
+        if len(self.buffer) < end + length:
+            return None
+        body = bytes(self.buffer[end:end + length])
+        del self.buffer[:end + length]
+        self.scanned = 0
+        return RtspMessage(start_line, headers, body)
+
+    @staticmethod
+    def parseHeader(data):
+        """ 分析起始行与头部字段 """
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            raise RtspError('header is not utf-8')
+        lines = LINE_SPLIT.split(text.strip('\r\n'))
+        start_line = lines[0].split()
+        if len(start_line) < 2:
+            raise RtspError('bad start line: %r' % lines[0])
+        headers = {}
+        name = None
+        for line in lines[1:]:
+            if line[:1] in (' ', '\t') and name is not None:
+                # 折叠行  接续上一字段
+                headers[name] += ' ' + line.strip()
+                continue
+            match = HEADER_LINE.match(line)
+            if match is None:
+                raise RtspError('bad header line: %r' % line)
+            name = match.group(1).lower()
+            headers[name] = match.group(2)
+        return start_line, headers
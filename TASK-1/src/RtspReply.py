@@ -0,0 +1,46 @@
+RTSP_VERSION = 'RTSP/1.0'
+
+# 状态码 -> 原因短语
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    451: 'Parameter Not Understood',
+    455: 'Method Not Valid in This State',
+    457: 'Invalid Range',
+    461: 'Unsupported Transport',
+    503: 'Service Unavailable',
+}
+
+# --- 预编码的静态片段 ---
+LINE_END = b'\n'
+STATUS_LINES = {code: ('%s %d %s\n' % (RTSP_VERSION, code, reason)).encode() for code, reason in REASONS.items()}
+REPLY_PREFIXES = {code: line + b'CSeq: ' for code, line in STATUS_LINES.items()}   # 状态行 + CSeq 字段名
+CONTENT_PARAMETERS = b'Content-Type: text/parameters\nContent-Length: '
+BAD_REQUEST = STATUS_LINES[400] + LINE_END   # 无法切分请求时的完整回复（无 CSeq）
+
+
+def headerLine(name, value):
+    """ 预编码一行头部字段（会话内不变的字段只编码一次） """
+    return ('%s: %s\n' % (name, value)).encode()
+
+
+def rtspReply(code, cseq, *headers, body=b''):
+    """ 构造一条回复（bytes  以空行结束）
+
+    code -- 状态码（预编码状态行）
+    cseq -- 请求的 CSeq（None 时不含 CSeq）
+    headers -- 已编码的头部行（如 headerLine 的结果）
+    body -- 消息体（非空时附带 Content-Type / Content-Length）
+    """
+    if cseq is None:
+        parts = [STATUS_LINES[code]]
+    else:
+        parts = [REPLY_PREFIXES[code], cseq.encode(), LINE_END]
+    parts.extend(headers)
+    if body:
+        parts += (CONTENT_PARAMETERS, b'%d' % len(body), LINE_END, LINE_END, body)
+    else:
+        parts.append(LINE_END)
+    return b''.join(parts)
@@ -1,29 +1,202 @@
 import os
 import sys
+import getopt
 import socket
 import threading
+import asyncio
 import time
-import re
 import random
-from RtpPacket import RtpPacket
+import json
+import select
+import signal
+import traceback
+import ctypes
+import ctypes.util
+import selectors
+import functools
+import math
+from urllib.parse import unquote
+from RtpPacket import FRAGMENT_HEADER_SIZE
+from RtpBatch import BatchSender
+from FrameScheduler import FrameScheduler
+from FrameCache import FrameCache
+from MediaContainer import readFrameRate
+from MediaCatalog import MediaCatalog, MediaNotFound, CatalogItem, duration
+from MediaSource import MediaSource
+from MediaChannel import MediaChannel
+from RtspParser import RtspParser, RtspError, InvalidRange, parseTransport, parseRange, RANGE_NPT
+from RtspReply import rtspReply, headerLine, BAD_REQUEST
+from SessionRegistry import SessionRegistry, makeSessionKey
+from PortPool import PortPool, PortExhausted
+from SharedRtp import SharedRtpSockets
+from Rtcp import RTCP_RECV_SIZE, isRtcp, parseRtcp, buildSenderReport, ntpMiddle
+from AbrPolicy import ABR_POLICIES
 
 DISPLAY_MODE = True
 SERVER_ADDR = '127.0.0.1'
 SERVER_PORT = 9999
 SERVER_MAX_CONNECTION = 10
+RTSP_RECV_SIZE = 4096
+RTSP_METHODS = 'OPTIONS, DESCRIBE, LIST, SETUP, PLAY, PAUSE, TEARDOWN, GET_PARAMETER'
+PUBLIC_HEADER = headerLine('Public', RTSP_METHODS)
+ALLOW_HEADER = headerLine('Allow', RTSP_METHODS)
+INIT_ALLOW_HEADER = headerLine('Allow', 'OPTIONS, DESCRIBE, SETUP')    # SETUP 前有效的方法（455 回复）
 RTP_MIN_PORT = 5000
 RTP_MAX_PORT = 10000
-MIN_SESSION_ID = 10000000
-MAX_SESSION_ID = 99999999
 
 RTP_FRAME = 10
 RTP_INTERVAL = 1 / RTP_FRAME
+RTP_CLOCK_RATE = 90000
+RTP_MTU = 1400
+RTP_BATCH_MODE = 'auto'
+RTP_SHARED_SOCKETS = 0              # 共享 RTP 套接字数（0 表示每个会话一个套接字）
+RTCP_INTERVAL = 5                   # RTCP 发送方报告间隔（秒  RFC 3550 建议最小值）
+RTP_BURST_RATE = 4                  # 突发发送速率（实时的倍数  PLAY 请求 Burst 时每个时刻至多发送的帧数  1 表示不突发）
+RTP_BURST_MAX = 300                 # 单次 PLAY 突发帧数上限
+RTP_SCALE_MAX = 16                  # 播放速率（Scale × Speed）绝对值上限
 
+MEDIA_PATH = './pic/pic-%05d.jpg'
+MEDIA_FRAME_COUNT = 183
+MEDIA_CONTAINER = ''                 # 打包媒体文件或媒体清单（Ingest.py 生成）
+FRAME_CACHE_SIZE = 64 * 1024 * 1024
+FRAME_CACHE_PREWARM = False
+MEDIA_LADDER = ''                   # 质量阶梯媒体文件前缀（Ingest.py 生成  空表示不启用）
+MEDIA_CATALOG = ''                  # 媒体目录文件（MediaCatalog.py build 生成  空表示任意 URL 均播放默认媒体）
+CATALOG_PAGE_SIZE = 100             # DESCRIBE 列表默认每页条目数
+CATALOG_MAX_PAGE_SIZE = 1000        # DESCRIBE 列表每页条目数上限
+CATALOG_LIST_BYTES = 32 * 1024      # List 头部字段最大字节数（不超过对端 RTSP 头部上限  超出时本页提前结束）
+ABR_POLICY = 'loss'                 # 码率自适应策略（AbrPolicy.ABR_POLICIES）
+STATS_INTERVAL = 0
 
-used_session_id_list = set()
+MULTICAST_ADDR = '239.255.42.42'    # 默认组播地址（客户端未指定 destination 时使用）
+MULTICAST_PORT = 20000              # 组播端口起始值（每个组播组占用一对端口）
+MULTICAST_TTL = 1                   # 默认组播 TTL（仅本地网段）
+MULTICAST_INTERFACE = '127.0.0.1'   # 组播发送接口（默认回环  便于单机测试）
 
+WORKER_COUNT = 1                    # 工作进程数（多于 1 时以 SO_REUSEPORT 共享 RTSP 端口）
+WORKER_INDEX = 0                    # 当前工作进程序号（会话标识按序号分区  保证进程间不重复）
+WORKER_STATS_SIZE = 256 * 1024      # 工作进程统计数据报最大字节数
 
-class Handler:
+SESSION_KEY = makeSessionKey()      # 会话标识置换参数（启动时生成  工作进程继承同一参数）
+
+
+class RtpStream:
+    """ RTP 发送流类（按帧切分发送  单播会话与组播组共用） """
+
+    def __init__(self, server):
+        """ 类构造方法 """
+        self.server = server                     # 所属服务端
+        self.rtp_socket = None                   # RTP/UDP 套接字
+        self.rtp_address = None                  # RTP/UDP 目的地址（与端口）
+        self.frame_number = 0                    # 当前帧序号（最近发送的帧）
+        self.rtp_clock = 0                       # 呈现时钟（已推进的帧间隔数  RTP 时间戳按此单调递增  与定位 / 倍速无关）
+        self.rtcp_clock = 0                      # 下次发送 RTCP 发送方报告的呈现时钟
+        self.frame_rate = RTP_FRAME              # 发送帧率（媒体源的帧率  决定帧间隔与 RTP 时间戳步长）
+        self.channel = None                      # 媒体频道（同一媒体的会话共享已编码数据包）
+        self.rtp_seq = random.getrandbits(16)    # RTP/UDP 序列号（随机初值）
+        self.rtp_timestamp = random.getrandbits(32)  # RTP/UDP 时间戳初值
+        self.rtp_ssrc = random.getrandbits(32)   # RTP/UDP 同步信源标识
+        self.rtp_packet_count = 0                # 已发送 RTP 数据包数（RTCP SR）
+        self.rtp_octet_count = 0                 # 已发送 RTP 负载字节数（RTCP SR）
+
+    def sendRtpFrame(self):
+        """ 发送下一帧 RTP/UDP 数据包（由帧调度器在到期时刻调用） """
+        self.frame_number += 1
+        self.rtp_clock += 1
+        self.sendFrame()
+
+    def sendFrame(self):
+        """ 发送第 frame_number 帧（时间戳取当前呈现时钟）
+
+        每帧按 MTU 切分为多个数据包：同一帧共用时间戳  序列号逐包递增  最后一个分片置 marker 位
+        数据包由媒体频道切分编码一次  此处只改写序列号/时间戳/SSRC
+        每 RTCP_INTERVAL 秒（及第一帧）先发送一个 RTCP 发送方报告
+        """
+        timestamp = (self.rtp_timestamp + self.rtp_clock * RTP_CLOCK_RATE // self.frame_rate) & 0xFFFFFFFF
+        address = self.rtp_address
+        if self.rtp_clock >= self.rtcp_clock:
+            self.rtcp_clock = self.rtp_clock + RTCP_INTERVAL * self.frame_rate
+            self.sendSenderReport(timestamp)
+        batch_sender = self.server.batch_sender
+        for rtp_packet in self.channel.packets(self.frame_number):
+            rtp_packet.restamp(self.rtp_seq, timestamp, self.rtp_ssrc)
+            self.rtp_seq = (self.rtp_seq + 1) & 0xFFFF
+            self.rtp_packet_count += 1
+            self.rtp_octet_count += len(rtp_packet.get_payload())
+            if batch_sender is None:
+                rtp_packet.send(self.rtp_socket, address)
+            else:
+                # 加入本时刻的批量发送队列（复制头部）  由帧调度器在时刻结束时统一发送
+                batch_sender.add(self.rtp_socket, address, rtp_packet.get_header(), rtp_packet.get_payload())
+
+    def sendSenderReport(self, timestamp):
+        """ 发送 RTCP 发送方报告（与 RTP 复用同一套接字与目的端口  RFC 5761） """
+        try:
+            self.rtp_socket.sendto(buildSenderReport(self.rtp_ssrc, timestamp, self.rtp_packet_count, self.rtp_octet_count),
+                                   self.rtp_address)
+        except OSError:
+            # 发送缓冲区满等错误  丢弃本次报告
+            pass
+
+
+class MulticastUnavailable(OSError):
+    """ 无法创建组播组（组播地址无效或套接字设置失败） """
+
+
+class InvalidState(RuntimeError):
+    """ 当前会话状态下无效的请求（如 SETUP 前的 PLAY / GET_PARAMETER） """
+
+
+class MulticastGroup(RtpStream):
+    """ 组播组类（同一 URL 的组播会话共享一个发送流  每帧只切分发送一次  与观众数量无关） """
+
+    def __init__(self, server, url, destination, port, ttl):
+        """ 类构造方法 """
+        super(MulticastGroup, self).__init__(server)
+        self.url = url                           # 文件名（URL）
+        self.ttl = ttl                           # 组播 TTL
+        self.rtp_address = (destination, port)   # 组播地址（与端口）
+        self.members = set()                     # 加入的会话
+        self.playing = set()                     # 正在播放的会话
+        # 组播地址须为 IPv4 组播地址（224.0.0.0/4）
+        if not 224 <= socket.inet_aton(destination)[0] <= 239:
+            raise OSError('not a multicast address: %s' % destination)
+        # 组播发送套接字（非阻塞  发送缓冲区满时丢弃本帧  不阻塞帧调度）
+        self.rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.rtp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+            self.rtp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            self.rtp_socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(MULTICAST_INTERFACE))
+            self.rtp_socket.bind(('', 0))
+            self.rtp_socket.setblocking(False)
+        except OSError:
+            self.rtp_socket.close()
+            raise
+        self.rtp_server_port = self.rtp_socket.getsockname()[1]
+        self.frame_rate = server.openSource(url).frame_rate
+        self.channel = server.openChannel(url)
+
+    def play(self, handler):
+        """ 会话开始播放  第一个播放的会话启动组播发送 """
+        with self.server.multicast_lock:
+            if not self.playing:
+                self.server.scheduler.schedule(self, 1 / self.frame_rate)
+            self.playing.add(handler)
+
+    def pause(self, handler):
+        """ 会话暂停  没有会话播放时停止组播发送 """
+        with self.server.multicast_lock:
+            self.playing.discard(handler)
+            if not self.playing:
+                self.server.scheduler.unschedule(self)
+
+    def stats(self):
+        """ 返回组播组统计 """
+        return {'destination': '%s:%d' % self.rtp_address, 'members': len(self.members),
+                'playing': len(self.playing), 'frames': self.frame_number}
+
+
+class Handler(RtpStream):
     """ 处理器类 """
     # 客户端状态宏定义
     INIT = 0  # 初始化
@@ -31,23 +204,40 @@ class Handler:
     PLAYING = 2  # 正在播放
     PAUSING = 3  # 正在暂停
 
-    def __init__(self, rtsp_socket, client_addr):
+    def __init__(self, rtsp_socket, client_addr, server):
         """ 类构造方法 """
+        super(Handler, self).__init__(server)
         # --- RTSP/TCP 初始化 ---
         self.client_addr = client_addr           # 客户端 地址（与端口）
         self.rtsp_socket = rtsp_socket           # RTSP/TCP 套接字
+        self.rtsp_parser = RtspParser(lenient=True)  # RTSP/TCP 增量解析（兼容不以空行结束请求的旧客户端）
         self.rtsp_request = {}                   # RTSP/TCP 请求（字典）
-        self.rtsp_reply = ''                     # RTSP/TCP 回复（字符串）
+        self.rtsp_reply = b''                    # RTSP/TCP 回复（bytes）
         self.session_id = '0'                    # RTSP/TCP 会话标识
+        self.session_header = headerLine('Session', self.session_id)  # 预编码的 Session 头部行（回复复用）
         # --- RTP/UDP 初始化 ---
         self.rtp_server_port = 0                 # RTP/UDP 服务端端口
         self.rtp_client_port = 0                 # RTP/UDP 客户端端口
-        self.rtp_socket = None                   # RTP/UDP 套接字
-        self.rtp_thread = None                   # RTP/UDP 当前线程
-        self.rtp_play_event = threading.Event()  # RTP/UDP 播放事件
-        self.rtp_teardown_flag = False           # RTP/UDP 线程关闭标识
+        self.rtp_scheduler = server.scheduler    # RTP/UDP 帧调度器（全部会话共享）
+        self.multicast_group = None              # RTP/UDP 组播组（组播会话）
+        self.rtp_shared = False                  # RTP/UDP 使用服务端共享套接字
+        self.rtcp_packets = 0                    # 收到的 RTCP 数据包数
+        self.rtcp_report = None                  # 客户端最近一次接收方报告的指标（丢包  抖动  往返时延）
+        self.rtcp_octets_prior = 0               # 上次接收方报告时的已发送字节数
+        self.rtcp_time_prior = 0.0               # 上次接收方报告的时刻
+        self.abr = None                          # 码率自适应策略（启用质量阶梯时每个单播会话一个）
+        self.abr_rung = 0                        # 目标质量档位（0 为最高质量  由接收方报告驱动）
+        self.abr_pinned = False                  # 客户端开启压缩模式（Compress-Mode）时固定为最低档位
+        self.abr_switches = 0                    # 档位切换次数
+        self.channel_rung = 0                    # 当前媒体频道的质量档位
+        self.frame_position = 0.0                # 媒体位置（帧序号  每个帧间隔推进 scale  取整后为应发送的帧）
+        self.scale = 1.0                         # 播放速率（Scale × Speed  负数为倒放  每个帧间隔至多发送一帧）
+        self.trick_skipped = 0                   # 倍速播放跳过的帧数
+        self.range_end = None                    # Range 结束帧序号（含该帧  None 表示不限  到达后停止发送）
+        self.burst_frames = 0                    # 剩余突发帧数（PLAY 请求 Burst  快于实时发送以填充客户端预读窗口）
+        self.burst_sent = 0                      # 已突发发送的帧数
         self.filename = ''                       # 文件名（URL）
-        self.frame_number = 0                    # 当前帧序号
+        self.source = None                       # 媒体源（SETUP 时按 URL 打开）
         # --- 服务端 初始化 ---
         self.state = self.INIT  # 服务端 初始状态
 
@@ -55,7 +245,7 @@ class Handler:
         """ 服务端进行 LIST 操作 """
         try:
             return True
-        except KeyError or OSError or RuntimeError:
+        except (KeyError, OSError, RuntimeError):
             return False
 
     def __setup(self):
@@ -63,31 +253,38 @@ class Handler:
         try:
             # INIT -- 加载资源
             if self.state == self.INIT:
-                # 资源初始化 TODO
+                # 资源初始化（媒体目录中没有该 URL 时抛出 MediaNotFound）
+                self.source = self.server.openSource(self.rtsp_request['URL'])
                 self.filename = self.rtsp_request['URL']
+                self.frame_rate = self.source.frame_rate
                 self.frame_number = 0
-                # 建立会话
-                while True:
-                    # 生成随机 session_id
-                    self.session_id = str(random.randint(MIN_SESSION_ID, MAX_SESSION_ID))
-                    if self.session_id not in used_session_id_list:
-                        used_session_id_list.add(self.session_id)
-                        break
-                # 建立 RTP 连接
-                self.rtp_client_port = int(self.rtsp_request['client_port'])
-                while not self.createRtpConnection():
-                    pass
-                self.rtp_play_event.clear()
-                self.rtp_teardown_flag = False
-                self.rtp_thread = threading.Thread(target=self.handleRtpConnection)
-                self.rtp_thread.start()
+                self.frame_position = 0.0
+                # 组播 -- 加入同一 URL 的组播组
+                if 'multicast' in self.rtsp_request:
+                    self.multicast_group = self.server.joinMulticast(self, self.filename, self.rtsp_request.get('destination'),
+                                                                     self.rtsp_request.get('port'), self.rtsp_request.get('ttl'))
+                    self.rtp_server_port = self.multicast_group.rtp_server_port
+                # 单播 -- 建立 RTP 连接  订阅媒体频道
+                else:
+                    self.rtp_client_port = self.rtsp_request['client_port']
+                    self.rtp_address = ('127.0.0.1', self.rtp_client_port)
+                    self.createRtpConnection()
+                    self.abr = self.server.createAbrPolicy(self.source)
+                    self.abr_rung = self.channel_rung = 0
+                    self.channel = self.server.openChannel(self.filename)
+                # 建立会话（注册表分配不重复的 session_id）
+                self.session_id = self.server.sessions.register(self, self.client_addr, self.filename)
+                self.session_header = headerLine('Session', self.session_id)
                 # 更新状态
                 self.state = self.READY
                 return True
             # READY|PLAYING|PAUSING -- 拒绝
             if self.state == self.READY or self.state == self.PLAYING or self.state == self.PAUSING:
                 return False
-        except KeyError or OSError or RuntimeError:
+        except (PortExhausted, MulticastUnavailable):
+            # 端口耗尽 / 组播组创建失败由 handleRtspRequest 回复 503 / 461
+            raise
+        except (KeyError, OSError, RuntimeError):
             return False
 
     def __play(self):
@@ -107,12 +304,34 @@ class Handler:
                 # 恢复播放
                 elif self.state == self.PAUSING:
                     pass    # TODO
-                # 设置播放事件
-                self.rtp_play_event.set()
+                # 组播组由全部会话共享  不能定位（只接受直播位置 npt=now-  其他 Range 回复 457）
+                if self.multicast_group is not None and 'Range' in self.rtsp_request and self.rtsp_request['Range'][1] != 'now':
+                    raise InvalidRange(self.rtsp_request['Range'])
+                # 压缩模式（Compress-Mode: True）-- 固定为最低档位  关闭后恢复自适应
+                if self.abr is not None and 'Compress-Mode' in self.rtsp_request:
+                    self.abr_pinned = self.rtsp_request['Compress-Mode'].lower() == 'true'
+                    if self.abr_pinned:
+                        self.abr_rung = len(self.source.ladder) - 1
+                # 倍速 / 倒放（Scale × Speed  未指定时为 1）与定位（Range: npt=<开始>-[<结束>] / frames=<开始帧>-[<结束帧>] / npt=now-）
+                # -- 组播组由全部会话共享  不变速不定位（速率保持 1）
+                self.range_end = None
+                if self.multicast_group is None:
+                    scale = self.rtsp_request.get('Scale', 1.0) * self.rtsp_request.get('Speed', 1.0)
+                    self.scale = max(-RTP_SCALE_MAX, min(RTP_SCALE_MAX, scale))
+                    if 'Range' in self.rtsp_request:
+                        self.seek(*self.rtsp_request['Range'])
+                # 突发（Burst: <帧数>）-- 接下来的帧快于实时发送（组播组由全部会话共享  不突发）
+                if self.multicast_group is None and RTP_BURST_RATE > 1:
+                    self.burst_frames = min(self.rtsp_request.get('Burst', 0), RTP_BURST_MAX)
+                # 加入帧调度（组播会话由组播组统一发送）
+                if self.multicast_group is not None:
+                    self.multicast_group.play(self)
+                else:
+                    self.rtp_scheduler.schedule(self, 1 / self.frame_rate)
                 # 更新状态
                 self.state = self.PLAYING
                 return True
-        except KeyError or OSError or RuntimeError:
+        except (KeyError, OSError, RuntimeError):
             return False
 
     def __pause(self):
@@ -123,12 +342,16 @@ class Handler:
                 return False
             # PLAYING --暂停播放
             elif self.state == self.PLAYING:
-                # 设置播放事件
-                self.rtp_play_event.clear()
+                # 退出帧调度  放弃剩余突发
+                self.burst_frames = 0
+                if self.multicast_group is not None:
+                    self.multicast_group.pause(self)
+                else:
+                    self.rtp_scheduler.unschedule(self)
                 # 更新状态
                 self.state = self.PAUSING
                 return True
-        except KeyError or OSError or RuntimeError:
+        except (KeyError, OSError, RuntimeError):
             return False
 
     def __teardown(self):
@@ -140,17 +363,36 @@ class Handler:
             # READY|PLAYING|PAUSING -- 停止播放
             elif self.state == self.READY or self.state == self.PLAYING or self.state == self.PAUSING:
                 # 关闭会话
-                if self.session_id in used_session_id_list:
-                    used_session_id_list.remove(self.session_id)
+                self.server.sessions.unregister(self.session_id, self.client_addr, self.filename)
                 self.session_id = '0'
-                # 关闭 RTP 套接字
-                self.rtp_socket.shutdown(socket.SHUT_RDWR)
-                self.rtp_socket.close()
+                self.session_header = headerLine('Session', self.session_id)
+                # 退出组播组（最后一个会话离开时关闭组播发送）
+                if self.multicast_group is not None:
+                    self.server.leaveMulticast(self, self.multicast_group)
+                    self.multicast_group = None
+                    self.state = self.INIT
+                    return True
+                # 退出帧调度
+                stats = self.rtp_scheduler.discard(self)
+                if DISPLAY_MODE and stats:
+                    print('@ 发送抖动统计: ' + str(stats))
+                # 退订媒体频道
+                self.server.closeChannel(self.channel)
+                self.channel = None
+                # 共享套接字 -- 只移除索引
+                if self.rtp_shared:
+                    self.server.rtp_shared.release(self)
+                    self.rtp_shared = False
+                # 关闭 RTP 套接字（未连接的 UDP 套接字 shutdown 会抛出 OSError）
+                else:
+                    self.server.unwatchRtcp(self.rtp_socket)
+                    try:
+                        self.rtp_socket.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                    self.rtp_socket.close()
+                    self.server.rtp_ports.release(self.rtp_server_port)
                 self.rtp_socket = None
-                # 设置 RTP 线程关闭标识
-                self.rtp_teardown_flag = True
-                # 设置播放事件  防止线程阻塞无法关闭
-                self.rtp_play_event.set()
                 # 更新状态
                 self.state = self.INIT
                 return True
@@ -159,172 +401,656 @@ class Handler:
 
             return False
 
+    def release(self):
+        """ 释放会话资源（RTSP 连接断开时调用） """
+        if not self.state == self.INIT:
+            self.__teardown()
+
     def handleRtspConnection(self):
         """ 处理 RTSP/TCP 连接 """
-        # 进行请求处理循环
-        while True:
-            # *** 接收 RTSP/TCP 请求  recvRtspRequest ***
-            request = self.rtsp_socket.recv(1024)
-            if not request:
-                break
-            data = request.decode('utf-8')
-            if DISPLAY_MODE:
-                print('\n@ Data recv:\n' + data)
-                print('\n@ Original state: ' + str(self.state))
-
-            # *** 处理 RTSP/TCP 请求  handleRtspRequest ***
+        try:
+            # 进行请求处理循环
+            while True:
+                # *** 接收 RTSP/TCP 请求  recvRtspRequest ***
+                data = self.rtsp_socket.recv(RTSP_RECV_SIZE)
+                if not data:
+                    break
+                # *** 处理 RTSP/TCP 请求  handleRtspData ***
+                try:
+                    reply = self.handleRtspData(data)
+                except RtspError:
+                    # 无法切分的数据  回复 400 后关闭连接
+                    self.rtsp_socket.sendall(BAD_REQUEST)
+                    break
+                # 发送 RTSP/TCP 回复  sendRtspReply
+                if reply:
+                    self.rtsp_socket.sendall(reply)
+        except ConnectionError:
+            pass
+        except Exception:
+            # 意外异常只结束本连接  不影响其他会话
+            traceback.print_exc()
+        finally:
             try:
-                # 分析 RTSP/TCP 请求
-                if not self.parseRtspRequest(data):
-                    raise KeyError
-                # session_id 判断
-                if (not self.rtsp_request['Command'] == 'SETUP') and (not self.session_id == self.rtsp_request['Session']):
+                # 释放会话资源
+                self.release()
+            finally:
+                # 关闭连接套接字（对端可能已断开）
+                try:
+                    self.rtsp_socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                self.rtsp_socket.close()
+
+    def handleRtspData(self, data):
+        """ 处理接收到的 RTSP/TCP 数据  按序处理其中全部完整请求  返回合并的回复（bytes） """
+        return b''.join([self.handleRtspRequest(message) for message in self.rtsp_parser.feed(data)])
+
+    def handleRtspRequest(self, message):
+        """ 处理一条 RTSP/TCP 请求  返回 RTSP/TCP 回复（bytes  以空行结束） """
+        if DISPLAY_MODE:
+            print('\n@ Data recv:\n' + str(message))
+            print('\n@ Original state: ' + str(self.state))
+        cseq = message.get('CSeq')
+        try:
+            # 分析 RTSP/TCP 请求
+            if not self.parseRtspRequest(message):
+                raise KeyError
+            command = self.rtsp_request['Command']
+            # session_id 判断（OPTIONS / DESCRIBE 无需会话  SETUP 前尚无会话  不接受占位标识 '0'）
+            if command not in ('SETUP', 'OPTIONS', 'DESCRIBE'):
+                if self.state == self.INIT or self.source is None:
+                    raise InvalidState(command)
+                if not self.session_id == self.rtsp_request['Session']:
                     raise KeyError
-                # LIST 命令
-                if self.rtsp_request['Command'] == 'LIST':
-                    if self.__list():
-                        # 返回 200  TODO
-                        line_1 = ['RTSP/1.0', '200', 'OK']
-                        line_2 = ['CSeq:', self.rtsp_request['CSeq']]
-                        line_3 = ['Session:', self.session_id]
-                        self.rtsp_reply = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n'
-                    else:
-                        # 返回 400
-                        self.rtsp_reply = 'RTSP/1.0 400 Bad Request\n'
-                # SETUP 命令
-                if self.rtsp_request['Command'] == 'SETUP':
-                    if self.__setup():
-                        # 返回 200
-                        line_1 = ['RTSP/1.0', '200', 'OK']
-                        line_2 = ['CSeq:', self.rtsp_request['CSeq']]
-                        line_3 = ['Transport:', 'RTP/UDP;client_port=' + str(self.rtsp_request['client_port']) + ';server_port=' + str(self.rtp_server_port) + ';ssrc=']
-                        line_4 = ['Session:', self.session_id]
-                        self.rtsp_reply = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n' + ' '.join(line_4) + '\n'
-                    else:
-                        # 返回 400
-                        self.rtsp_reply = 'RTSP/1.0 400 Bad Request\n'
-                # PLAY 命令
-                elif self.rtsp_request['Command'] == 'PLAY':
-                    if self.__play():
-                        # 返回 200
-                        line_1 = ['RTSP/1.0', '200', 'OK']
-                        line_2 = ['CSeq:', self.rtsp_request['CSeq']]
-                        line_3 = ['Session:', self.session_id]
-                        self.rtsp_reply = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n'
-                    else:
-                        # 返回 400
-                        self.rtsp_reply = 'RTSP/1.0 400 Bad Request\n'
-                # PAUSE 命令
-                elif self.rtsp_request['Command'] == 'PAUSE':
-                    if self.__pause():
-                        # 返回 200
-                        line_1 = ['RTSP/1.0', '200', 'OK']
-                        line_2 = ['CSeq:', self.rtsp_request['CSeq']]
-                        line_3 = ['Session:', self.session_id]
-                        self.rtsp_reply = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n'
-                    else:
-                        # 返回 400
-                        self.rtsp_reply = 'RTSP/1.0 400 Bad Request\n'
-                # TEARDOWN 命令
-                elif self.rtsp_request['Command'] == 'TEARDOWN':
-                    if self.__teardown():
-                        # 返回 200
-                        line_1 = ['RTSP/1.0', '200', 'OK']
-                        line_2 = ['CSeq:', self.rtsp_request['CSeq']]
-                        self.rtsp_reply = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n'
+            # OPTIONS 命令（保活）
+            if command == 'OPTIONS':
+                if 'Session' in self.rtsp_request:
+                    self.rtsp_reply = rtspReply(200, cseq, PUBLIC_HEADER, self.session_header)
+                else:
+                    self.rtsp_reply = rtspReply(200, cseq, PUBLIC_HEADER)
+            # DESCRIBE 命令（媒体信息或分页的媒体列表）
+            elif command == 'DESCRIBE':
+                self.rtsp_reply = rtspReply(200, cseq, *self.describe())
+            # GET_PARAMETER 命令（空消息体为保活  否则返回所请求的参数）
+            elif command == 'GET_PARAMETER':
+                body = self.getParameters(message.body)
+                if body is None:
+                    # 返回 451
+                    self.rtsp_reply = rtspReply(451, cseq, self.session_header)
+                else:
+                    self.rtsp_reply = rtspReply(200, cseq, self.session_header, body=body)
+            # LIST 命令
+            elif command == 'LIST':
+                if self.__list():
+                    # 返回 200  TODO
+                    self.rtsp_reply = rtspReply(200, cseq, self.session_header)
+                else:
+                    # 返回 400
+                    self.rtsp_reply = rtspReply(400, cseq)
+            # SETUP 命令
+            elif command == 'SETUP':
+                if self.__setup():
+                    # 返回 200
+                    if self.multicast_group is not None:
+                        group = self.multicast_group
+                        transport = 'RTP/UDP;multicast;destination=%s;port=%d-%d;ttl=%d;server_port=%d;ssrc=%08X' % (
+                            group.rtp_address[0], group.rtp_address[1], group.rtp_address[1] + 1, group.ttl, self.rtp_server_port, group.rtp_ssrc)
                     else:
-                        # 返回 400
-                        self.rtsp_reply = 'RTSP/1.0 400 Bad Request\n'
-                # 其他命令
+                        transport = 'RTP/UDP;client_port=%s;server_port=%d;ssrc=%08X' % (
+                            self.rtsp_request['client_port'], self.rtp_server_port, self.rtp_ssrc)
+                    self.rtsp_reply = rtspReply(200, cseq, headerLine('Transport', transport), self.session_header,
+                                                headerLine('Length', len(self.source)), headerLine('Frame-Rate', self.frame_rate))
                 else:
-                    raise NotImplementedError
-                if DISPLAY_MODE:
-                    print('\n@ Current state: ' + str(self.state))
-            except KeyError:
-                # 请求格式错误 400
-                self.rtsp_reply = 'RTSP/1.0 400 Bad Request\n'
-            except NotImplementedError:
-                # 方法不支持错误 405
-                self.rtsp_reply = 'RTSP/1.0 405 Method Not Allowed\n'
-            # 发送 RTSP/TCP 回复  sendRtspReply
-            self.rtsp_socket.send(self.rtsp_reply.encode())
-        # 关闭连接套接字
-        self.rtsp_socket.shutdown(socket.SHUT_RDWR)
-        self.rtsp_socket.close()
-
-    def parseRtspRequest(self, data):
+                    # 返回 400
+                    self.rtsp_reply = rtspReply(400, cseq)
+            # PLAY 命令
+            elif command == 'PLAY':
+                if self.__play():
+                    # 返回 200（请求定位时回复实际开始位置  请求突发时回复实际突发帧数）
+                    headers = [self.session_header]
+                    if 'Range' in self.rtsp_request and self.multicast_group is None:
+                        headers.append(headerLine('Range', self.playRange(self.rtsp_request['Range'][0])))
+                    if 'Burst' in self.rtsp_request:
+                        headers.append(headerLine('Burst', self.burst_frames))
+                    # 请求变速时回复实际速率（超出上限的部分计入 Scale  组播不变速  回复 1）
+                    if 'Scale' in self.rtsp_request or 'Speed' in self.rtsp_request:
+                        speed = self.rtsp_request.get('Speed', 1.0) if self.multicast_group is None else 1.0
+                        if 'Scale' in self.rtsp_request:
+                            headers.append(headerLine('Scale', '%g' % (self.scale / speed)))
+                        if 'Speed' in self.rtsp_request:
+                            headers.append(headerLine('Speed', '%g' % speed))
+                    self.rtsp_reply = rtspReply(200, cseq, *headers)
+                else:
+                    # 返回 400
+                    self.rtsp_reply = rtspReply(400, cseq)
+            # PAUSE 命令
+            elif command == 'PAUSE':
+                if self.__pause():
+                    # 返回 200
+                    self.rtsp_reply = rtspReply(200, cseq, self.session_header)
+                else:
+                    # 返回 400
+                    self.rtsp_reply = rtspReply(400, cseq)
+            # TEARDOWN 命令
+            elif command == 'TEARDOWN':
+                if self.__teardown():
+                    # 返回 200
+                    self.rtsp_reply = rtspReply(200, cseq)
+                else:
+                    # 返回 400
+                    self.rtsp_reply = rtspReply(400, cseq)
+            # 其他命令
+            else:
+                raise NotImplementedError
+            if DISPLAY_MODE:
+                print('\n@ Current state: ' + str(self.state))
+        except KeyError:
+            # 请求格式错误 400（带 CSeq 以便客户端匹配请求）
+            self.rtsp_reply = rtspReply(400, cseq)
+        except NotImplementedError:
+            # 方法不支持错误 405
+            self.rtsp_reply = rtspReply(405, cseq, ALLOW_HEADER)
+        except InvalidState:
+            # 当前状态下无效 455
+            self.rtsp_reply = rtspReply(455, cseq, INIT_ALLOW_HEADER)
+        except MediaNotFound:
+            # 媒体不存在 404
+            self.rtsp_reply = rtspReply(404, cseq)
+        except InvalidRange:
+            # Range 无效 457
+            self.rtsp_reply = rtspReply(457, cseq)
+        except PortExhausted:
+            # RTP 端口耗尽 503
+            self.rtsp_reply = rtspReply(503, cseq)
+        except MulticastUnavailable:
+            # 组播传输不可用 461
+            self.rtsp_reply = rtspReply(461, cseq)
+        return self.rtsp_reply
+
+    def describe(self):
+        """ 返回 DESCRIBE 回复的头部行（URL 为媒体名称时返回媒体信息  为空或 * 时按 Search / Offset / Limit 返回一页媒体列表） """
+        url = self.rtsp_request['URL']
+        if url not in ('', '*'):
+            item = self.server.lookupMedia(url)
+            if item is None:
+                raise MediaNotFound(url)
+            frame_rate = item.frame_rate or RTP_FRAME
+            return [headerLine('Length', item.frame_count), headerLine('Frame-Rate', frame_rate),
+                    headerLine('Duration', '%.3f' % duration(item, frame_rate)), headerLine('Variants', ','.join(item.variants)),
+                    headerLine('Keyframe-Interval', item.keyframe_interval)]
+        offset = self.rtsp_request.get('Offset', 0)
+        limit = min(self.rtsp_request.get('Limit', CATALOG_PAGE_SIZE), CATALOG_MAX_PAGE_SIZE)
+        total, matched = self.server.listMedia(self.rtsp_request.get('Search', ''),
+                                             self.rtsp_request.get('Search-Mode') == 'prefix', offset, limit)
+        # 名称列表（JSON）超出头部字段上限时本页提前结束  客户端按 Next-Offset 继续请求
+        names, size = [], 2
+        for name in matched:
+            size += len(json.dumps(name)) + 2
+            if names and size > CATALOG_LIST_BYTES:
+                break
+            names.append(name)
+        headers = [headerLine('List', json.dumps(names)), headerLine('Total', total), headerLine('Offset', offset)]
+        if offset + len(names) < total:
+            headers.append(headerLine('Next-Offset', offset + len(names)))
+        return headers
+
+    def getParameters(self, body):
+        """ 返回 GET_PARAMETER 所请求参数的消息体（空请求返回空消息体  含未知参数返回 None） """
+        values = []
+        for name in body.split():
+            if name == b'position':
+                values.append(b'position: %d\r\n' % self.position(self.frame_number))
+            elif name == b'frames':
+                values.append(b'frames: %d\r\n' % len(self.source))
+            elif name == b'state':
+                values.append(b'state: %d\r\n' % self.state)
+            elif name == b'quality':
+                values.append(b'quality: %s\r\n' % self.source.rungName(self.channel_rung).encode())
+            elif name in (b'loss', b'jitter', b'rtt'):
+                # 客户端接收方报告指标（尚未收到报告时为空）
+                report = self.rtcp_report or {}
+                if name == b'loss':
+                    value = '%s/%d' % (report['fraction_lost'], report['lost']) if report else None
+                else:
+                    value = report.get(name.decode() + '_ms')
+                values.append(b'%s: %s\r\n' % (name, b'' if value is None else str(value).encode()))
+            else:
+                return None
+        return b''.join(values)
+
+    def parseRtspRequest(self, message):
         """ 分析 RTSP/TCP 请求 """
         try:
-            # 创建参数字典
-            lines = str(data).split('\n')
-            self.rtsp_request = {'Command': lines[0].split(' ')[0], 'URL': lines[0].split(' ')[1], 'CSeq': lines[1].split(' ')[1]}
-            # 字段信息提取
-            for line in lines[1:]:
-                words = line.split(' ')
-                # 提取 Session
-                if 'Session' in words[0]:
-                    self.rtsp_request['Session'] = words[1]
-                # 提取 Transport
-                elif 'Transport' in words[0]:
-                    # 提取 client_port
-                    pattern = re.compile(r'client_port=\s*(\S*?)\s*(;|$)')
-                    result = pattern.search(line)
-                    if result:
-                        self.rtsp_request['client_port'] = result.group(1)
-                    else:
-                        raise KeyError
-                # 提取 Range
-                elif 'Range' in words[0]:
-                    pass
+            # 创建参数字典（URL 可为百分号编码  省略 URL 的请求视为空 URL）
+            url = unquote(message.start_line[1]) if len(message.start_line) > 2 else ''
+            self.rtsp_request = {'Command': message.start_line[0], 'URL': url, 'CSeq': message.headers['cseq']}
+            # 提取 Session（忽略 ;timeout 等参数）
+            if 'Session' in message:
+                self.rtsp_request['Session'] = message.get('Session').split(';')[0].strip()
+            # 提取 Transport
+            if 'Transport' in message:
+                transport = parseTransport(message.get('Transport'))
+                # 组播（可选 destination/port/ttl）
+                if 'multicast' in transport:
+                    self.rtsp_request['multicast'] = True
+                    if 'destination' in transport:
+                        self.rtsp_request['destination'] = transport['destination']
+                    if 'port' in transport:
+                        self.rtsp_request['port'] = int(transport['port'].split('-')[0])
+                        if not 0 < self.rtsp_request['port'] < 65536:
+                            raise ValueError('port')
+                    if 'ttl' in transport:
+                        self.rtsp_request['ttl'] = int(transport['ttl'])
+                        if not 0 < self.rtsp_request['ttl'] < 256:
+                            raise ValueError('ttl')
+                # 单播  提取 client_port（1-65535）
+                else:
+                    self.rtsp_request['client_port'] = int(transport['client_port'].split('-')[0])
+                    if not 0 < self.rtsp_request['client_port'] < 65536:
+                        raise ValueError('client_port')
+            # 提取 Range（格式错误时抛出 InvalidRange）
+            if 'Range' in message:
+                self.rtsp_request['Range'] = parseRange(message.get('Range'))
+            # 提取 Compress-Mode
+            if 'Compress-Mode' in message:
+                self.rtsp_request['Compress-Mode'] = message.get('Compress-Mode').strip()
+            # 提取 DESCRIBE 检索（Search-Mode: prefix|substring）与分页参数
+            if 'Search' in message:
+                self.rtsp_request['Search'] = message.get('Search').strip()
+            if 'Search-Mode' in message:
+                self.rtsp_request['Search-Mode'] = message.get('Search-Mode').strip().lower()
+            for name in ('Offset', 'Limit', 'Burst'):
+                if name in message:
+                    self.rtsp_request[name] = int(message.get(name))
+                    if self.rtsp_request[name] < 0:
+                        raise ValueError(name)
+            # 提取 Scale（非零  负数为倒放）/ Speed（正数）
+            for name in ('Scale', 'Speed'):
+                if name in message:
+                    self.rtsp_request[name] = float(message.get(name))
+                    if not math.isfinite(self.rtsp_request[name]) or self.rtsp_request[name] == 0 \
+                            or (name == 'Speed' and self.rtsp_request[name] < 0):
+                        raise ValueError(name)
             return True
-        except KeyError:
+        except InvalidRange:
+            self.rtsp_request = {}
+            raise
+        except (KeyError, ValueError, AttributeError):
             self.rtsp_request = {}
             return False
 
+    def seek(self, unit, start, end):
+        """ 按 Range 定位  下一帧从定位处发送
+
+        npt 时间按帧率换算为帧序号并向前对齐到关键帧（帧数据由索引表直接定位  与媒体长度无关）
+        frames 帧序号直接对齐到关键帧  now 为频道当前直播位置
+        """
+        if start == 'now':
+            self.frame_number = self.channel.liveFrame()
+        else:
+            if unit == RANGE_NPT:
+                frame_number = self.source.frameAt(start)
+                if end is not None:
+                    self.range_end = self.source.lastFrameBefore(end)
+            else:
+                frame_number = self.source.keyframe(start)
+                if end is not None:
+                    self.range_end = min(end, len(self.source) - 1)
+            self.frame_number = frame_number - 1
+        # 下一个帧间隔推进到 frame_number + 1（任意速率下第一帧均为定位处的帧）
+        self.frame_position = self.frame_number + 1 - self.scale
+
+    def playRange(self, unit):
+        """ 返回 PLAY 回复的 Range 字段值（实际开始位置  与请求使用同一单位） """
+        start = self.position(self.frame_number + 1)
+        if unit == RANGE_NPT:
+            end = '' if self.range_end is None else '%.3f' % self.source.timeOf(self.range_end + 1)
+            return 'npt=%.3f-%s' % (self.source.timeOf(start), end)
+        return 'frames=%d-%s' % (start, '' if self.range_end is None else self.range_end)
+
     def createRtpConnection(self):
-        """ 创建 RTP/UDP 连接 """
-        # 创建 RTP/UDP 套接字
-        self.rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        """ 创建 RTP/UDP 连接（从端口池分配端口对  无可用端口时抛出 PortExhausted） """
+        if self.server.rtp_shared is not None:
+            # 共享套接字 -- 不占用端口与文件描述符
+            self.rtp_socket, self.rtp_server_port = self.server.rtp_shared.assign(self)
+            self.rtp_shared = True
+            return
+        self.rtp_socket, self.rtp_server_port = self.server.rtp_ports.open()
+        # 客户端接收方报告与 RTP 复用同一端口
+        self.server.watchRtcp(self.rtp_socket, self.receiveRtcp)
+
+    def receiveRtcp(self, sock):
+        """ 读取会话套接字上全部已到达的 RTCP 数据包 """
+        while True:
+            try:
+                data, address = sock.recvfrom(RTCP_RECV_SIZE, socket.MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # 客户端端口不可达（ICMP）或套接字已关闭  本次不再读取
+                return
+            if isRtcp(data):
+                self.handleRtcp(data, address)
+
+    def handleRtcp(self, data, address):
+        """ 处理 RTCP 数据包（会话套接字读取或共享套接字分发）  记录关于本会话发送流的接收方报告 """
+        self.rtcp_packets += 1
+        for report in parseRtcp(data):
+            for block in report.blocks:
+                if block.ssrc != self.rtp_ssrc:
+                    continue
+                # 往返时延 = 当前 NTP 中间 32 位 - LSR - DLSR（单位 1/65536 秒  LSR 为 0 表示尚未收到 SR）
+                rtt = None
+                if block.lsr:
+                    delay = (ntpMiddle() - block.lsr - block.dlsr) & 0xFFFFFFFF
+                    if delay < 0x80000000:
+                        rtt = round(delay * 1000 / 65536, 3)
+                # 报告间隔内的发送码率
+                now = time.monotonic()
+                elapsed = now - self.rtcp_time_prior if self.rtcp_time_prior else 0
+                send_kbps = round((self.rtp_octet_count - self.rtcp_octets_prior) * 8 / elapsed / 1000, 1) if elapsed > 0 else 0.0
+                self.rtcp_octets_prior = self.rtp_octet_count
+                self.rtcp_time_prior = now
+                self.rtcp_report = {'fraction_lost': round(block.fraction_lost / 256, 4), 'lost': block.cumulative_lost,
+                                    'highest_seq': block.highest_seq, 'jitter_ms': round(block.jitter * 1000 / RTP_CLOCK_RATE, 3),
+                                    'rtt_ms': rtt, 'sent': self.rtp_packet_count, 'send_kbps': send_kbps,
+                                    'quality': self.source.rungName(self.channel_rung), 'time': time.time()}
+                # 码率自适应（第一个报告没有发送码率  不据此切换）
+                if self.abr is not None and not self.abr_pinned and elapsed > 0:
+                    self.abr_rung = self.abr.decide(self.abr_rung, self.rtcp_report)
+
+    def sendRtpFrame(self):
+        """ 发送下一帧（目标质量档位变化时先在帧边界切换到该档位的媒体频道）
+
+        有剩余突发帧时本时刻再多推进至多 RTP_BURST_RATE - 1 个帧间隔（时间戳按呈现时钟  客户端按时间戳呈现）
+        """
+        if self.rangeEnded():
+            return
+        if self.abr_rung != self.channel_rung:
+            self.switchChannel(self.abr_rung)
+        self.advance()
+        if self.burst_frames:
+            extra = min(self.burst_frames, RTP_BURST_RATE - 1)
+            self.burst_frames -= extra
+            for _ in range(extra):
+                if self.rangeEnded():
+                    break
+                self.advance()
+                self.burst_sent += 1
+
+    def advance(self):
+        """ 推进一个帧间隔：呈现时钟 +1  媒体位置 +scale  到达新的关键帧时发送该帧
+
+        快进 / 快退只发送途经的关键帧（跳过其余帧  码率不随速率增长）  慢放时位置未到新帧的帧间隔不发送
+        """
+        self.rtp_clock += 1
+        self.frame_position += self.scale
+        frame_number = math.floor(self.frame_position + 1e-9)
+        frame_number -= frame_number % self.source.keyframe_interval
+        if frame_number == self.frame_number or frame_number < 0:
+            return
+        self.trick_skipped += max(0, abs(frame_number - self.frame_number) - 1)
+        self.frame_number = frame_number
+        self.sendFrame()
+
+    def position(self, frame_number):
+        """ 返回帧序号在媒体中的位置（播放到结尾后循环  帧序号对帧总数取模  与实际发送的帧一致  定位后尚未发送时的 -1 保持不变） """
+        return frame_number % len(self.source) if frame_number >= 0 else frame_number
+
+    def rangeEnded(self):
+        """ 返回是否已发送到 Range 结束位置或倒放到媒体开头（会话保持 PLAYING  等待 PAUSE 或新的 PLAY） """
+        if self.scale < 0:
+            return self.frame_number <= 0
+        return self.range_end is not None and self.frame_number >= self.range_end
+
+    def switchChannel(self, rung):
+        """ 切换到质量档位 rung 的媒体频道（帧序号不变  下一帧起发送新档位） """
+        channel = self.server.openChannel(self.filename, rung)
+        self.server.closeChannel(self.channel)
+        self.channel = channel
+        self.channel_rung = rung
+        self.abr_switches += 1
+        if DISPLAY_MODE:
+            print('@ 会话 %s 切换到 %s 档' % (self.session_id, self.source.rungName(rung)))
+
+
+class AsyncHandler(Handler):
+    """ 异步处理器类（单事件循环  复用 Handler 会话状态机） """
+
+    def createRtpConnection(self):
+        """ 创建 RTP/UDP 连接（非阻塞套接字） """
+        super(AsyncHandler, self).createRtpConnection()
+        if not self.rtp_shared:
+            self.rtp_socket.setblocking(False)
+
+
+class BaseServer:
+    """ 服务端基类（全部会话共享的组件） """
+
+    def __init__(self):
+        """ 类构造方法 """
+        self.batch_sender = BatchSender(RTP_BATCH_MODE) if RTP_BATCH_MODE != 'off' else None  # RTP 批量发送
+        self.scheduler = FrameScheduler(RTP_INTERVAL, flush=self.batch_sender.flush if self.batch_sender else None)  # 帧调度器
+        self.frame_cache = FrameCache(FRAME_CACHE_SIZE)   # 帧缓存
+        self.source = MediaSource(MEDIA_CONTAINER or MEDIA_PATH, self.frame_cache, RTP_FRAME, MEDIA_LADDER, MEDIA_FRAME_COUNT)  # 默认媒体
+        self.catalog = MediaCatalog(MEDIA_CATALOG) if MEDIA_CATALOG else None  # 媒体目录
+        self.sources = {}                         # 媒体目录条目名称 -> 媒体源（首次 SETUP 时打开）
+        self.source_lock = threading.Lock()       # 媒体源的锁
+        self.multicast_groups = {}                # URL -> 组播组
+        self.multicast_lock = threading.Lock()    # 组播组与成员的锁
+        self.multicast_port = MULTICAST_PORT + 2 * WORKER_INDEX   # 下一个分配的组播端口（工作进程间交错分配）
+        self.stats_socket = None                  # 统计上报套接字（工作进程  由主进程汇总）
+        self.channels = {}                        # URL -> 媒体频道
+        self.channel_lock = threading.Lock()      # 媒体频道的锁
+        self.sessions = SessionRegistry(SESSION_KEY, WORKER_INDEX, WORKER_COUNT)  # 会话注册表
+        self.rtp_ports = PortPool(RTP_MIN_PORT, RTP_MAX_PORT, WORKER_INDEX, WORKER_COUNT)  # RTP/RTCP 端口池
+        self.rtp_shared = SharedRtpSockets(self.rtp_ports, RTP_SHARED_SOCKETS) if RTP_SHARED_SOCKETS > 0 else None  # 共享 RTP 套接字
+        self.rtcp_selector = selectors.DefaultSelector()  # 监听 RTCP 的套接字（线程模式由接收线程轮询）
+        if FRAME_CACHE_PREWARM and self.source.media is None:
+            count = self.frame_cache.prewarm(self.source.framePaths())
+            if DISPLAY_MODE:
+                print('@ 帧缓存预加载 %d 帧' % count)
+
+    def frameCount(self):
+        """ 返回默认媒体总帧数 """
+        return len(self.source)
+
+    def mediaBytes(self):
+        """ 返回默认媒体原始档位总字节数 """
+        return self.source.mediaBytes()
+
+    def readFrame(self, frame_number, rung=0):
+        """ 读取默认媒体的帧数据（rung 为质量档位） """
+        return self.source.readFrame(frame_number, rung)
+
+    def lookupMedia(self, url):
+        """ 返回 URL 对应的媒体目录条目（未启用媒体目录时只有默认媒体）  不存在时返回 None """
+        if self.catalog is not None:
+            return self.catalog.lookup(url)
+        item = self.defaultItem()
+        return item if url.lower() == item.name.lower() else None
+
+    def listMedia(self, query, prefix, offset, limit):
+        """ 检索媒体目录  返回 (匹配总数, 一页条目名称) """
+        if self.catalog is not None:
+            return self.catalog.search(query, prefix, offset, limit)
+        item = self.defaultItem()
+        name = item.name.lower()
+        matched = name.startswith(query.lower()) if prefix else query.lower() in name
+        return int(matched), [item.name][offset:offset + limit] if matched else []
+
+    def defaultItem(self):
+        """ 返回描述默认媒体的目录条目（名称为媒体文件名或帧目录名） """
+        path = MEDIA_CONTAINER or os.path.dirname(MEDIA_PATH)
+        name = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+        variants = tuple(self.source.ladder.names) if self.source.ladder is not None else (self.source.rungName(0),)
+        return CatalogItem(name, path, variants, len(self.source), RTP_FRAME, 1, 0)
+
+    def openSource(self, url):
+        """ 返回 URL 对应的媒体源（未启用媒体目录时为默认媒体  否则按需打开目录条目  不存在时抛出 MediaNotFound） """
+        if self.catalog is None:
+            return self.source
+        item = self.catalog.lookup(url)
+        if item is None:
+            raise MediaNotFound(url)
+        with self.source_lock:
+            source = self.sources.get(item.name)
+            if source is None:
+                try:
+                    source = MediaSource(item.path, self.frame_cache, item.frame_rate or RTP_FRAME,
+                                         keyframe_interval=item.keyframe_interval)
+                except (OSError, ValueError, KeyError):
+                    raise MediaNotFound(url)
+                self.sources[item.name] = source
+            return source
+
+    def createAbrPolicy(self, source):
+        """ 为单播会话创建码率自适应策略（媒体源未启用质量阶梯或只有一个档位时返回 None） """
+        if source.ladder is None or len(source.ladder) < 2:
+            return None
+        return ABR_POLICIES[ABR_POLICY](source.ladder.bitrates)
+
+    def openChannel(self, url, rung=0):
+        """ 订阅 URL 对应质量档位的媒体频道（不存在时创建）  返回媒体频道 """
+        source = self.openSource(url)
+        key = url if rung == 0 else '%s@%s' % (url, source.rungName(rung))
+        with self.channel_lock:
+            channel = self.channels.get(key)
+            if channel is None:
+                read_frame = functools.partial(source.readFrame, rung=rung) if rung else source.readFrame
+                channel = MediaChannel(key, read_frame, len(source), RTP_MTU - FRAGMENT_HEADER_SIZE, source.frame_rate)
+                self.channels[key] = channel
+            channel.subscribers += 1
+            return channel
+
+    def closeChannel(self, channel):
+        """ 退订媒体频道  最后一个会话退订时释放频道 """
+        with self.channel_lock:
+            channel.subscribers -= 1
+            if channel.subscribers <= 0 and self.channels.get(channel.url) is channel:
+                del self.channels[channel.url]
+
+    def joinMulticast(self, handler, url, destination=None, port=None, ttl=None):
+        """ 会话加入 URL 对应的组播组（不存在时按请求参数创建  创建失败时抛出 MulticastUnavailable）  返回组播组 """
+        with self.multicast_lock:
+            group = self.multicast_groups.get(url)
+            if group is None:
+                try:
+                    group = MulticastGroup(self, url, destination or MULTICAST_ADDR, self.multicast_port if port is None else port,
+                                           ttl or MULTICAST_TTL)
+                except OSError as error:
+                    raise MulticastUnavailable(str(error)) from error
+                if port is None:
+                    # 组播组创建成功后才占用端口（创建失败不消耗端口）
+                    self.multicast_port += 2 * WORKER_COUNT
+                self.multicast_groups[url] = group
+                if DISPLAY_MODE:
+                    print('@ 创建组播组 %s -> %s:%d' % ((url,) + group.rtp_address))
+            group.members.add(handler)
+            return group
+
+    def leaveMulticast(self, handler, group):
+        """ 会话离开组播组  最后一个会话离开时关闭组播组 """
+        with self.multicast_lock:
+            group.members.discard(handler)
+            group.playing.discard(handler)
+            if not group.playing:
+                self.scheduler.unschedule(group)
+            if group.members:
+                return
+            self.scheduler.discard(group)
+            group.rtp_socket.close()
+            self.closeChannel(group.channel)
+            if self.multicast_groups.get(group.url) is group:
+                del self.multicast_groups[group.url]
+
+    def watchRtcp(self, sock, callback):
+        """ 监听套接字上到达的 RTCP（可读时调用 callback(sock)） """
+        self.rtcp_selector.register(sock, selectors.EVENT_READ, callback)
+
+    def unwatchRtcp(self, sock):
+        """ 停止监听套接字（须在关闭套接字之前调用） """
         try:
-            # 绑定套接字  使用随机的端口
-            self.rtp_server_port = random.randint(RTP_MIN_PORT, RTP_MAX_PORT)
-            self.rtp_socket.bind(("", self.rtp_server_port))
-            return True
-        except OSError:
-            self.rtp_socket = None
-            return False
+            self.rtcp_selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
 
-    def handleRtpConnection(self):
-        """ 处理 RTP/UDP 连接 """
-        # TODO
+    def receiveRtcp(self):
+        """ 接收 RTCP 循环（线程模式  循环阻塞） """
         while True:
+            for key, events in self.rtcp_selector.select(1.0):
+                key.data(key.fileobj)
+
+    def rtcpStats(self):
+        """ 返回各会话最近一次接收方报告的指标（会话标识 -> 指标） """
+        return {session.session_id: session.rtcp_report for session in self.sessions.sessions() if session.rtcp_report is not None}
+
+    def stats(self):
+        """ 返回服务端统计 """
+        stats = {'sessions': self.sessions.stats(), 'rtp_ports': self.rtp_ports.stats(), 'frame_cache': self.frame_cache.stats()}
+        if WORKER_COUNT > 1:
+            stats['worker'] = {'index': WORKER_INDEX, 'pid': os.getpid()}
+        if self.batch_sender is not None:
+            stats['rtp_batch'] = self.batch_sender.stats()
+        if self.rtp_shared is not None:
+            stats['rtp_shared'] = self.rtp_shared.stats()
+        ladder = self.source.ladder
+        if ladder is not None:
+            sessions = [session for session in self.sessions.sessions() if session.abr is not None and session.source is self.source]
+            stats['ladder'] = {'kbps': ladder.stats(), 'policy': ABR_POLICY,
+                               'sessions': {name: sum(1 for session in sessions if session.channel_rung == rung)
+                                            for rung, name in enumerate(ladder.names)},
+                               'switches': sum(session.abr_switches for session in sessions)}
+        trick = [session for session in self.sessions.sessions() if session.scale != 1]
+        if trick:
+            stats['trick'] = {'sessions': len(trick), 'skipped': sum(session.trick_skipped for session in trick)}
+        bursting = [session for session in self.sessions.sessions() if session.burst_sent]
+        if bursting:
+            stats['burst'] = {'rate': RTP_BURST_RATE, 'sessions': sum(1 for session in bursting if session.burst_frames),
+                              'frames': sum(session.burst_sent for session in bursting)}
+        reports = self.rtcpStats()
+        if reports:
+            stats['rtcp'] = {'reporting': len(reports), 'lost': sum(report['lost'] for report in reports.values()),
+                             'sessions': reports}
+        if self.source.media is not None:
+            stats['media'] = {'path': self.source.media.path, 'frames': len(self.source), 'fps': RTP_FRAME}
+        if self.catalog is not None:
+            stats['catalog'] = {'path': self.catalog.path, 'items': len(self.catalog), 'open': len(self.sources)}
+        if self.channels:
+            stats['channels'] = {url: channel.stats() for url, channel in list(self.channels.items())}
+        if self.multicast_groups:
+            stats['multicast'] = {url: group.stats() for url, group in list(self.multicast_groups.items())}
+        return stats
+
+    def printStats(self):
+        """ 输出服务端统计（工作进程发送给主进程汇总） """
+        if self.stats_socket is not None:
             try:
-                time.sleep(RTP_INTERVAL)
-                self.rtp_play_event.wait()
-                if self.rtp_teardown_flag:
-                    raise OSError
-                self.frame_number += 1
-                pic_index = self.frame_number % 183
-                pic_path = './pic/pic-%05d.jpg' % pic_index
-                self.rtp_socket.sendto(self.createRtpPacket(pic_path).get_packet(), ('127.0.0.1', self.rtp_client_port))
+                self.stats_socket.send(json.dumps(self.stats()).encode())
             except OSError:
-                break
-        print('@ 服务端线程已退出')
+                pass
+            return
+        print('@ Stats: ' + json.dumps(self.stats()), flush=True)
+
+    def reportStats(self):
+        """ 定期输出服务端统计（循环阻塞） """
+        while True:
+            time.sleep(STATS_INTERVAL)
+            self.printStats()
 
-    def createRtpPacket(self, path):
-        file = open(path, "rb")
-        data = file.read()
-        file.close()
-        rtp_packet = RtpPacket()
-        rtp_packet.encode(0, 0, 0, 0, 0, 0, self.frame_number, 0, data)
-        return rtp_packet
 
-class Server:
+class Server(BaseServer):
     """ 服务端类 """
 
     def __init__(self, server_addr, server_port, server_max_connection):
         """ 类构造方法 """
+        super(Server, self).__init__()
         self.rtspSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.rtspSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if WORKER_COUNT > 1:
+            # 多个工作进程绑定同一端口  由内核分配新连接
+            self.rtspSocket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.rtspSocket.bind((server_addr, server_port))
         self.rtspSocket.listen(server_max_connection)
         if DISPLAY_MODE:
@@ -332,6 +1058,15 @@ class Server:
 
     def run(self):
         """ 创建 RTSP/TCP 连接（循环阻塞） """
+        # 启动共享帧调度线程
+        self.scheduler.start()
+        # 启动 RTCP 接收线程（共享套接字与各会话套接字）
+        if self.rtp_shared is not None:
+            for sock in self.rtp_shared.sockets():
+                self.watchRtcp(sock, self.rtp_shared.receive)
+        threading.Thread(target=self.receiveRtcp, daemon=True).start()
+        if STATS_INTERVAL > 0:
+            threading.Thread(target=self.reportStats, daemon=True).start()
         while True:
             # 接受新RTSP连接:
             sock, addr = self.rtspSocket.accept()
@@ -339,17 +1074,323 @@ class Server:
             t = threading.Thread(target=self.handle, args=(sock, addr))
             t.start()
 
-    @staticmethod
-    def handle(sock, addr):
+    def handle(self, sock, addr):
         """ 处理 RTSP/TCP 连接 """
         if DISPLAY_MODE:
             print('Accept new connection from %s:%s...' % addr)
-        handler = Handler(sock, addr)
+        handler = Handler(sock, addr, self)
         handler.handleRtspConnection()
         if DISPLAY_MODE:
             print('Connection from %s:%s closed.' % addr)
 
 
-if __name__ == '__main__':
-    server = Server(SERVER_ADDR, SERVER_PORT, SERVER_MAX_CONNECTION)
+class AsyncServer(BaseServer):
+    """ 异步服务端类（asyncio 单线程处理全部 RTSP 控制与 RTP 发送） """
+
+    def __init__(self, server_addr, server_port, server_max_connection):
+        """ 类构造方法 """
+        super(AsyncServer, self).__init__()
+        self.server_addr = server_addr
+        self.server_port = server_port
+        self.server_max_connection = server_max_connection
+        self.loop = None
+
+    def run(self):
+        """ 运行事件循环（循环阻塞） """
+        asyncio.run(self.serve())
+
+    def watchRtcp(self, sock, callback):
+        """ 监听套接字上到达的 RTCP（由事件循环读取） """
+        self.loop.add_reader(sock, callback, sock)
+
+    def unwatchRtcp(self, sock):
+        """ 停止监听套接字（须在关闭套接字之前调用） """
+        self.loop.remove_reader(sock)
+
+    async def serve(self):
+        """ 创建 RTSP/TCP 监听 """
+        server = await asyncio.start_server(self.handle, self.server_addr, self.server_port,
+                                            backlog=self.server_max_connection, reuse_address=True,
+                                            reuse_port=WORKER_COUNT > 1)
+        if DISPLAY_MODE:
+            print('Server initialization succeeded.\nWaiting for connection...')
+        # 在同一事件循环中运行共享帧调度
+        self.loop = asyncio.get_running_loop()
+        scheduler_task = self.loop.create_task(self.scheduler.runAsync())
+        if self.rtp_shared is not None:
+            # 共享 RTP 套接字上的 RTCP 由事件循环读取
+            for sock in self.rtp_shared.sockets():
+                self.watchRtcp(sock, self.rtp_shared.receive)
+        stats_task = asyncio.get_running_loop().create_task(self.reportStatsAsync()) if STATS_INTERVAL > 0 else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.scheduler.stop()
+            await scheduler_task
+            if stats_task:
+                stats_task.cancel()
+
+    async def reportStatsAsync(self):
+        """ 定期输出服务端统计（协程） """
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            self.printStats()
+
+    async def handle(self, reader, writer):
+        """ 处理 RTSP/TCP 连接（协程） """
+        addr = writer.get_extra_info('peername')[:2]
+        if DISPLAY_MODE:
+            print('Accept new connection from %s:%s...' % addr)
+        handler = AsyncHandler(writer.get_extra_info('socket'), addr, self)
+        try:
+            while True:
+                data = await reader.read(RTSP_RECV_SIZE)
+                if not data:
+                    break
+                try:
+                    reply = handler.handleRtspData(data)
+                except RtspError:
+                    # 无法切分的数据  回复 400 后关闭连接
+                    writer.write(BAD_REQUEST)
+                    await writer.drain()
+                    break
+                if reply:
+                    writer.write(reply)
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception:
+            # 意外异常只结束本连接  不影响其他会话
+            traceback.print_exc()
+        finally:
+            try:
+                handler.release()
+            finally:
+                writer.close()
+        if DISPLAY_MODE:
+            print('Connection from %s:%s closed.' % addr)
+
+
+class WorkerPool:
+    """ 多进程服务端（每个工作进程运行完整的服务端  SO_REUSEPORT 由内核在进程间分配 RTSP 连接） """
+
+    def __init__(self, mode, server_addr, server_port, server_max_connection, workers):
+        """ 类构造方法 """
+        self.mode = mode
+        self.server_addr = server_addr
+        self.server_port = server_port
+        self.server_max_connection = server_max_connection
+        self.workers = workers
+        self.pids = {}                  # 进程号 -> 工作进程序号
+        self.stats_socket = None        # 接收工作进程统计（主进程端）
+        self.worker_stats = {}          # 工作进程序号 -> 最近一次统计
+
+    def run(self):
+        """ 创建工作进程并监视（循环阻塞  工作进程退出时重新创建） """
+        worker_socket = None
+        if STATS_INTERVAL > 0:
+            self.stats_socket, worker_socket = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.stats_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, WORKER_STATS_SIZE * self.workers)
+        # SIGTERM 时同样结束全部工作进程
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        for index in range(self.workers):
+            self.spawn(index, worker_socket)
+        if DISPLAY_MODE:
+            print('@ %d 个工作进程已启动（%s 模式）' % (self.workers, self.mode))
+        next_report = time.monotonic() + STATS_INTERVAL
+        try:
+            while True:
+                if self.stats_socket is not None:
+                    timeout = max(next_report - time.monotonic(), 0)
+                    readable, writable, errors = select.select([self.stats_socket], [], [], min(timeout, 1.0))
+                    if readable:
+                        self.receiveStats()
+                    if time.monotonic() >= next_report:
+                        next_report += STATS_INTERVAL
+                        self.printStats()
+                else:
+                    time.sleep(1.0)
+                # 回收退出的工作进程并重新创建
+                while self.pids:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                    if pid == 0:
+                        break
+                    index = self.pids.pop(pid, None)
+                    if index is not None:
+                        self.worker_stats.pop(index, None)
+                        print('@ 工作进程 %d（pid %d）退出  状态 %d  重新创建' % (index, pid, status), flush=True)
+                        self.spawn(index, worker_socket)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for pid in self.pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            for pid in self.pids:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+
+    def spawn(self, index, worker_socket):
+        """ 创建序号为 index 的工作进程 """
+        parent = os.getpid()
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = index
+            return
+        # --- 工作进程 ---
+        code = 0
+        try:
+            if self.stats_socket is not None:
+                self.stats_socket.close()
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            exitWithParent()
+            if os.getppid() != parent:
+                # 设置前主进程已退出
+                return
+            self.runWorker(index, worker_socket)
+        except KeyboardInterrupt:
+            pass
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def runWorker(self, index, worker_socket):
+        """ 在工作进程中运行服务端 """
+        global WORKER_INDEX, WORKER_COUNT
+        WORKER_INDEX = index
+        WORKER_COUNT = self.workers
+        if self.mode == 'async':
+            server = AsyncServer(self.server_addr, self.server_port, self.server_max_connection)
+        else:
+            server = Server(self.server_addr, self.server_port, self.server_max_connection)
+        server.stats_socket = worker_socket
+        server.run()
+
+    def receiveStats(self):
+        """ 读取全部已到达的工作进程统计 """
+        while True:
+            try:
+                data = self.stats_socket.recv(WORKER_STATS_SIZE, socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                return
+            stats = json.loads(data.decode())
+            self.worker_stats[stats['worker']['index']] = stats
+
+    def printStats(self):
+        """ 输出汇总统计（各工作进程数值相加）与各工作进程统计 """
+        total = {}
+        for index in sorted(self.worker_stats):
+            mergeStats(total, self.worker_stats[index])
+        total.pop('worker', None)
+        if 'frame_cache' in total:
+            cache = total['frame_cache']
+            lookups = cache['hits'] + cache['misses']
+            cache['hit_ratio'] = cache['hits'] / lookups if lookups else 0.0
+        stats = {'workers': len(self.worker_stats), 'total': total,
+                 'per_worker': [self.worker_stats[index] for index in sorted(self.worker_stats)]}
+        print('@ Stats: ' + json.dumps(stats), flush=True)
+
+
+def exitWithParent():
+    """ 主进程退出（包括被 SIGKILL）时向当前进程发送 SIGTERM（Linux prctl PR_SET_PDEATHSIG  其他系统忽略） """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.prctl(1, signal.SIGTERM, 0, 0, 0)
+    except (OSError, AttributeError):
+        pass
+
+
+def mergeStats(total, stats):
+    """ 将一个工作进程的统计累加到 total（数值相加  其他值保留首个  media 为各进程共享的同一文件） """
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            if key == 'media' and key in total:
+                continue
+            mergeStats(total.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
+        else:
+            total.setdefault(key, value)
+
+
+def main(argv):
+    """ 程序主入口 """
+    global DISPLAY_MODE, FRAME_CACHE_SIZE, FRAME_CACHE_PREWARM, STATS_INTERVAL, MEDIA_CONTAINER, RTP_BATCH_MODE
+    global MULTICAST_ADDR, MULTICAST_INTERFACE, RTP_SHARED_SOCKETS, MEDIA_LADDER, ABR_POLICY, RTP_FRAME, RTP_INTERVAL, MEDIA_CATALOG
+    global RTP_BURST_RATE
+    ip = SERVER_ADDR
+    port = SERVER_PORT
+    mode = 'thread'
+    workers = 1
+    try:
+        opts, args = getopt.getopt(argv, 'i:p:m:q', ['ip=', 'port=', 'mode=', 'quiet', 'cache-size=', 'prewarm', 'stats=', 'media=', 'batch=', 'multicast-addr=', 'multicast-if=', 'workers=', 'shared-rtp=', 'ladder=', 'abr=', 'catalog=', 'burst-rate='])
+    except getopt.GetoptError:
+        print('usage: Server.py --ip <ip> --port <port> --mode <thread|async> [--quiet] '
+              '[--cache-size <MB>] [--prewarm] [--stats <seconds>] [--media <container>] '
+              '[--batch <auto|gso|mmsg|sendto|off>] [--multicast-addr <group>] [--multicast-if <interface ip>] '
+              '[--workers <N>] [--shared-rtp <sockets>] [--ladder <base>] [--abr <%s>] [--catalog <catalog>] '
+              '[--burst-rate <N>]' % '|'.join(ABR_POLICIES))
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ('-i', '--ip'):
+            ip = arg
+        elif opt in ('-p', '--port'):
+            port = int(arg)
+        elif opt in ('-m', '--mode'):
+            mode = arg
+        elif opt in ('-q', '--quiet'):
+            DISPLAY_MODE = False
+        elif opt == '--cache-size':
+            FRAME_CACHE_SIZE = int(float(arg) * 1024 * 1024)
+        elif opt == '--prewarm':
+            FRAME_CACHE_PREWARM = True
+        elif opt == '--stats':
+            STATS_INTERVAL = float(arg)
+        elif opt == '--media':
+            MEDIA_CONTAINER = arg
+        elif opt == '--batch':
+            RTP_BATCH_MODE = arg
+        elif opt == '--multicast-addr':
+            MULTICAST_ADDR = arg
+        elif opt == '--multicast-if':
+            MULTICAST_INTERFACE = arg
+        elif opt == '--workers':
+            workers = int(arg)
+        elif opt == '--shared-rtp':
+            RTP_SHARED_SOCKETS = int(arg)
+        elif opt == '--ladder':
+            MEDIA_LADDER = arg
+        elif opt == '--abr':
+            if arg not in ABR_POLICIES:
+                print('@ 未知的码率自适应策略 %s（可选 %s）' % (arg, ', '.join(ABR_POLICIES)))
+                sys.exit(2)
+            ABR_POLICY = arg
+        elif opt == '--catalog':
+            MEDIA_CATALOG = arg
+        elif opt == '--burst-rate':
+            RTP_BURST_RATE = max(1, int(arg))
+    # 媒体清单或打包媒体文件记录的帧率决定发送帧率
+    if MEDIA_CONTAINER and readFrameRate(MEDIA_CONTAINER):
+        RTP_FRAME = readFrameRate(MEDIA_CONTAINER)
+        RTP_INTERVAL = 1 / RTP_FRAME
+    if workers > 1:
+        if not hasattr(os, 'fork') or not hasattr(socket, 'SO_REUSEPORT'):
+            print('@ --workers 需要 fork 与 SO_REUSEPORT 支持（Linux / BSD）')
+            sys.exit(2)
+        server = WorkerPool(mode, ip, port, SERVER_MAX_CONNECTION, workers)
+    elif mode == 'async':
+        server = AsyncServer(ip, port, SERVER_MAX_CONNECTION)
+    else:
+        server = Server(ip, port, SERVER_MAX_CONNECTION)
     server.run()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,97 @@
+import math
+import random
+import threading
+
+MIN_SESSION_ID = 10000000
+MAX_SESSION_ID = 99999999
+
+
+def makeSessionKey(id_range=MAX_SESSION_ID - MIN_SESSION_ID + 1):
+    """ 生成会话标识置换参数 (乘数, 偏移)（乘数与 id_range 互素  保证置换为双射） """
+    generator = random.SystemRandom()
+    while True:
+        multiplier = generator.randrange(id_range // 3, id_range)
+        if math.gcd(multiplier, id_range) == 1:
+            return multiplier, generator.randrange(id_range)
+
+
+class SessionRegistry:
+    """ 会话注册表类（O(1) 分配不重复的会话标识  按标识 / 客户端地址 / URL 索引会话）
+
+    会话标识 = MIN_SESSION_ID + (乘数 * 序号 + 偏移) mod 标识范围
+    序号按工作进程分区（序号 mod worker_count == worker_index）  各进程共用同一置换参数时标识互不重复
+    """
+
+    def __init__(self, key, worker_index=0, worker_count=1, min_id=MIN_SESSION_ID, max_id=MAX_SESSION_ID):
+        """ 类构造方法 """
+        self.multiplier, self.offset = key      # 置换参数（各工作进程须相同）
+        self.min_id = min_id
+        self.id_range = max_id - min_id + 1     # 标识范围
+        self.worker_count = worker_count
+        self.counter = worker_index             # 下一个序号
+        self.lock = threading.Lock()            # 多线程访问锁
+        self.by_id = {}                         # 会话标识 -> 会话
+        self.by_address = {}                    # 客户端地址 -> 会话
+        self.by_url = {}                        # URL -> {会话标识: 会话}
+        self.allocated = 0                      # 已分配标识数
+
+    def nextId(self):
+        """ 分配下一个会话标识（调用方持有锁） """
+        session_id = self.min_id + (self.multiplier * self.counter + self.offset) % self.id_range
+        self.counter = (self.counter + self.worker_count) % self.id_range
+        return session_id
+
+    def register(self, session, address, url):
+        """ 注册会话  返回分配的会话标识（字符串） """
+        with self.lock:
+            session_id = str(self.nextId())
+            while session_id in self.by_id:
+                # 序号回绕（分配满标识范围）后才可能遇到仍在使用的标识
+                session_id = str(self.nextId())
+            self.allocated += 1
+            self.by_id[session_id] = session
+            self.by_address[address] = session
+            self.by_url.setdefault(url, {})[session_id] = session
+            return session_id
+
+    def unregister(self, session_id, address, url):
+        """ 注销会话 """
+        with self.lock:
+            session = self.by_id.pop(session_id, None)
+            if session is None:
+                return
+            if self.by_address.get(address) is session:
+                del self.by_address[address]
+            sessions = self.by_url.get(url)
+            if sessions is not None:
+                sessions.pop(session_id, None)
+                if not sessions:
+                    del self.by_url[url]
+
+    def get(self, session_id):
+        """ 按会话标识查找会话 """
+        return self.by_id.get(session_id)
+
+    def getByAddress(self, address):
+        """ 按客户端地址查找会话 """
+        return self.by_address.get(address)
+
+    def getByUrl(self, url):
+        """ 返回 URL 的全部会话（快照列表） """
+        with self.lock:
+            return list(self.by_url.get(url, {}).values())
+
+    def sessions(self):
+        """ 返回全部会话（快照列表  可在迭代中注销） """
+        with self.lock:
+            return list(self.by_id.values())
+
+    def __len__(self):
+        """ 返回会话数 """
+        return len(self.by_id)
+
+    def stats(self):
+        """ 返回注册表统计 """
+        with self.lock:
+            return {'sessions': len(self.by_id), 'urls': {url: len(sessions) for url, sessions in self.by_url.items()},
+                    'allocated': self.allocated}
@@ -0,0 +1,102 @@
+import socket
+import threading
+from Rtcp import RTCP_RECV_SIZE, isRtcp, parseRtcp
+
+
+class SharedRtpSockets:
+    """ 共享 RTP 套接字类（全部单播会话从少量套接字发送 RTP  按来源地址 / SSRC 将收到的 RTCP 分发给会话）
+
+    每个套接字对从端口池分配：偶数端口发送 RTP（也接收复用的 RTCP）  其后的奇数端口接收 RTCP
+    """
+
+    def __init__(self, ports, count):
+        """ 类构造方法 """
+        self.ports = ports                  # 端口池
+        self.pairs = []                     # [(RTP 套接字, RTCP 套接字, RTP 端口)]
+        for index in range(count):
+            rtp_socket, rtcp_socket, port = ports.open(rtcp=True)
+            rtp_socket.setblocking(False)
+            rtcp_socket.setblocking(False)
+            self.pairs.append((rtp_socket, rtcp_socket, port))
+        self.load = [0] * count             # 每个套接字对分配的会话数
+        self.assigned = {}                  # 会话 -> 套接字对序号
+        self.by_address = {}                # 客户端 RTP / RTCP 地址 -> 会话
+        self.by_ssrc = {}                   # 会话发送流 SSRC -> 会话
+        self.lock = threading.Lock()        # 多线程访问锁
+        # --- 统计 ---
+        self.rtcp_packets = 0
+        self.unmatched = 0
+
+    def assign(self, session):
+        """ 为会话分配负载最小的套接字对（会话需已设置 rtp_address 与 rtp_ssrc）  返回 (RTP 套接字, 服务端端口) """
+        with self.lock:
+            index = self.load.index(min(self.load))
+            self.load[index] += 1
+            self.assigned[session] = index
+            host, port = session.rtp_address
+            self.by_address[(host, port)] = session
+            self.by_address[(host, port + 1)] = session
+            self.by_ssrc[session.rtp_ssrc] = session
+            rtp_socket, rtcp_socket, server_port = self.pairs[index]
+            return rtp_socket, server_port
+
+    def release(self, session):
+        """ 会话退出  移除索引（套接字保持打开） """
+        with self.lock:
+            index = self.assigned.pop(session, None)
+            if index is None:
+                return
+            self.load[index] -= 1
+            host, port = session.rtp_address
+            for address in ((host, port), (host, port + 1)):
+                if self.by_address.get(address) is session:
+                    del self.by_address[address]
+            if self.by_ssrc.get(session.rtp_ssrc) is session:
+                del self.by_ssrc[session.rtp_ssrc]
+
+    def sockets(self):
+        """ 返回需要监听 RTCP 的全部套接字 """
+        return [sock for rtp_socket, rtcp_socket, port in self.pairs for sock in (rtp_socket, rtcp_socket)]
+
+    def receive(self, sock):
+        """ 读取套接字上全部已到达的数据包  将 RTCP 分发给对应会话 """
+        while True:
+            try:
+                data, address = sock.recvfrom(RTCP_RECV_SIZE, socket.MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # 客户端端口不可达（ICMP）或套接字已关闭  本次不再读取
+                return
+            if not isRtcp(data):
+                self.unmatched += 1
+                continue
+            session = self.by_address.get(address)
+            if session is None:
+                # 来源地址未知（如经过 NAT）  按报告块中的 SSRC 查找
+                for report in parseRtcp(data):
+                    for block in report.blocks:
+                        session = self.by_ssrc.get(block.ssrc)
+                        if session is not None:
+                            break
+                    if session is not None:
+                        break
+            if session is None:
+                self.unmatched += 1
+                continue
+            self.rtcp_packets += 1
+            session.handleRtcp(data, address)
+
+    def close(self):
+        """ 关闭全部套接字并归还端口 """
+        for rtp_socket, rtcp_socket, port in self.pairs:
+            rtp_socket.close()
+            rtcp_socket.close()
+            self.ports.release(port)
+        self.pairs = []
+
+    def stats(self):
+        """ 返回共享套接字统计 """
+        with self.lock:
+            return {'sockets': [port for rtp_socket, rtcp_socket, port in self.pairs], 'sessions': list(self.load),
+                    'rtcp_packets': self.rtcp_packets, 'unmatched': self.unmatched}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 被测模块为 src 目录下的平铺模块（按模块名导入）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
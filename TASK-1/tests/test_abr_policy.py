@@ -0,0 +1,73 @@
+from AbrPolicy import AbrPolicy, LossPolicy, BandwidthPolicy, ABR_POLICIES
+
+BITRATES = [4000000, 2000000, 1000000, 500000]     # 从高到低（bit/s）
+
+
+def report(fraction_lost=0.0, jitter_ms=5.0, send_kbps=0.0):
+    """ 接收方报告指标 """
+    return {'fraction_lost': fraction_lost, 'jitter_ms': jitter_ms, 'rtt_ms': None, 'send_kbps': send_kbps}
+
+
+GOOD, LOSSY, JITTERY, FAIR = report(), report(0.1), report(jitter_ms=80), report(0.03)
+
+
+def test_fixed_policy():
+    """ 基类保持档位不变 """
+    assert ABR_POLICIES['fixed'] is AbrPolicy
+    assert AbrPolicy(BITRATES).decide(2, LOSSY) == 2
+
+
+def test_loss_policy_steps_down():
+    """ 丢包或抖动超过上限立即降一档  最低档位不再下降 """
+    policy = LossPolicy(BITRATES)
+    assert policy.decide(0, LOSSY) == 1
+    assert policy.decide(1, JITTERY) == 2
+    assert policy.decide(3, LOSSY) == 3
+
+
+def test_loss_policy_steps_up():
+    """ 连续 up_reports 个良好报告才升一档  介于上下限之间时保持并重新计数  最高档位不再上升 """
+    policy = LossPolicy(BITRATES, up_reports=2)
+    assert policy.decide(2, GOOD) == 2
+    assert policy.decide(2, FAIR) == 2
+    assert policy.decide(2, GOOD) == 2
+    assert policy.decide(2, GOOD) == 1
+    assert [policy.decide(0, GOOD) for _ in range(3)] == [0, 0, 0]
+
+
+def test_loss_policy_hold_doubles():
+    """ 升档后立即需要降档时升档所需报告数加倍（不超过 max_hold）  升档后保持良好则恢复 """
+    policy = LossPolicy(BITRATES, up_reports=2, max_hold=4)
+    rung = 2
+    for hold in (2, 4, 4):
+        decisions = [policy.decide(rung, GOOD) for _ in range(hold)]
+        assert decisions == [rung] * (hold - 1) + [rung - 1]
+        assert policy.decide(rung - 1, LOSSY) == rung
+    assert policy.hold == 4
+    for _ in range(4):
+        policy.decide(rung, GOOD)
+    assert policy.decide(rung - 1, GOOD) == rung - 1
+    assert policy.hold == 2
+
+
+def test_bandwidth_policy_congested():
+    """ 有丢包时按送达码率 × 余量选择档位（可直接降多档） """
+    policy = BandwidthPolicy(BITRATES, margin=0.9)
+    assert policy.decide(0, report(0.5, send_kbps=2500)) == 2
+    assert policy.estimate == 1250000
+    # 仍饱和时估计值只降不升
+    assert policy.decide(2, report(0.1, send_kbps=4000)) == 2
+    assert policy.estimate == 1250000
+    assert BandwidthPolicy(BITRATES).decide(0, report(0.1, send_kbps=100)) == 3
+
+
+def test_bandwidth_policy_probes_up():
+    """ 无丢包时估计值按 growth 放大  逐步升到估计值允许的档位  不降档 """
+    policy = BandwidthPolicy(BITRATES, margin=0.9, growth=1.1)
+    assert policy.decide(0, report(send_kbps=100)) == 0
+    policy = BandwidthPolicy(BITRATES, margin=0.9, growth=1.1)
+    rungs = [3]
+    for _ in range(30):
+        rungs.append(policy.decide(rungs[-1], report(send_kbps=BITRATES[rungs[-1]] / 1000)))
+    assert rungs == sorted(rungs, reverse=True)
+    assert rungs[-1] == 0
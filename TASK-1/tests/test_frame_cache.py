@@ -0,0 +1,59 @@
+import pytest
+
+from FrameCache import FrameCache
+
+
+@pytest.fixture
+def frames(tmp_path):
+    """ 5 个 100 字节的帧文件  返回路径列表 """
+    paths = []
+    for index in range(5):
+        path = tmp_path / ('pic-%05d.jpg' % index)
+        path.write_bytes(bytes([index]) * 100)
+        paths.append(str(path))
+    return paths
+
+
+def test_hit_and_miss(frames):
+    """ 首次读取从磁盘加载  再次读取命中缓存 """
+    cache = FrameCache(1000)
+    assert cache.get(frames[0]) == b'\x00' * 100
+    assert cache.get(frames[0]) == b'\x00' * 100
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['loaded_bytes']) == (1, 1, 100)
+    assert stats['hit_ratio'] == 0.5
+
+
+def test_lru_eviction(frames):
+    """ 超出字节上限时淘汰最久未使用的帧（读取会刷新使用顺序） """
+    cache = FrameCache(300)
+    for path in frames[:3]:
+        cache.get(path)
+    cache.get(frames[0])
+    cache.get(frames[3])
+    assert list(cache.frames) == [frames[2], frames[0], frames[3]]
+    assert cache.size == 300 and cache.evictions == 1
+    cache.get(frames[1])
+    assert cache.stats()['misses'] == 5
+
+
+def test_byte_cap(frames, tmp_path):
+    """ 缓存字节数不超过上限  大于上限的帧不缓存 """
+    cache = FrameCache(250)
+    for path in frames:
+        cache.get(path)
+        assert cache.size <= 250
+    assert len(cache.frames) == 2
+    large = tmp_path / 'large.jpg'
+    large.write_bytes(b'x' * 251)
+    assert len(cache.get(str(large))) == 251
+    assert str(large) not in cache.frames
+    assert cache.size == 200
+
+
+def test_prewarm_stops_when_full(frames):
+    """ 预加载到缓存写满为止（不淘汰已加载的帧） """
+    cache = FrameCache(250)
+    assert cache.prewarm(frames) == 2
+    assert list(cache.frames) == frames[:2]
+    assert cache.evictions == 0
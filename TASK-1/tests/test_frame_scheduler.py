@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+
+from FrameScheduler import FrameScheduler
+
+INTERVAL = 0.1
+
+
+class FakeClock:
+    """ 手动推进的单调时钟 """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    """ 记录发送顺序的会话（action 在发送时调用） """
+
+    def __init__(self, name, sent, action=None):
+        self.name = name
+        self.sent = sent
+        self.action = action
+
+    def sendRtpFrame(self):
+        self.sent.append(self.name)
+        if self.action is not None:
+            self.action()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return FrameScheduler(INTERVAL, clock)
+
+
+def test_deadline_order(scheduler, clock):
+    """ 到期会话按到期时刻发送  同一时刻按加入顺序  返回下一个到期时刻 """
+    sent = []
+    slow, fast, second = FakeSession('slow', sent), FakeSession('fast', sent), FakeSession('second', sent)
+    scheduler.schedule(slow, 0.25)
+    scheduler.schedule(fast)
+    scheduler.schedule(second)
+    assert scheduler.runDue() == pytest.approx(100.1)
+    assert sent == []
+    clock.now += 0.25
+    scheduler.runDue()
+    assert sent == ['fast', 'second', 'slow']
+    # fast / second 错过 100.2 跳到下一个网格时刻 100.3（不突发补发）  早于 slow 的 100.5
+    assert scheduler.stats[fast].skipped == 1
+    del sent[:]
+    clock.now = scheduler.runDue()
+    assert clock.now == pytest.approx(100.3)
+    assert scheduler.runDue() == pytest.approx(100.4)
+    assert sent == ['fast', 'second']
+    clock.now = 100.5
+    scheduler.runDue()
+    assert sent == ['fast', 'second', 'fast', 'second', 'slow']
+
+
+def test_unschedule(scheduler, clock):
+    """ unschedule 后不再发送  统计保留  重新 schedule 后继续 """
+    sent = []
+    session = FakeSession('a', sent)
+    scheduler.schedule(session)
+    scheduler.unschedule(session)
+    clock.now += 1
+    assert scheduler.runDue() is None
+    assert sent == []
+    assert session in scheduler.stats
+    scheduler.schedule(session)
+    clock.now += 1
+    scheduler.runDue()
+    assert sent == ['a']
+    assert scheduler.discard(session)['frames'] == 1
+    assert session not in scheduler.stats
+
+
+def test_unschedule_during_send(scheduler, clock):
+    """ 发送期间被 unschedule 的会话不再发送也不重新排期（包括会话自身） """
+    sent = []
+    second = FakeSession('second', sent)
+    first = FakeSession('first', sent, lambda: scheduler.unschedule(second))
+    selfish = FakeSession('self', sent, lambda: scheduler.unschedule(selfish))
+    for session in (first, second, selfish):
+        scheduler.schedule(session)
+    clock.now += INTERVAL
+    scheduler.runDue()
+    assert sent == ['first', 'self']
+    del sent[:]
+    clock.now += INTERVAL
+    scheduler.runDue()
+    assert sent == ['first']
+
+
+def test_send_outside_lock(scheduler, clock):
+    """ 发送时不持有调度器的锁（其他线程的 schedule / unschedule 不被阻塞） """
+    sent = []
+    other = FakeSession('other', sent)
+
+    def scheduleFromThread():
+        thread = threading.Thread(target=scheduler.schedule, args=(other,))
+        thread.start()
+        thread.join(1)
+        assert not thread.is_alive()
+
+    scheduler.schedule(FakeSession('a', sent, scheduleFromThread))
+    clock.now += INTERVAL
+    scheduler.runDue()
+    assert other in scheduler.entries
+
+
+def test_session_error(scheduler, clock, capsys):
+    """ 会话发送异常只停止调度该会话（输出异常）  其他会话继续发送 """
+    sent = []
+
+    def fail():
+        raise ValueError('broken session')
+
+    broken, healthy = FakeSession('broken', sent, fail), FakeSession('healthy', sent)
+    scheduler.schedule(broken)
+    scheduler.schedule(healthy)
+    clock.now += INTERVAL
+    scheduler.runDue()
+    assert sent == ['broken', 'healthy']
+    assert 'broken session' in capsys.readouterr().err
+    assert broken not in scheduler.entries
+    del sent[:]
+    clock.now += INTERVAL
+    scheduler.runDue()
+    assert sent == ['healthy']
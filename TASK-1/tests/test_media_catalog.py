@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from MediaCatalog import MediaCatalog, CatalogItem, CATALOG_EXT, build, duration, scanMedia
+from MediaContainer import CONTAINER_EXT, packFrames
+
+NAMES = ['Zebra', 'alpha', 'Alphabet', 'beta/Alps', 'gamma', 'Delta Alpha', '音乐会']
+
+
+def item(name, frame_count=10, frame_rate=25):
+    """ 测试用条目（路径为不存在的打包媒体文件） """
+    return CatalogItem(name, '/media/%s%s' % (name, CONTAINER_EXT), ('source',), frame_count, frame_rate, 1, 1000)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """ 含 NAMES 的媒体目录 """
+    path = str(tmp_path / ('library' + CATALOG_EXT))
+    assert build([item(name, index + 1) for index, name in enumerate(NAMES)], path) == len(NAMES)
+    catalog = MediaCatalog(path)
+    yield catalog
+    catalog.close()
+
+
+def test_lookup(catalog):
+    """ 按名称查找（不区分大小写）  返回完整条目  不存在时返回 None """
+    found = catalog.lookup('ALPHABET')
+    assert (found.name, found.frame_count, found.frame_rate, found.variants) == ('Alphabet', 3, 25, ('source',))
+    assert os.path.isabs(found.path) and found.path.endswith('Alphabet' + CONTAINER_EXT)
+    assert catalog.lookup('音乐会').frame_count == 7
+    assert catalog.lookup('alph') is None and catalog.lookup('zz') is None
+
+
+def test_prefix_search(catalog):
+    """ 前缀检索（有序  连续） """
+    assert catalog.search('al', prefix=True) == (2, ['alpha', 'Alphabet'])
+    assert catalog.search('beta/', prefix=True) == (1, ['beta/Alps'])
+    assert catalog.search('x', prefix=True) == (0, [])
+
+
+def test_substring_search(catalog):
+    """ 子串检索（每个条目只计一次  按检索键顺序） """
+    assert catalog.search('alp') == (4, ['alpha', 'Alphabet', 'beta/Alps', 'Delta Alpha'])
+    assert catalog.search('a\nb') == (0, [])
+
+
+def test_pagination(catalog):
+    """ 空检索返回全部条目  按 offset / limit 分页  匹配总数不随分页变化 """
+    total, first = catalog.search('', offset=0, limit=3)
+    assert (total, first) == (len(NAMES), ['alpha', 'Alphabet', 'beta/Alps'])
+    assert catalog.search('', offset=3, limit=3) == (len(NAMES), ['Delta Alpha', 'gamma', 'Zebra'])
+    assert catalog.search('', offset=6, limit=3) == (len(NAMES), ['音乐会'])
+    assert catalog.search('', offset=9, limit=3) == (len(NAMES), [])
+    assert catalog.search('alp', offset=1, limit=2) == (4, ['Alphabet', 'beta/Alps'])
+
+
+@pytest.mark.parametrize('names', [['Movie', 'movie'], ['bad\tname'], ['']])
+def test_invalid_names(tmp_path, names):
+    """ 名称不区分大小写重复  含制表符 / 换行或为空时拒绝 """
+    with pytest.raises(ValueError):
+        build([item(name) for name in names], str(tmp_path / ('bad' + CATALOG_EXT)))
+
+
+def test_scan_media(tmp_path):
+    """ 扫描打包媒体文件与帧目录  条目路径可直接打开 """
+    packFrames([b'a' * 10, b'b' * 20], str(tmp_path / ('movie' + CONTAINER_EXT)), 25)
+    (tmp_path / 'clips' / 'intro').mkdir(parents=True)
+    (tmp_path / 'clips' / 'intro' / 'pic-00000.jpg').write_bytes(b'c' * 5)
+    items = {entry.name: entry for entry in scanMedia(str(tmp_path))}
+    assert set(items) == {'movie', 'clips/intro'}
+    assert (items['movie'].frame_count, items['movie'].frame_rate, items['movie'].bytes) == (2, 25, 30)
+    assert (items['clips/intro'].frame_count, items['clips/intro'].bytes) == (1, 5)
+    path = str(tmp_path / ('library' + CATALOG_EXT))
+    build(items.values(), path)
+    catalog = MediaCatalog(path)
+    assert catalog.lookup('movie').path == str(tmp_path / ('movie' + CONTAINER_EXT))
+    assert duration(catalog.lookup('clips/intro'), 10) == 0.1
+    catalog.close()
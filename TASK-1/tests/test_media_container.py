@@ -0,0 +1,74 @@
+import pytest
+
+from MediaContainer import (MediaContainer, ContainerWriter, CONTAINER_EXT, listFrames, pack, packFrames, readFrameRate,
+                            readManifest, writeManifest)
+
+FRAMES = [b'\xff\xd8' + bytes([index]) * (index * 37 + 1) + b'\xff\xd9' for index in range(6)]
+
+
+@pytest.fixture
+def container(tmp_path):
+    """ 打包 6 帧（25 fps）的媒体文件 """
+    path = str(tmp_path / ('movie' + CONTAINER_EXT))
+    assert packFrames(FRAMES, path, 25) == len(FRAMES)
+    media = MediaContainer(path)
+    yield media
+    media.close()
+
+
+def test_frames_by_index(container):
+    """ 按索引表读取各帧（mmap 切片与原数据一致） """
+    assert len(container) == len(FRAMES)
+    assert container.frame_rate == 25
+    for index, frame in enumerate(FRAMES):
+        with container.frame(index) as view:
+            assert isinstance(view, memoryview) and view.readonly
+            assert view == frame
+        assert container.frameSize(index) == len(frame)
+
+
+@pytest.mark.parametrize('index', [-1, len(FRAMES)])
+def test_index_out_of_range(container, index):
+    """ 超出帧范围抛出 IndexError """
+    with pytest.raises(IndexError):
+        container.frame(index)
+
+
+def test_pack_directory(tmp_path):
+    """ 帧目录中从 0 开始连续编号的帧按序打包（编号不连续处之后的帧不打包） """
+    for index, frame in enumerate(FRAMES):
+        (tmp_path / ('pic-%05d.jpg' % index)).write_bytes(frame)
+    (tmp_path / 'pic-00009.jpg').write_bytes(b'gap')
+    paths = listFrames(str(tmp_path))
+    assert len(paths) == len(FRAMES)
+    output = str(tmp_path / ('packed' + CONTAINER_EXT))
+    pack(paths, output)
+    media = MediaContainer(output)
+    assert [bytes(media.frame(index)) for index in range(len(media))] == FRAMES
+    assert media.frame_rate == 0 and readFrameRate(output) == 0
+    media.close()
+
+
+def test_not_a_container(tmp_path):
+    """ 文件头不匹配时抛出 ValueError """
+    path = tmp_path / ('bogus' + CONTAINER_EXT)
+    path.write_bytes(b'JFIF' + b'\x00' * 32)
+    with pytest.raises(ValueError):
+        MediaContainer(str(path))
+
+
+def test_writer_frame_count(tmp_path):
+    """ 写入帧数与声明不一致时关闭报错 """
+    writer = ContainerWriter(str(tmp_path / ('short' + CONTAINER_EXT)), 3)
+    writer.write(FRAMES[0])
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+def test_manifest(tmp_path, container):
+    """ 媒体清单中的档位路径相对于清单目录  帧率从清单读取 """
+    path = str(tmp_path / 'movie.json')
+    writeManifest(path, {'fps': 25, 'frames': len(FRAMES), 'rungs': [{'name': 'q90', 'path': 'movie' + CONTAINER_EXT}]})
+    manifest = readManifest(path)
+    assert manifest['rungs'][0]['path'] == container.path
+    assert readFrameRate(path) == 25
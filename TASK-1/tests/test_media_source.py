@@ -0,0 +1,43 @@
+import pytest
+
+from FrameCache import FrameCache
+from MediaContainer import CONTAINER_EXT, packFrames
+from MediaSource import MediaSource
+
+FRAMES = [b'frame%d' % index for index in range(23)]
+
+
+@pytest.fixture
+def source(tmp_path):
+    """ 23 帧  10 fps  关键帧间隔 5 的打包媒体 """
+    path = str(tmp_path / ('movie' + CONTAINER_EXT))
+    packFrames(FRAMES, path, 10)
+    return MediaSource(path, FrameCache(0), 10, keyframe_interval=5)
+
+
+@pytest.mark.parametrize('seconds, frame_number', [
+    (0, 0), (0.3, 0), (0.49, 0), (0.5, 5), (1.0, 10), (1.5, 15), (2.2, 20), (999, 20),
+])
+def test_frame_at(source, seconds, frame_number):
+    """ npt 时间按帧率换算为帧序号并向前对齐到关键帧  超出媒体时取最后一个关键帧 """
+    assert source.frameAt(seconds) == frame_number
+
+
+@pytest.mark.parametrize('frame_number, keyframe', [(-3, 0), (0, 0), (9, 5), (10, 10), (22, 20), (500, 20)])
+def test_keyframe_clamps(source, frame_number, keyframe):
+    """ 关键帧对齐前先限制在媒体范围内 """
+    assert source.keyframe(frame_number) == keyframe
+
+
+@pytest.mark.parametrize('seconds, frame_number', [(0.5, 4), (0.55, 5), (2.3, 22), (999, 22)])
+def test_last_frame_before(source, seconds, frame_number):
+    """ Range 结束时间之前的最后一帧（不含结束时刻所在帧  不超过最后一帧） """
+    assert source.lastFrameBefore(seconds) == frame_number
+
+
+def test_time_and_wrap(source):
+    """ 帧序号换算为 npt 时间  读取帧时帧序号对帧总数取模 """
+    assert len(source) == 23
+    assert source.timeOf(15) == 1.5
+    assert bytes(source.readFrame(23)) == FRAMES[0]
+    assert bytes(source.readFrame(47)) == FRAMES[1]
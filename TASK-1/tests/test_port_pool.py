@@ -0,0 +1,64 @@
+import socket
+
+import pytest
+
+from PortPool import PortPool, PortExhausted
+
+MIN_PORT, MAX_PORT = 46001, 46008     # 端口对 46002 / 46004 / 46006
+
+
+def test_even_rtp_ports():
+    """ RTP 端口为范围内的偶数端口（其后的奇数端口留给 RTCP  不超出上限） """
+    pool = PortPool(MIN_PORT, MAX_PORT)
+    assert sorted(pool.free) == [46002, 46004, 46006]
+    assert pool.stats()['pairs'] == 3
+
+
+def test_worker_partition():
+    """ 各工作进程的端口对互不重复  合起来覆盖整个范围 """
+    pools = [PortPool(5000, 5100, index, 3) for index in range(3)]
+    ports = [set(pool.free) for pool in pools]
+    assert not ports[0] & ports[1] and not ports[1] & ports[2] and not ports[0] & ports[2]
+    assert set().union(*ports) == set(range(5000, 5100, 2))
+
+
+def test_open_pair_and_exhaustion():
+    """ 分配端口对并绑定 RTP / RTCP 套接字  分配完后抛出 PortExhausted  回收后可再次分配 """
+    pool = PortPool(MIN_PORT, MAX_PORT)
+    opened = [pool.open('127.0.0.1', rtcp=True) for _ in range(3)]
+    try:
+        for rtp_socket, rtcp_socket, port in opened:
+            assert port % 2 == 0
+            assert rtp_socket.getsockname()[1] == port and rtcp_socket.getsockname()[1] == port + 1
+        with pytest.raises(PortExhausted):
+            pool.open('127.0.0.1')
+        assert pool.stats()['exhausted'] == 1
+        rtp_socket, rtcp_socket, port = opened.pop()
+        rtp_socket.close()
+        rtcp_socket.close()
+        pool.release(port)
+        pool.release(port)
+        assert pool.stats()['free'] == 1
+        rtp_socket, reused = pool.open('127.0.0.1')
+        rtp_socket.close()
+        assert reused == port
+    finally:
+        for sockets in opened:
+            for sock in sockets[:-1]:
+                sock.close()
+
+
+def test_skip_port_in_use():
+    """ 被其他程序占用的端口跳过并计数  占用的端口移到队尾 """
+    pool = PortPool(MIN_PORT, MAX_PORT)
+    busy = pool.free[0]
+    other = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    other.bind(('127.0.0.1', busy))
+    try:
+        rtp_socket, port = pool.open('127.0.0.1')
+        rtp_socket.close()
+        assert port != busy
+        assert pool.stats()['bind_failures'] == 1
+        assert pool.free[-1] == busy
+    finally:
+        other.close()
@@ -0,0 +1,88 @@
+import pytest
+
+from Rtcp import (ReceptionStats, ReportBlock, RTCP_SR, RTCP_RR, buildSenderReport, buildReceiverReport, parseRtcp,
+                  isRtcp, ntpTime)
+
+CLOCK_RATE = 90000
+SSRC = 0x1234
+
+
+def receive(stats, seqnums, late=()):
+    """ 按序列号依次接收（第 i 个包时间戳 i 秒  准时到达  序号在 late 中的晚到 0.5 秒） """
+    for index, seqnum in enumerate(seqnums):
+        stats.update(SSRC, seqnum & 0xFFFF, index * CLOCK_RATE, index + (0.5 if index in late else 0))
+
+
+def test_no_loss():
+    """ 连续到达：无丢包  传输时间不变时抖动为 0 """
+    stats = ReceptionStats(CLOCK_RATE)
+    receive(stats, range(100, 110))
+    block = stats.reportBlock(0)
+    assert (block.ssrc, block.fraction_lost, block.cumulative_lost, block.highest_seq, block.jitter) == (SSRC, 0, 0, 109, 0)
+
+
+def test_loss_per_interval():
+    """ 累计丢包按期望数 - 接收数  丢包率按报告间隔计算（8 位定点） """
+    stats = ReceptionStats(CLOCK_RATE)
+    receive(stats, [0, 1, 3, 4, 7])
+    block = stats.reportBlock(0)
+    assert block.cumulative_lost == 3
+    assert block.fraction_lost == (3 << 8) // 8
+    # 下一个间隔无丢包  丢包率归零  累计丢包不变
+    stats.update(SSRC, 8, 8 * CLOCK_RATE, 8)
+    block = stats.reportBlock(0)
+    assert (block.fraction_lost, block.cumulative_lost) == (0, 3)
+
+
+def test_sequence_wraparound():
+    """ 序列号回绕后扩展最高序列号继续增长 """
+    stats = ReceptionStats(CLOCK_RATE)
+    receive(stats, range(65530, 65540))
+    assert stats.highestSeq() == 65539
+    assert stats.lost() == 0
+
+
+def test_duplicate_and_restart():
+    """ 重复包使累计丢包为负  连续两个大幅跳跃的包视为发送方重新开始 """
+    stats = ReceptionStats(CLOCK_RATE)
+    receive(stats, [10, 11, 11])
+    assert stats.lost() == -1
+    stats.update(SSRC, 20000, 0, 10)
+    assert stats.received == 3
+    stats.update(SSRC, 20001, 0, 10)
+    assert (stats.base_seq, stats.received, stats.lost()) == (20001, 1, 0)
+
+
+def test_jitter():
+    """ 到达间隔抖动 J += (|D| - J) / 16（时间戳单位） """
+    stats = ReceptionStats(CLOCK_RATE)
+    receive(stats, range(4), late={2})
+    # 第 2 个包晚到 0.5 秒（D = 45000）  第 3 个包恢复准时（D = 45000）
+    first = 45000 / 16
+    assert stats.jitter == pytest.approx(first + (45000 - first) / 16)
+    assert stats.stats()['jitter_ms'] == pytest.approx(stats.jitter * 1000 / CLOCK_RATE, abs=1e-3)
+
+
+def test_report_round_trip():
+    """ SR / RR 编码后可解析（复合包  负的累计丢包） """
+    block = ReportBlock(SSRC, 64, -2, 70000, 123, 0xABCD1234, 65536)
+    data = buildSenderReport(0x5678, 1000, 10, 12000, [block], now=1700000000.25) + buildReceiverReport(0x9ABC, [block])
+    assert isRtcp(data)
+    sender, receiver = parseRtcp(data)
+    assert (sender.kind, sender.ssrc, sender.blocks) == (RTCP_SR, 0x5678, [block])
+    assert (sender.sender_info.ntp_seconds, sender.sender_info.ntp_fraction) == ntpTime(1700000000.25)
+    assert (sender.sender_info.rtp_timestamp, sender.sender_info.packet_count, sender.sender_info.octet_count) == (1000, 10, 12000)
+    assert (receiver.kind, receiver.ssrc, receiver.sender_info, receiver.blocks) == (RTCP_RR, 0x9ABC, None, [block])
+    assert parseRtcp(data[:-4]) == [sender]
+
+
+def test_dlsr():
+    """ 收到 SR 后报告块带 LSR（NTP 中间 32 位）与 DLSR（1/65536 秒） """
+    stats = ReceptionStats(CLOCK_RATE)
+    receive(stats, [0])
+    report = parseRtcp(buildSenderReport(0x5678, 0, 0, 0, now=1700000000.5))[0]
+    stats.onSenderReport(report, 10.0)
+    block = stats.reportBlock(10.25)
+    seconds, fraction = ntpTime(1700000000.5)
+    assert block.lsr == ((seconds & 0xFFFF) << 16) | (fraction >> 16)
+    assert block.dlsr == 16384
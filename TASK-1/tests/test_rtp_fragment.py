@@ -0,0 +1,88 @@
+import struct
+
+from RtpPacket import RtpPacket, RTP_VERSION, PT_JPEG, HEADER_SIZE
+from RtpFragment import fragmentFrame, FrameAssembler
+
+FRAME = bytes(range(256)) * 20     # 5120 字节的测试帧
+CHUNK_SIZE = 1000
+
+
+def packets(frame, timestamp, seqnum=0):
+    """ 将一帧切分编码为 RTP 数据包（字节串  与网络上接收到的一致） """
+    result = []
+    for offset, chunk, marker in fragmentFrame(frame, CHUNK_SIZE):
+        rtp_packet = RtpPacket()
+        rtp_packet.encode_into(RTP_VERSION, 0, 0, 0, marker, PT_JPEG, seqnum, 0x1234, chunk, timestamp, (offset, len(frame)))
+        result.append(bytes(rtp_packet.get_packet()))
+        seqnum += 1
+    return result
+
+
+def feed(assembler, data):
+    """ 解码并输入一个数据包 """
+    rtp_packet = RtpPacket()
+    rtp_packet.decode(data)
+    return assembler.feed(rtp_packet)
+
+
+def test_fragment_sizes():
+    """ 分片不超过 chunk_size  只有最后一片置 marker """
+    fragments = list(fragmentFrame(FRAME, CHUNK_SIZE))
+    assert [(offset, len(chunk), marker) for offset, chunk, marker in fragments][-2:] == [(4000, 1000, 0), (5000, 120, 1)]
+    assert b''.join(chunk for offset, chunk, marker in fragments) == FRAME
+
+
+def test_reassemble_in_order_and_reordered():
+    """ 分片按帧内偏移写入  乱序到达也能重组 """
+    assembler = FrameAssembler()
+    results = [feed(assembler, data) for data in packets(FRAME, 1000)]
+    assert results[:-1] == [None] * (len(results) - 1) and results[-1] == FRAME
+    results = [feed(assembler, data) for data in reversed(packets(FRAME, 2000))]
+    assert results[-1] == FRAME
+    assert assembler.completed == 2
+
+
+def test_duplicate_and_late_fragments():
+    """ 重复分片只计数  已输出帧的分片计为迟到 """
+    assembler = FrameAssembler()
+    data = packets(FRAME, 1000)
+    feed(assembler, data[0])
+    assert feed(assembler, data[0]) is None
+    for fragment in data[1:]:
+        feed(assembler, fragment)
+    assert feed(assembler, data[2]) is None
+    assert (assembler.duplicates, assembler.late) == (1, 1)
+
+
+def test_newer_frame_drops_incomplete():
+    """ 较新的帧完成时丢弃更早的不完整帧 """
+    assembler = FrameAssembler()
+    feed(assembler, packets(FRAME, 1000)[0])
+    assert feed(assembler, packets(b'x' * 10, 2000)[0]) == b'x' * 10
+    assert assembler.dropped == 1 and not assembler.pending
+
+
+def test_timestamp_wrap():
+    """ 32 位时间戳回绕后的帧仍视为较新的帧 """
+    assembler = FrameAssembler()
+    feed(assembler, packets(b'a', 0xFFFFFF00)[0])
+    assert feed(assembler, packets(b'b', 0x100)[0]) == b'b'
+    assert assembler.late == 0
+
+
+def test_decode_skips_csrc_without_extension():
+    """ CC > 0 且未置 X 位时 CSRC 列表不计入负载 """
+    data = bytes([RTP_VERSION << 6 | 2, PT_JPEG]) + struct.pack('!HII', 1, 2, 3) + b'CSR1CSR2' + b'payload'
+    rtp_packet = RtpPacket()
+    rtp_packet.decode(data)
+    assert bytes(rtp_packet.get_payload()) == b'payload'
+    assert len(rtp_packet.get_header()) == HEADER_SIZE + 8
+    assert rtp_packet.fragment() is None
+
+
+def test_decode_skips_csrc_and_extension():
+    """ CSRC 列表之后的分片扩展仍能解析 """
+    rtp_packet = RtpPacket()
+    rtp_packet.decode(packets(FRAME, 1000)[1])
+    assert rtp_packet.fragment() == (1000, len(FRAME))
+    assert bytes(rtp_packet.get_payload()) == FRAME[1000:2000]
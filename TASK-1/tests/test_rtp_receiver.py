@@ -0,0 +1,41 @@
+import socket
+
+import pytest
+
+from RtpReceiver import RtpReceiver
+
+PAYLOAD = b'\x80' * 1000
+
+
+@pytest.fixture
+def pair():
+    """ 回环上的一对 UDP 套接字（接收端, 发送端） """
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.connect(receiver.getsockname())
+    yield receiver, sender
+    receiver.close()
+    sender.close()
+
+
+def test_kernel_drops_after_warmup_batch(pair):
+    """ 无丢包的预热批次后  复用同一槽位的批次仍能读到内核丢包计数（msg_controllen 每批恢复） """
+    sock, sender = pair
+    receiver = RtpReceiver(sock, 4096, slots=4)
+    if receiver.recvmmsg is None or not receiver.overflow_supported:
+        pytest.skip('recvmmsg / SO_RXQ_OVFL not supported')
+    # 预热批次：未丢包时内核不附带辅助数据  将槽位的 msg_controllen 改写为 0
+    sender.send(PAYLOAD)
+    assert len(receiver.receive(1)) == 1
+    # 接收缓冲区很小  连续发送使内核丢包（已排队的数据包不带丢包计数）  读空后各槽位均已被使用过
+    for index in range(200):
+        sender.send(PAYLOAD)
+    while receiver.receive(0.1):
+        pass
+    assert receiver.kernel_drops == 0
+    # 丢包之后到达的数据包附带累计丢包数
+    sender.send(PAYLOAD)
+    assert len(receiver.receive(1)) == 1
+    assert receiver.kernel_drops > 0
+    assert receiver.truncated == 0
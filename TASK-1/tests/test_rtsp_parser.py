@@ -0,0 +1,115 @@
+import pytest
+
+from RtspParser import RtspParser, RtspError, InvalidRange, parseRange, parseTransport, RANGE_NPT, RANGE_FRAMES, MAX_HEADER_SIZE
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('npt=12.5-', (RANGE_NPT, 12.5, None)),
+    ('npt=0-', (RANGE_NPT, 0.0, None)),
+    ('npt=0:01:02.5-0:01:10', (RANGE_NPT, 62.5, 70.0)),
+    ('npt=now-', (RANGE_NPT, 'now', None)),
+    ('npt=3-3', (RANGE_NPT, 3.0, 3.0)),
+    ('frames=120-200', (RANGE_FRAMES, 120, 200)),
+    ('frames=0-', (RANGE_FRAMES, 0, None)),
+    ('npt=5-;time=19970123T143720Z', (RANGE_NPT, 5.0, None)),
+    (' npt=7 - 9 ', (RANGE_NPT, 7.0, 9.0)),
+])
+def test_parse_range(value, expected):
+    """ npt（秒 / 时:分:秒 / now）与 frames 两种单位  结束可省略  参数忽略 """
+    assert parseRange(value) == expected
+
+
+@pytest.mark.parametrize('value', [
+    'npt=5-3', 'frames=200-120', 'frames=-1-', 'frames=a-', 'frames=1.5-', 'npt=-5', 'npt=abc-',
+    'npt=0:60:00-', 'npt=0:00:60-', 'npt=now-5', 'smpte=0:00:10-', 'npt', 'npt=5', 'bogus', '',
+    'frames=\u00b2-', 'frames=1-\u00b2', 'npt=\u0663-',
+])
+def test_parse_range_invalid(value):
+    """ 格式错误、负数、非 ASCII 数字（如 ²）、结束早于开始、未知单位均抛出 InvalidRange（服务端回复 457） """
+    with pytest.raises(InvalidRange):
+        parseRange(value)
+
+
+def test_parse_transport_unicast():
+    """ 无值参数为 True  client_port 保留原始端口范围文本 """
+    assert parseTransport('RTP/UDP;client_port=5000-5001') == {'RTP/UDP': True, 'client_port': '5000-5001'}
+
+
+def test_parse_transport_multicast():
+    """ 组播参数  空项与多余空白忽略 """
+    transport = parseTransport(' RTP/UDP ; multicast;destination=239.1.2.3; port=20000-20001;;ttl=4')
+    assert transport == {'RTP/UDP': True, 'multicast': True, 'destination': '239.1.2.3', 'port': '20000-20001', 'ttl': '4'}
+
+
+def test_parser_splits_pipelined_messages():
+    """ 一次读取的多条消息按空行切分  字段名不区分大小写 """
+    messages = RtspParser().feed(b'OPTIONS * RTSP/1.0\nCSeq: 1\n\nPLAY movie RTSP/1.0\r\ncseq: 2\r\nSESSION: 42\r\n\r\n')
+    assert [message.start_line for message in messages] == [['OPTIONS', '*', 'RTSP/1.0'], ['PLAY', 'movie', 'RTSP/1.0']]
+    assert messages[1].get('CSeq') == '2'
+    assert 'Session' in messages[1] and messages[1].get('session') == '42'
+    assert not messages[0].isReply()
+
+
+def test_parser_byte_by_byte():
+    """ 逐字节输入时在空行到达后才输出消息 """
+    parser = RtspParser()
+    data = b'SETUP movie RTSP/1.0\r\nCSeq: 3\r\nTransport: RTP/UDP;client_port=5000\r\n\r\n'
+    messages = []
+    for index in range(len(data)):
+        messages += parser.feed(data[index:index + 1])
+        assert len(messages) == (1 if index == len(data) - 1 else 0)
+    assert messages[0].get('Transport') == 'RTP/UDP;client_port=5000'
+
+
+def test_parser_body_split_across_reads():
+    """ 消息体按 Content-Length 接收完整后才输出  之后的消息照常切分 """
+    parser = RtspParser()
+    assert parser.feed(b'GET_PARAMETER movie RTSP/1.0\nCSeq: 4\nContent-Length: 9\n\nposit') == []
+    messages = parser.feed(b'ion\r\nOPTIONS * RTSP/1.0\nCSeq: 5\n\n')
+    assert [message.body for message in messages] == [b'position\r', b'']
+    assert messages[1].get('CSeq') == '5'
+
+
+def test_parser_folded_header_and_blank_lines():
+    """ 折叠行接续上一字段  消息之间多余的空行跳过 """
+    messages = RtspParser().feed(b'\r\n\r\nDESCRIBE * RTSP/1.0\nCSeq: 6\nSearch: first\n  second\n\n')
+    assert len(messages) == 1
+    assert messages[0].get('Search') == 'first second'
+
+
+def test_parser_reply():
+    """ 回复消息的起始行 """
+    message = RtspParser().feed(b'RTSP/1.0 457 Invalid Range\nCSeq: 7\n\n')[0]
+    assert message.isReply()
+    assert message.start_line[1] == '457'
+
+
+@pytest.mark.parametrize('data', [
+    b'PLAY movie RTSP/1.0\nCSeq: 1\nContent-Length: -1\n\n',
+    b'PLAY movie RTSP/1.0\nCSeq: 1\nContent-Length: 99999999\n\n',
+    'PLAY movie RTSP/1.0\nCSeq: 1\nContent-Length: \u00b2\n\n'.encode('utf-8'),
+    b'PLAY\nCSeq: 1\n\n',
+    b'PLAY movie RTSP/1.0\nno colon here\n\n',
+    b'PLAY movie RTSP/1.0\nCSeq: \xff\n\n',
+])
+def test_parser_rejects_malformed(data):
+    """ Content-Length 无效（含 ² 等非 ASCII 数字）、起始行不完整、字段行格式错误、非 UTF-8 均抛出 RtspError """
+    with pytest.raises(RtspError):
+        RtspParser().feed(data)
+
+
+def test_parser_header_too_long():
+    """ 超过 MAX_HEADER_SIZE 仍未出现空行时抛出 RtspError（不无限缓存） """
+    parser = RtspParser()
+    parser.feed(b'PLAY movie RTSP/1.0\n')
+    with pytest.raises(RtspError):
+        parser.feed(b'X-Padding: ' + b'a' * MAX_HEADER_SIZE + b'\n')
+
+
+def test_parser_lenient_until_framed():
+    """ 兼容模式：对端未发送过空行时以行结束的缓冲区视为完整消息  发送过空行后按空行切分 """
+    parser = RtspParser(lenient=True)
+    assert len(parser.feed(b'RTSP/1.0 200 OK\nCSeq: 1\n')) == 1
+    assert len(parser.feed(b'RTSP/1.0 200 OK\nCSeq: 2\n\n')) == 1
+    assert parser.feed(b'RTSP/1.0 200 OK\nCSeq: 3\n') == []
+    assert RtspParser().feed(b'RTSP/1.0 200 OK\nCSeq: 1\n') == []
@@ -0,0 +1,213 @@
+import re
+import socket
+
+import pytest
+
+import Server
+from Rtcp import isRtcp
+from RtpPacket import RtpPacket
+
+FRAME_COUNT = 20
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """ 使用临时帧目录（20 帧）的服务端（不启动监听与调度线程） """
+    for index in range(FRAME_COUNT):
+        (tmp_path / ('pic-%05d.jpg' % index)).write_bytes(b'\xff\xd8frame%d\xff\xd9' % index)
+    monkeypatch.setattr(Server, 'MEDIA_PATH', str(tmp_path / 'pic-%05d.jpg'))
+    monkeypatch.setattr(Server, 'DISPLAY_MODE', False)
+    monkeypatch.setattr(Server, 'RTP_BATCH_MODE', 'off')
+    return Server.BaseServer()
+
+
+@pytest.fixture
+def handler(server):
+    """ 未 SETUP 的会话（RTSP 套接字不使用） """
+    return Server.Handler(None, ('127.0.0.1', 50000), server)
+
+
+def request(handler, text):
+    """ 处理一条请求  返回 (状态码, 回复文本) """
+    reply = handler.handleRtspData(text.replace('\n', '\r\n').encode()).decode()
+    return int(reply.split()[1]), reply
+
+
+@pytest.mark.parametrize('method', ['GET_PARAMETER', 'PLAY', 'PAUSE', 'TEARDOWN'])
+def test_request_before_setup(handler, method):
+    """ SETUP 前的会话请求回复 455（不接受占位会话标识 '0'  不访问尚未打开的媒体源） """
+    body = 'frames\nquality\n'
+    code, reply = request(handler, '%s movie RTSP/1.0\nCSeq: 2\nSession: 0\nContent-Length: %d\n\n%s' % (method, len(body) + 2, body))
+    assert code == 455
+    assert 'Allow: OPTIONS, DESCRIBE, SETUP' in reply
+    assert handler.state == handler.INIT
+
+
+@pytest.fixture
+def client():
+    """ 客户端 RTP 套接字（单播会话的目的端口） """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    yield sock
+    sock.close()
+
+
+def setup(handler, transport):
+    """ SETUP 会话  返回会话标识 """
+    code, reply = request(handler, 'SETUP movie RTSP/1.0\nCSeq: 1\nTransport: %s\n\n' % transport)
+    if code == 461:
+        pytest.skip('multicast unavailable')
+    assert code == 200
+    return re.search(r'Session: (\S+)', reply).group(1)
+
+
+@pytest.fixture
+def session(handler, client):
+    """ 已 SETUP 的单播会话（结束时释放） """
+    session_id = setup(handler, 'RTP/UDP;client_port=%d' % client.getsockname()[1])
+    yield handler, session_id
+    handler.release()
+
+
+def test_position_wraps(session):
+    """ 定位到结尾附近后循环播放  GET_PARAMETER 与实际发送的帧一样对帧总数取模 """
+    handler, session_id = session
+    code, reply = request(handler, 'PLAY movie RTSP/1.0\nCSeq: 2\nSession: %s\nRange: frames=18-\n\n' % session_id)
+    assert code == 200 and 'Range: frames=18-' in reply
+    for _ in range(4):
+        handler.sendRtpFrame()
+    body = 'position\n'
+    code, reply = request(handler, 'GET_PARAMETER movie RTSP/1.0\nCSeq: 3\nSession: %s\nContent-Length: %d\n\n%s'
+                          % (session_id, len(body) + 1, body))
+    assert code == 200
+    assert 'position: 1\r\n' in reply
+
+
+@pytest.fixture
+def multicast(handler):
+    """ 已 SETUP 的组播会话（结束时释放） """
+    session_id = setup(handler, 'RTP/UDP;multicast;client_port=0')
+    yield handler, session_id
+    handler.release()
+
+
+def test_multicast_play_range(multicast):
+    """ 组播会话不能定位：Range 回复 457（直播位置 npt=now- 除外） """
+    handler, session_id = multicast
+    code, reply = request(handler, 'PLAY movie RTSP/1.0\nCSeq: 2\nSession: %s\nRange: frames=10-\n\n' % session_id)
+    assert code == 457
+    assert handler.state == handler.READY
+    code, reply = request(handler, 'PLAY movie RTSP/1.0\nCSeq: 3\nSession: %s\nRange: npt=now-\n\n' % session_id)
+    assert code == 200
+
+
+def test_multicast_play_scale(multicast):
+    """ 组播会话不变速：回复实际速率 1 """
+    handler, session_id = multicast
+    code, reply = request(handler, 'PLAY movie RTSP/1.0\nCSeq: 2\nSession: %s\nScale: 4\nSpeed: 2\n\n' % session_id)
+    assert code == 200
+    assert 'Scale: 1\n' in reply and 'Speed: 1\n' in reply
+    assert handler.scale == 1.0
+
+
+def test_multicast_port_after_join(server, handler):
+    """ 组播组创建失败不占用组播端口  创建成功后下一个组播组使用下一对端口 """
+    port = server.multicast_port
+    with pytest.raises(Server.MulticastUnavailable):
+        server.joinMulticast(handler, 'movie', '10.0.0.1')
+    assert server.multicast_port == port
+    try:
+        group = server.joinMulticast(handler, 'movie')
+    except Server.MulticastUnavailable:
+        pytest.skip('multicast unavailable')
+    assert group.rtp_address[1] == port
+    assert server.multicast_port == port + 2 * Server.WORKER_COUNT
+    server.leaveMulticast(handler, group)
+
+
+@pytest.mark.parametrize('value, applied, start', [
+    ('npt=1.25-', 'npt=1.200-', 12),
+    ('npt=999-', 'npt=1.900-', 19),
+    ('frames=5-100', 'frames=5-19', 5),
+    ('frames=50-', 'frames=19-', 19),
+    ('npt=0.5-1.0', 'npt=0.500-1.000', 5),
+])
+def test_play_range_clamps(session, value, applied, start):
+    """ Range 定位到媒体范围内（回复实际开始 / 结束位置）  第一帧为定位处的帧 """
+    handler, session_id = session
+    code, reply = request(handler, 'PLAY movie RTSP/1.0\nCSeq: 2\nSession: %s\nRange: %s\n\n' % (session_id, value))
+    assert code == 200
+    assert 'Range: %s\n' % applied in reply
+    handler.sendRtpFrame()
+    assert handler.frame_number == start
+
+
+def sentFrames(handler, client, intervals):
+    """ 推进 intervals 个帧间隔  返回客户端收到的 (RTP 时间戳, 帧数据)（每帧一个数据包  忽略 RTCP） """
+    for _ in range(intervals):
+        handler.sendRtpFrame()
+    client.settimeout(0.2)
+    frames = []
+    while True:
+        try:
+            data = client.recv(65535)
+        except socket.timeout:
+            return frames
+        if isRtcp(data):
+            continue
+        rtp_packet = RtpPacket()
+        rtp_packet.decode(data)
+        frames.append((rtp_packet.timestamp(), bytes(rtp_packet.get_payload())))
+        if len(frames) == intervals:
+            client.settimeout(0.05)
+
+
+def play(handler, session_id, *headers):
+    """ PLAY 请求  返回 (状态码, 回复文本) """
+    return request(handler, 'PLAY movie RTSP/1.0\nCSeq: 2\nSession: %s\n%s\n' % (session_id, ''.join(line + '\n' for line in headers)))
+
+
+@pytest.mark.parametrize('headers, frames, step', [
+    ((), [1, 2, 3, 4], 1),
+    (('Scale: 4',), [4, 8, 12, 16], 1),
+    (('Range: frames=10-', 'Scale: -2'), [10, 8, 6, 4], 1),
+    (('Speed: 0.5',), [1, 2], 2),
+])
+def test_trick_play_timestamps(session, client, headers, frames, step):
+    """ 倍速 / 倒放每个帧间隔发送途经的一帧  慢放隔帧发送  RTP 时间戳均按呈现时钟递增（每个帧间隔一个步长） """
+    handler, session_id = session
+    code, reply = play(handler, session_id, *headers)
+    assert code == 200
+    received = sentFrames(handler, client, 4)
+    assert [payload for timestamp, payload in received] == [b'\xff\xd8frame%d\xff\xd9' % index for index in frames]
+    timestamps = [timestamp for timestamp, payload in received]
+    assert {(b - a) & 0xFFFFFFFF for a, b in zip(timestamps, timestamps[1:])} == {step * Server.RTP_CLOCK_RATE // 10}
+
+
+def test_reverse_stops_at_start(session, client):
+    """ 倒放到第一帧后不再发送（会话保持 PLAYING） """
+    handler, session_id = session
+    play(handler, session_id, 'Range: frames=4-', 'Scale: -2')
+    assert len(sentFrames(handler, client, 6)) == 3
+    assert handler.frame_number == 0 and handler.state == handler.PLAYING
+
+
+@pytest.mark.parametrize('headers, applied', [
+    (('Scale: 100',), ['Scale: 16']),
+    (('Scale: -100',), ['Scale: -16']),
+    (('Scale: 16', 'Speed: 2'), ['Scale: 8', 'Speed: 2']),
+])
+def test_scale_clamped(session, headers, applied):
+    """ 播放速率（Scale × Speed）限制在 RTP_SCALE_MAX 内  回复实际速率（超出部分计入 Scale） """
+    handler, session_id = session
+    code, reply = play(handler, session_id, *headers)
+    assert code == 200
+    assert all(line + '\n' in reply for line in applied)
+    assert abs(handler.scale) == Server.RTP_SCALE_MAX
+
+
+@pytest.mark.parametrize('header', ['Scale: 0', 'Speed: -1', 'Scale: nan'])
+def test_invalid_scale(session, header):
+    """ Scale 为 0 或非数值  Speed 非正数时回复 400 """
+    handler, session_id = session
+    assert play(handler, session_id, header)[0] == 400
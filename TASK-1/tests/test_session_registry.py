@@ -0,0 +1,74 @@
+import math
+
+from SessionRegistry import SessionRegistry, makeSessionKey, MIN_SESSION_ID, MAX_SESSION_ID
+
+ID_RANGE = 100
+
+
+def registry(worker_index=0, worker_count=1, key=(37, 11)):
+    """ 标识范围为 1000-1099 的注册表 """
+    return SessionRegistry(key, worker_index, worker_count, 1000, 1000 + ID_RANGE - 1)
+
+
+def test_session_key_is_bijection():
+    """ 置换乘数与标识范围互素（置换为双射） """
+    multiplier, offset = makeSessionKey()
+    id_range = MAX_SESSION_ID - MIN_SESSION_ID + 1
+    assert math.gcd(multiplier, id_range) == 1
+    assert 0 <= offset < id_range
+
+
+def test_ids_are_permutation():
+    """ 分配满标识范围前标识互不重复  覆盖整个范围且不按顺序 """
+    sessions = registry()
+    ids = [sessions.register(object(), ('127.0.0.1', index), 'movie') for index in range(ID_RANGE)]
+    assert sorted(int(session_id) for session_id in ids) == list(range(1000, 1000 + ID_RANGE))
+    assert ids != sorted(ids)
+
+
+def test_lookup_and_unregister():
+    """ 按标识 / 客户端地址 / URL 查找  注销后不再可见 """
+    sessions = registry()
+    a, b, c = object(), object(), object()
+    id_a = sessions.register(a, ('127.0.0.1', 1), 'movie')
+    id_b = sessions.register(b, ('127.0.0.1', 2), 'movie')
+    id_c = sessions.register(c, ('127.0.0.1', 3), 'other')
+    assert sessions.get(id_a) is a and sessions.get(id_c) is c
+    assert sessions.getByAddress(('127.0.0.1', 2)) is b
+    assert set(sessions.getByUrl('movie')) == {a, b}
+    assert len(sessions) == 3
+    sessions.unregister(id_b, ('127.0.0.1', 2), 'movie')
+    sessions.unregister(id_c, ('127.0.0.1', 3), 'other')
+    sessions.unregister(id_c, ('127.0.0.1', 3), 'other')
+    assert sessions.get(id_b) is None and sessions.getByAddress(('127.0.0.1', 2)) is None
+    assert sessions.getByUrl('movie') == [a]
+    assert sessions.getByUrl('other') == []
+    assert sessions.stats() == {'sessions': 1, 'urls': {'movie': 1}, 'allocated': 3}
+
+
+def test_wraparound_skips_ids_in_use():
+    """ 序号回绕后跳过仍在使用的标识 """
+    sessions = registry()
+    kept = sessions.register(object(), ('127.0.0.1', 0), 'movie')
+    for index in range(1, ID_RANGE):
+        session_id = sessions.register(object(), ('127.0.0.1', index), 'movie')
+        sessions.unregister(session_id, ('127.0.0.1', index), 'movie')
+    assert sessions.register(object(), ('127.0.0.1', ID_RANGE), 'movie') != kept
+    assert len(sessions) == 2
+
+
+def test_workers_never_collide():
+    """ 各工作进程共用置换参数时分配的标识互不重复  且可按置换的逆映射回分配的工作进程 """
+    key, workers = (37, 11), 4
+    owner = {}
+    for worker_index in range(workers):
+        sessions = registry(worker_index, workers, key)
+        for index in range(ID_RANGE // workers):
+            session_id = sessions.register(object(), ('127.0.0.1', index), 'movie')
+            assert session_id not in owner
+            owner[session_id] = worker_index
+    assert len(owner) == ID_RANGE
+    inverse = pow(key[0], -1, ID_RANGE)
+    for session_id, worker_index in owner.items():
+        counter = (int(session_id) - 1000 - key[1]) * inverse % ID_RANGE
+        assert counter % workers == worker_index
@@ -3,15 +3,23 @@ import socket
 import threading
 import sys
 import getopt
-import os
-import re
 import random
-from PyQt5.QtCore import Qt
+import ast
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtWidgets import QApplication, QMainWindow, QMessageBox, QLabel
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtGui import QPixmap, QImage
 
 from Window import Ui_MainWindow
 from RtpPacket import *
+from FrameAssembler import FrameAssembler
+from RtpReceiver import RtpReceiver
+from RtspParser import RtspParser, RtspError, parseTransport
+from PortPool import PortPool, PortExhausted
+from Rtcp import RTCP_SR, ReceptionStats, isRtcp, parseRtcp, buildReceiverReport
+from JitterBuffer import JitterBuffer, JITTER_BUFFER_DELAY, JITTER_BUFFER_FRAMES
+from ReadAhead import ReadAheadWindow, READ_AHEAD_FRAMES
 
 DISPLAY_MODE = False
 
@@ -20,14 +28,21 @@ WINDOW_HEIGHT = 720
 
 SERVER_ADDR = '127.0.0.1'
 SERVER_PORT = 9999
+RTSP_RECV_SIZE = 4096
 RTP_MIN_PORT = 5000
 RTP_MAX_PORT = 10000
-RTP_PACKET_MAX_SIZE = 51200
+RTP_RECV_BUFFER_SIZE = 4 * 1024 * 1024  # RTP/UDP 套接字接收缓冲区大小（受内核 rmem_max 限制）
+RTP_RECV_TIMEOUT = 0.5                  # RTP/UDP 等待超时（秒）  超时后检查线程关闭标识
+RTP_CLOCK_RATE = 90000                  # RTP/UDP 时间戳时钟频率
+RTP_FRAME_RATE = 10                     # 服务端发送帧率（SETUP 回复未带 Frame-Rate 时使用）
+RTCP_INTERVAL = 5                       # RTCP 接收方报告间隔（秒）
+CATALOG_PAGE_SIZE = 100                 # 播放列表每页条目数（服务端检索  滚动到底部时请求下一页）
+DECODE_WORKERS = 2                      # 解码线程数（JPEG 解码不占用接收线程与 GUI 线程）
+DECODE_AHEAD = 8                        # 播放位置前方送入解码与抖动缓冲的帧数（其余帧以压缩形式留在预读窗口）
+PRESENT_INTERVAL = 5                    # 画面呈现定时器间隔（毫秒  GUI 线程按播放时钟取出到期帧）
+STATS_INTERVAL = 1                      # 信息栏缓冲统计刷新间隔（秒）
 
 SAVE_FILE_PATH = './save/'
-CACHE_FILE_PATH = './cache/'
-CACHE_FILE_NAME = 'ClientCache-'
-CACHE_FILE_EXT = '.jpg'
 
 
 class Client(QMainWindow, Ui_MainWindow):
@@ -44,6 +59,10 @@ class Client(QMainWindow, Ui_MainWindow):
     PLAY = 2  # PLAY 命令
     PAUSE = 3  # PAUSE 命令
     TEARDOWN = 4  # TEARDOWN 命令
+    # 跨线程信号（接收 / RTSP 线程发出  在 GUI 线程执行）
+    window_changed = pyqtSignal()  # 请求更新窗口
+    play_list_received = pyqtSignal(list, bool)  # 收到播放列表的一页（页, 是否替换已有列表）
+    rtsp_closed = pyqtSignal()  # RTSP 连接已关闭（停止呈现）
 
     def __init__(self, server_addr, server_port):
         """ 类构造方法 """
@@ -56,28 +75,47 @@ class Client(QMainWindow, Ui_MainWindow):
         self.rtsp_seq = 0  # RTSP/TCP 请求序列号
         self.rtsp_request = ''  # RTSP/TCP 请求（字符串）
         self.rtsp_request_code = self.NONE  # RTSP/TCP 请求代码
+        self.rtsp_pending = {}  # RTSP/TCP 未回复的请求（CSeq -> 请求代码）
         self.rtsp_reply = {}  # RTSP/TCP 回复（字典）
         self.session_id = '0'  # RTSP/TCP 会话标识
         # --- RTP/UDP 初始化 ---
         self.rtp_server_port = 0  # RTP/UDP 服务端端口
         self.rtp_client_port = 0  # RTP/UDP 客户端端口
         self.rtp_socket = None  # RTP/UDP 套接字
+        self.rtp_ports = PortPool(RTP_MIN_PORT, RTP_MAX_PORT)  # RTP/RTCP 端口池
+        self.rtp_pool_port = 0  # 从端口池分配的端口（0 表示未分配）
         self.rtp_thread = None  # RTP/UDP 当前线程
         self.rtp_play_event = threading.Event()  # RTP/UDP 播放事件
         self.rtp_teardown_flag = False  # RTP/UDP 线程关闭标识
-        self.rtp_data_buffer = bytearray()  # RTP/UDP 数据缓存区
-        self.rtp_data_buffer_number = 0  # RTP/UDP 数据缓存区标记
+        self.rtp_receiver = None  # RTP/UDP 批量接收
+        self.rtp_assembler = FrameAssembler()  # RTP/UDP 帧重组
+        self.read_ahead = ReadAheadWindow()  # 预读窗口（播放位置附近已接收的压缩帧  接收线程写入）
+        self.feed_number = 0  # 最近送入解码与抖动缓冲的帧序号
+        self.jitter_buffer = JitterBuffer(RTP_CLOCK_RATE, JITTER_BUFFER_DELAY, JITTER_BUFFER_FRAMES)  # 抖动缓冲（按帧的呈现时刻排序  GUI 线程按时取出）
+        self.decode_pool = ThreadPoolExecutor(DECODE_WORKERS)  # 解码线程池
+        self.decode_errors = 0  # 解码失败帧数
+        self.present_timer = QTimer(self)  # 画面呈现定时器（GUI 线程）
+        self.stats_deadline = 0.0  # 下次刷新信息栏缓冲统计的时刻
+        self.rtcp_stats = ReceptionStats(RTP_CLOCK_RATE)  # RTCP 接收统计（丢包  抖动）
+        self.rtcp_ssrc = random.getrandbits(32)  # RTCP 接收方报告的同步信源标识
         self.filename = ''  # 文件名（URL）
         self.subtitle = ''  # 文件字幕
         self.subtitle_mode = False  # 字幕模式（全局设置）
         self.compress_mode = False  # 压缩模式（全局设置）
-        self.frame_speed = 1.0  # 播放速率（全局设置）
+        self.frame_speed = 1.0  # 播放速率（全局设置  负数为倒放  PLAY 请求以 Scale 发送）
         self.frame_count = 0  # 帧总数量
+        self.frame_rate = RTP_FRAME_RATE  # 服务端发送帧率
+        self.frame_local = 0  # 本次播放开始时预读窗口中连续的后续帧数
+        self.rtp_end_seen = False  # 已收到媒体结尾之后的帧（呈现完窗口中剩余帧后结束播放）
         self.frame_number = 0  # 当前帧序号
         self.subtitle_adjust = 0  # 字幕调节
         # --- 客户端 初始化 ---
         self.state = self.INIT  # 客户端 初始状态
         self.play_list = []  # 播放列表
+        self.play_list_search = ''  # 播放列表检索关键字（服务端检索）
+        self.play_list_offset = 0  # 正在请求的播放列表页起始位置
+        self.play_list_next = None  # 下一页起始位置（None 表示没有下一页）
+        self.play_list_pending = False  # 播放列表请求未回复
         # --- GUI初始化 ---
         self.playback_rate_list = None
         self.subtitle_adjust_list = None
@@ -94,7 +132,8 @@ class Client(QMainWindow, Ui_MainWindow):
     def initWindow(self):
         """ 初始化 GUI 窗口 """
         # UI 初始化
-        self.playback_rate_list = ['播放速度 <1.0>', '播放速度 <0.5>', '播放速度 <0.75>', '播放速度 <1.25>', '播放速度 <1.5>', '播放速度 <2.0>']
+        self.playback_rate_list = ['播放速度 <1.0>', '播放速度 <0.5>', '播放速度 <0.75>', '播放速度 <1.25>', '播放速度 <1.5>', '播放速度 <2.0>',
+                                   '播放速度 <4.0>', '播放速度 <8.0>', '播放速度 <16.0>', '播放速度 <-1.0>', '播放速度 <-4.0>', '播放速度 <-16.0>']
         self.subtitle_adjust_list = ['字幕调节 <+0>', '字幕调节 <+0.2>', '字幕调节 <+0.5>', '字幕调节 <+1.0>', '字幕调节 <+2.0>',
                                      '字幕调节 <-0.2>', '字幕调节 <-0.5>', '字幕调节 <-1.0>', '字幕调节 <-2.0>']
         self.setupUi(self)
@@ -122,6 +161,12 @@ class Client(QMainWindow, Ui_MainWindow):
         self.slider_ProgressBar.sliderPressed.connect(self.__onProgressBarPressed)
         self.slider_ProgressBar.sliderReleased.connect(self.__onProgressBarReleased)
         self.listWidget_PlayList.itemDoubleClicked.connect(self.__onListWidgetClicked)
+        self.listWidget_PlayList.verticalScrollBar().valueChanged.connect(self.__onPlayListScrolled)
+        self.present_timer.timeout.connect(self.__onPresentTimer)
+        self.window_changed.connect(self.updateWindow)
+        self.play_list_received.connect(self.__onPlayListReceived)
+        self.rtsp_closed.connect(self.present_timer.stop)
+        self.present_timer.start(PRESENT_INTERVAL)
 
     def updateWindow(self):
         # --- 信息栏更新 ---
@@ -130,7 +175,9 @@ class Client(QMainWindow, Ui_MainWindow):
         elif self.state == self.READY:
             self.label_InfoBar.setText('【READY】已加载视频 - %s' % self.filename)
         elif self.state == self.PLAYING:
-            self.label_InfoBar.setText('【PLAYING】正在播放 - %s' % self.filename)
+            self.label_InfoBar.setText('【PLAYING】正在播放 - %s  预读 %d 帧  缓冲 %d 帧  丢弃 %d  迟到 %d' % (
+                self.filename, self.read_ahead.contiguous(self.frame_number + 1), len(self.jitter_buffer),
+                self.jitter_buffer.dropped + self.decode_errors, self.jitter_buffer.late))
         elif self.state == self.PAUSING:
             self.label_InfoBar.setText('【PAUSING】正在暂停 - %s' % self.filename)
         # --- 播放/暂停 按钮更新 ---
@@ -179,18 +226,23 @@ class Client(QMainWindow, Ui_MainWindow):
         # DESCRIBE 命令
         if requestCode == self.DESCRIBE:
             self.rtsp_seq += 1
-            line_1 = ['DESCRIBE', self.filename, 'RTSP/1.0']
+            line_1 = ['DESCRIBE', '*', 'RTSP/1.0']
             line_2 = ['CSeq:', str(self.rtsp_seq)]
-            self.rtsp_request = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n'
+            line_3 = ['Search:', self.play_list_search]
+            line_4 = ['Offset:', str(self.play_list_offset)]
+            line_5 = ['Limit:', str(CATALOG_PAGE_SIZE)]
+            self.rtsp_request = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n' + ' '.join(line_4) + '\n' \
+                                + ' '.join(line_5) + '\n'
             self.rtsp_request_code = self.DESCRIBE
+            self.play_list_pending = True
         # SETUP 命令
         elif requestCode == self.SETUP:
             if not self.state == self.INIT:
                 return False
-            while not self.createRtpConnection():  # 建立 RTP 连接
-                pass
+            if not self.createRtpConnection():  # 建立 RTP 连接
+                return False
             self.rtsp_seq += 1
-            line_1 = ['SETUP', self.filename, 'RTSP/1.0']
+            line_1 = ['SETUP', quote(self.filename), 'RTSP/1.0']
             line_2 = ['CSeq:', str(self.rtsp_seq)]
             line_3 = ['Transport:', 'RTP/UDP;client_port=' + str(self.rtp_client_port)]
             self.rtsp_request = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n'
@@ -199,19 +251,22 @@ class Client(QMainWindow, Ui_MainWindow):
         elif requestCode == self.PLAY:
             if not (self.state == self.READY or self.state == self.PLAYING or self.state == self.PAUSING):
                 return False
-            if not self.__play():
+            if not self.__prepare():
                 raise RuntimeError
             self.rtsp_seq += 1
-            line_1 = ['PLAY', self.filename, 'RTSP/1.0']
+            line_1 = ['PLAY', quote(self.filename), 'RTSP/1.0']
             line_2 = ['CSeq:', str(self.rtsp_seq)]
             line_3 = ['Session:', str(self.session_id)]
-            line_4 = ['Range:', 'npt=%s' % self.frame_number]
-            line_5 = ['Speed:', str(self.frame_speed)]
+            # 从预读窗口之后的第一帧开始请求（frames=<开始帧>-  倍速 / 倒放时按播放方向与步长  不小于 0）  窗口其余部分由服务端突发发送填充
+            line_4 = ['Range:', 'frames=%d-' % max(0, self.frame_number + (self.frame_local + 1) * self.read_ahead.step)]
+            line_5 = ['Scale:', str(self.frame_speed)]
             line_6 = ['Subtitle-Mode:', str(self.subtitle_mode)]
             line_7 = ['Compress-Mode:', str(self.compress_mode)]
             line_8 = ['Subtitle-Adjust:', str(self.subtitle_adjust)]
+            line_9 = ['Burst:', str(max(0, READ_AHEAD_FRAMES - self.frame_local))]
             self.rtsp_request = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n' + ' '.join(line_4) + '\n' \
-                                + ' '.join(line_5) + '\n' + ' '.join(line_6) + '\n' + ' '.join(line_7) + '\n' + ' '.join(line_8) + '\n'
+                                + ' '.join(line_5) + '\n' + ' '.join(line_6) + '\n' + ' '.join(line_7) + '\n' + ' '.join(line_8) + '\n' \
+                                + ' '.join(line_9) + '\n'
             self.rtsp_request_code = self.PLAY
         # PAUSE 命令
         elif requestCode == self.PAUSE:
@@ -220,7 +275,7 @@ class Client(QMainWindow, Ui_MainWindow):
             if not self.__pause():
                 raise RuntimeError
             self.rtsp_seq += 1
-            line_1 = ['PAUSE', self.filename, 'RTSP/1.0']
+            line_1 = ['PAUSE', quote(self.filename), 'RTSP/1.0']
             line_2 = ['CSeq:', str(self.rtsp_seq)]
             line_3 = ['Session:', str(self.session_id)]
             self.rtsp_request = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n'
@@ -230,74 +285,41 @@ class Client(QMainWindow, Ui_MainWindow):
             if not (self.state == self.READY or self.state == self.PLAYING or self.state == self.PAUSING):
                 return False
             self.rtsp_seq += 1
-            line_1 = ['TEARDOWN', self.filename, 'RTSP/1.0']
+            line_1 = ['TEARDOWN', quote(self.filename), 'RTSP/1.0']
             line_2 = ['CSeq:', str(self.rtsp_seq)]
             line_3 = ['Session:', str(self.session_id)]
             self.rtsp_request = ' '.join(line_1) + '\n' + ' '.join(line_2) + '\n' + ' '.join(line_3) + '\n'
             self.rtsp_request_code = self.TEARDOWN
         else:
             return False
-        # 通过RTSP套接字发送命令
-        self.rtsp_socket.send(self.rtsp_request.encode())
+        # 通过RTSP套接字发送命令（空行结束请求）
+        self.rtsp_request += '\n'
+        self.rtsp_pending[str(self.rtsp_seq)] = self.rtsp_request_code
+        self.rtsp_socket.sendall(self.rtsp_request.encode())
         if DISPLAY_MODE:
             print('\n@ Data sent:\n' + self.rtsp_request)
         return True
 
     def recvRtspReply(self):
         """ 接收 RTSP/TCP 回复（循环阻塞） """
+        # 兼容不以空行结束回复的旧服务端
+        rtsp_parser = RtspParser(lenient=True)
         # 进行回复处理循环
         while True:
             # *** 接收 RTSP/TCP 回复  recvRtspReply ***
             try:
-                reply = self.rtsp_socket.recv(1024)
+                data = self.rtsp_socket.recv(RTSP_RECV_SIZE)
             except OSError:
                 break
-            if not reply:
+            if not data:
                 break
-            data = reply.decode('utf-8')
-            if DISPLAY_MODE:
-                print('\n@ Data recv:\n' + data)
-            # *** 处理 RTSP/TCP 回复  handleRtspReply ***
             try:
-                # 分析 RTSP/TCP 回复
-                if not self.parseRtspReply(data):
-                    raise KeyError
-                # Code 判断
-                if self.rtsp_reply['Code'] != '200':
-                    raise RuntimeError
-                # session_id 判断
-                if (not self.rtsp_request_code == self.DESCRIBE) and (not self.rtsp_request_code == self.SETUP) and (not self.rtsp_request_code == self.TEARDOWN) \
-                        and (not self.session_id == self.rtsp_reply['Session']):
-                    raise KeyError
-                # DESCRIBE  命令
-                if self.rtsp_request_code == self.DESCRIBE:
-                    if not self.__describe():
-                        raise RuntimeError
-                # SETUP 命令
-                elif self.rtsp_request_code == self.SETUP:
-                    if not self.__setup():
-                        raise RuntimeError
-                # PLAY 命令
-                elif self.rtsp_request_code == self.PLAY:
-                    pass
-                # PAUSE 命令
-                elif self.rtsp_request_code == self.PAUSE:
-                    pass
-                # TEARDOWN 命令
-                elif self.rtsp_request_code == self.TEARDOWN:
-                    if not self.__teardown():
-                        raise RuntimeError
-                # 其他命令
-                else:
-                    raise NotImplementedError
-                # 更新 GUI
-                self.updateWindow()
-            except KeyError:
+                replies = rtsp_parser.feed(data)
+            except RtspError:
                 print('@ 服务端错误：服务端（IP = %s, port = %s）回复格式错误！' % (self.server_addr, self.server_port))
-            except NotImplementedError:
-                print('@ 服务端错误：服务端（IP = %s, port = %s）未实现此命令！' % (self.server_addr, self.server_port))
-            except RuntimeError:
-                print('@ 服务端错误：服务端（IP = %s, port = %s）运行时错误！' % (self.server_addr, self.server_port))
+                break
+            for reply in replies:
+                self.handleRtspReply(reply)
         # 关闭连接套接字
         self.__teardown()
         try:
@@ -306,113 +328,176 @@ class Client(QMainWindow, Ui_MainWindow):
         except OSError:
             pass
 
-    def parseRtspReply(self, data):
+    def handleRtspReply(self, reply):
+        """ 处理一条 RTSP/TCP 回复 """
+        if DISPLAY_MODE:
+            print('\n@ Data recv:\n' + str(reply))
+        # *** 处理 RTSP/TCP 回复  handleRtspReply ***
+        try:
+            # 按 CSeq 找到对应的请求（支持连续发送多个请求  错误回复同样取出  不残留）
+            request_code = self.rtsp_pending.pop(reply.get('CSeq'), self.rtsp_request_code)
+            # 分析 RTSP/TCP 回复
+            if not self.parseRtspReply(reply):
+                raise KeyError
+            if request_code == self.DESCRIBE:
+                self.play_list_pending = False
+            # Code 判断
+            if self.rtsp_reply['Code'] != '200':
+                raise RuntimeError
+            # session_id 判断
+            if (not request_code == self.DESCRIBE) and (not request_code == self.SETUP) and (not request_code == self.TEARDOWN) \
+                    and (not self.session_id == self.rtsp_reply['Session']):
+                raise KeyError
+            # DESCRIBE  命令
+            if request_code == self.DESCRIBE:
+                if not self.__describe():
+                    raise RuntimeError
+            # SETUP 命令
+            elif request_code == self.SETUP:
+                if not self.__setup():
+                    raise RuntimeError
+            # PLAY 命令
+            elif request_code == self.PLAY:
+                if not self.__play():
+                    raise RuntimeError
+            # PAUSE 命令
+            elif request_code == self.PAUSE:
+                pass
+            # TEARDOWN 命令
+            elif request_code == self.TEARDOWN:
+                if not self.__teardown():
+                    raise RuntimeError
+            # 其他命令
+            else:
+                raise NotImplementedError
+            # 更新 GUI（RTSP 线程  由 GUI 线程执行）
+            self.window_changed.emit()
+        except KeyError:
+            print('@ 服务端错误：服务端（IP = %s, port = %s）回复格式错误！' % (self.server_addr, self.server_port))
+        except NotImplementedError:
+            print('@ 服务端错误：服务端（IP = %s, port = %s）未实现此命令！' % (self.server_addr, self.server_port))
+        except RuntimeError:
+            print('@ 服务端错误：服务端（IP = %s, port = %s）运行时错误！' % (self.server_addr, self.server_port))
+
+    def parseRtspReply(self, reply):
         """ 分析 RTSP/TCP 回复 """
         try:
             # 创建参数字典
-            lines = str(data).split('\n')
-            self.rtsp_reply = {'Code': lines[0].split(' ')[1], 'Describe': ' '.join(lines[0].split(' ')[2:])}
+            self.rtsp_reply = {'Code': reply.start_line[1], 'Describe': ' '.join(reply.start_line[2:])}
+            self.rtsp_reply['CSeq'] = reply.headers['cseq']
             if not self.rtsp_reply['Code'] == '200':
                 return True
-            else:
-                self.rtsp_reply['CSeq'] = lines[1].split(' ')[1]
-            # 字段信息提取
-            for line in lines[1:]:
-                words = line.split(' ')
-                # 提取 Session
-                if 'Session' in words[0]:
-                    self.rtsp_reply['Session'] = words[1]
-                # 提取 Transport
-                elif 'Transport' in words[0]:
-                    # 提取 server_port
-                    pattern = re.compile(r'server_port=\s*(\S*?)\s*(;|$)')
-                    result = pattern.search(line)
-                    if result:
-                        self.rtsp_reply['server_port'] = result.group(1)
-                    else:
-                        raise KeyError
-                # 提取 List
-                elif 'List' in words[0]:
-                    self.rtsp_reply['List'] = ' '.join(words[1:])
-                # 提取 Length
-                elif 'Length' in words[0]:
-                    self.rtsp_reply['Length'] = words[1]
+            # 提取 Session
+            if 'Session' in reply:
+                self.rtsp_reply['Session'] = reply.get('Session').split(';')[0].strip()
+            # 提取 Transport
+            if 'Transport' in reply:
+                # 提取 server_port
+                self.rtsp_reply['server_port'] = parseTransport(reply.get('Transport'))['server_port']
+            # 提取 List
+            if 'List' in reply:
+                self.rtsp_reply['List'] = reply.get('List')
+            # 提取 Length / Frame-Rate
+            if 'Length' in reply:
+                self.rtsp_reply['Length'] = reply.get('Length')
+            if 'Frame-Rate' in reply:
+                self.rtsp_reply['Frame-Rate'] = reply.get('Frame-Rate')
+            # 提取 Offset / Next-Offset（播放列表分页）
+            if 'Offset' in reply:
+                self.rtsp_reply['Offset'] = reply.get('Offset')
+            if 'Next-Offset' in reply:
+                self.rtsp_reply['Next-Offset'] = reply.get('Next-Offset')
             return True
         except KeyError:
             self.rtsp_reply = {}
             return False
 
     def createRtpConnection(self):
-        """ 创建 RTP/UDP 连接 """
-        # 创建 RTP/UDP 套接字
+        """ 创建 RTP/UDP 连接（从端口池分配端口对） """
+        self.closeRtpConnection()
+        try:
+            self.rtp_socket, self.rtp_client_port = self.rtp_ports.open()
+            self.rtp_pool_port = self.rtp_client_port
+            self.rtp_receiver = RtpReceiver(self.rtp_socket, RTP_RECV_BUFFER_SIZE)
+            return True
+        except PortExhausted:
+            print('@ 客户端错误：端口 %d-%d 中没有可用的 RTP 端口！' % (RTP_MIN_PORT, RTP_MAX_PORT))
+            return False
+
+    def closeRtpConnection(self):
+        """ 关闭 RTP/UDP 套接字并归还端口 """
         if self.rtp_socket:
-            self.rtp_socket.shutdown(socket.SHUT_RDWR)
+            # 未连接的 UDP 套接字 shutdown 会抛出 OSError
+            try:
+                self.rtp_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.rtp_socket.close()
             self.rtp_socket = None
-        self.rtp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.rtp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RTP_PACKET_MAX_SIZE)
+        if self.rtp_pool_port:
+            self.rtp_ports.release(self.rtp_pool_port)
+            self.rtp_pool_port = 0
+
+    def sendReceiverReport(self):
+        """ 发送 RTCP 接收方报告（与 RTP 复用端口  发往服务端 RTP 端口） """
+        if not self.rtcp_stats.received:
+            return
         try:
-            # 绑定套接字  使用随机的端口
-            self.rtp_client_port = random.randint(RTP_MIN_PORT, RTP_MAX_PORT)
-            self.rtp_socket.bind(("", self.rtp_client_port))
-            return True
+            report = buildReceiverReport(self.rtcp_ssrc, [self.rtcp_stats.reportBlock(time.monotonic())])
+            self.rtp_socket.sendto(report, (self.server_addr, self.rtp_server_port))
         except OSError:
-            # TODO 错误处理
-            self.rtp_socket = None
-            return False
+            pass
 
     def handleRtpConnection(self):
         """ 处理 RTP/UDP 连接 """
+        rtp_packet = RtpPacket()
+        rtcp_deadline = time.monotonic() + RTCP_INTERVAL
         while True:
             try:
                 self.rtp_play_event.wait()
                 if self.rtp_teardown_flag:
                     raise OSError
-                data, addr = self.rtp_socket.recvfrom(65535)
-                if data:
-                    rtp_packet = RtpPacket()
+                # 一次读取全部已到达的数据包（指向接收环  不复制）
+                for data in self.rtp_receiver.receive(RTP_RECV_TIMEOUT):
+                    arrival = time.monotonic()
+                    # RTCP 发送方报告（与 RTP 复用端口）
+                    if isRtcp(data):
+                        for report in parseRtcp(data):
+                            if report.kind == RTCP_SR:
+                                self.rtcp_stats.onSenderReport(report, arrival)
+                        continue
                     rtp_packet.decode(data)
+                    self.rtcp_stats.update(rtp_packet.ssrc(), rtp_packet.seqnum(), rtp_packet.timestamp(), arrival)
                     # --JPEG--
                     if rtp_packet.payload_type() == PT_JPEG:
-                        if not rtp_packet.frame() == self.rtp_data_buffer_number:
-                            self.rtp_data_buffer.clear()
-                            self.rtp_data_buffer_number = rtp_packet.frame()
-                        self.rtp_data_buffer.extend(rtp_packet.get_payload())
+                        # 媒体结尾之后的帧不再接收（预读窗口中剩余的帧呈现完后结束播放）
                         if rtp_packet.frame() >= self.frame_count - 30:
-                            break
-                        if rtp_packet.marker() == 1:
-                            if self.frame_number <= rtp_packet.frame() <= self.frame_number + 30:
-                                self.frame_number = rtp_packet.frame()
-                                if DISPLAY_MODE:
-                                    print('@ %s' % self.frame_number)
-                                if rtp_packet.size() == len(self.rtp_data_buffer):
-                                    self.updateScreen(self.writeFrame(self.rtp_data_buffer), self.subtitle)
-                                self.rtp_data_buffer.clear()
+                            self.rtp_end_seen = True
+                            continue
+                        # 按帧序号重组分片（容忍乱序  丢弃不完整帧）  完成的帧写入预读窗口（由 GUI 线程送入解码）
+                        frame = self.rtp_assembler.feed(rtp_packet)
+                        if frame is not None:
+                            self.read_ahead.add(self.rtp_assembler.last_frame, frame, self.subtitle)
                     # --TEXT--
                     elif rtp_packet.payload_type() == PT_TEXT:
-                        self.subtitle = rtp_packet.get_payload().decode('utf-8')
-            except OSError:
+                        self.subtitle = bytes(rtp_packet.get_payload()).decode('utf-8')
+                # 定期发送接收方报告
+                if time.monotonic() >= rtcp_deadline:
+                    rtcp_deadline = time.monotonic() + RTCP_INTERVAL
+                    self.sendReceiverReport()
+            except (OSError, ValueError):
                 break
+        if DISPLAY_MODE and self.rtp_receiver is not None:
+            print('@ Receiver: %s %s %s %s decode_errors %d' % (self.rtp_receiver.stats(), self.rtcp_stats.stats(), self.jitter_buffer.stats(),
+                                                                self.read_ahead.stats(), self.decode_errors))
         if DISPLAY_MODE:
             print('@ 客户端 RTP 线程已退出')
         self.__teardown()
         self.state = self.INIT
-        self.updateWindow()
+        self.window_changed.emit()
 
-    def writeFrame(self, data):
-        cache_name = CACHE_FILE_PATH + CACHE_FILE_NAME + str(self.session_id) + CACHE_FILE_EXT
-        while True:
-            try:
-                file = open(cache_name, "wb")
-                file.write(data)
-                file.close()
-            except OSError or PermissionError:
-                continue
-            break
-        return cache_name
-
-    def updateScreen(self, pixmap_path, subtitle):
-        """ GUI 屏幕更新 """
+    def updateScreen(self, image, subtitle):
+        """ GUI 屏幕更新（image 为解码线程解码的帧  只在 GUI 线程调用） """
         # 进度条更新
         if self.frame_count == 0:
             self.slider_ProgressBar.setValue(0)
@@ -428,9 +513,7 @@ class Client(QMainWindow, Ui_MainWindow):
         if not subtitle == self.label_Subtitle.text():
             self.label_Subtitle.setText(subtitle)
         # 屏幕更新
-        pixmap = QPixmap()
-        if pixmap.load(pixmap_path):
-            self.label_Screen.setPixmap(QPixmap(pixmap_path))  # 此语句可能造成程序异常退出
+        self.label_Screen.setPixmap(QPixmap.fromImage(image))
 
     '''
     def savePlaybackProgress(self):
@@ -478,6 +561,9 @@ class Client(QMainWindow, Ui_MainWindow):
 
     def closeEvent(self, event):
         """ GUI 关闭事件处理 """
+        # 停止呈现（由 GUI 线程执行）  关闭解码线程池
+        self.rtsp_closed.emit()
+        self.decode_pool.shutdown(wait=False)
         # 关闭 RTSP 连接
         self.rtsp_socket.shutdown(socket.SHUT_RDWR)
         self.rtsp_socket.close()
@@ -485,13 +571,15 @@ class Client(QMainWindow, Ui_MainWindow):
     def __describe(self):
         """ 客户端进行 DESCRIBE 操作 """
         try:
-            # 获取播放列表
-            self.play_list = eval(self.rtsp_reply['List'])
-            # 更新 GUI 播放列表
-            self.listWidget_PlayList.clear()
-            self.listWidget_PlayList.addItems(self.play_list)
+            # 获取播放列表（一页  只解析字面量）
+            page = ast.literal_eval(self.rtsp_reply['List'])
+            if not isinstance(page, list) or not all(isinstance(item, str) for item in page):
+                raise KeyError
+            self.play_list_next = int(self.rtsp_reply['Next-Offset']) if 'Next-Offset' in self.rtsp_reply else None
+            # 更新 GUI 播放列表（第一页替换  后续页追加  由 GUI 线程执行）
+            self.play_list_received.emit(page, int(self.rtsp_reply.get('Offset', 0)) == 0)
             return True
-        except KeyError:
+        except (KeyError, ValueError, SyntaxError):
             return False
         except OSError:
             return False
@@ -506,9 +594,12 @@ class Client(QMainWindow, Ui_MainWindow):
                 # 建立会话
                 self.session_id = self.rtsp_reply['Session']
                 self.frame_count = float(self.rtsp_reply['Length'])
+                self.frame_rate = float(self.rtsp_reply.get('Frame-Rate', RTP_FRAME_RATE))
                 self.frame_number = 0
+                self.read_ahead.clear()
                 # 建立 RTP 连接 -- 连接的建立移到发送指令时
                 self.rtp_server_port = int(self.rtsp_reply['server_port'])
+                self.rtcp_stats = ReceptionStats(RTP_CLOCK_RATE)
                 self.rtp_play_event.clear()
                 self.rtp_teardown_flag = False
                 self.rtp_thread = threading.Thread(target=self.handleRtpConnection)
@@ -528,6 +619,30 @@ class Client(QMainWindow, Ui_MainWindow):
         except RuntimeError:
             return False
 
+    def __prepare(self):
+        """ 客户端准备 PLAY 操作（发送请求前定位预读窗口  收到 200 回复后再开始播放） """
+        try:
+            # INIT -- 抛出异常
+            if self.state == self.INIT:
+                return False
+            # READY|PLAYING|PAUSING -- 开始播放|继续播放|恢复播放
+            if self.state == self.READY or self.state == self.PLAYING or self.state == self.PAUSING:
+                # 清空帧重组状态与抖动缓冲（重建播放时钟  帧重组按播放方向判断迟到帧）
+                # 预读窗口中已有足够的后续帧（覆盖播放延迟）时收到回复后立即从本地开始呈现  否则等待服务端
+                self.rtp_assembler.reset(1 if self.frame_speed > 0 else -1)
+                self.read_ahead.setScale(self.frame_speed)
+                self.frame_local = self.read_ahead.seek(self.frame_number, JITTER_BUFFER_DELAY * self.frame_rate)
+                self.jitter_buffer.reset(0 if self.frame_local >= JITTER_BUFFER_DELAY * self.frame_rate else None)
+                self.feed_number = self.frame_number
+                self.rtp_end_seen = False
+                return True
+        except KeyError:
+            return False
+        except OSError:
+            return False
+        except RuntimeError:
+            return False
+
     def __play(self):
         """ 客户端进行 PLAY 操作 """
         try:
@@ -536,8 +651,6 @@ class Client(QMainWindow, Ui_MainWindow):
                 return False
             # READY|PLAYING|PAUSING -- 开始播放|继续播放|恢复播放
             if self.state == self.READY or self.state == self.PLAYING or self.state == self.PAUSING:
-                # 清空数据缓存
-                self.rtp_data_buffer.clear()
                 # 设置播放事件
                 self.rtp_play_event.set()
                 # 更新状态
@@ -582,18 +695,10 @@ class Client(QMainWindow, Ui_MainWindow):
                 self.rtp_teardown_flag = True
                 # 设置播放事件  防止线程阻塞无法关闭
                 self.rtp_play_event.set()
-                # 关闭 RTP 套接字
-                try:
-                    self.rtp_socket.shutdown(socket.SHUT_RDWR)
-                    self.rtp_socket.close()
-                except AttributeError:
-                    pass
-                self.rtp_socket = None
-                # 清除缓存
-                try:
-                    os.remove(CACHE_FILE_PATH + CACHE_FILE_NAME + str(self.session_id) + CACHE_FILE_EXT)
-                except FileNotFoundError:
-                    pass
+                # 关闭 RTP 套接字  清空抖动缓冲与预读窗口
+                self.closeRtpConnection()
+                self.jitter_buffer.reset()
+                self.read_ahead.clear()
                 # 关闭会话
                 self.session_id = '0'
                 self.filename = ''
@@ -662,14 +767,71 @@ class Client(QMainWindow, Ui_MainWindow):
             self.sendRtspRequest(self.PLAY)
 
     def __onSearchClicked(self):
-        """ 槽 按下搜索按钮 """
-        keyword = self.lineEdit_Search.text()
-        play_list = []
-        for item in self.play_list:
-            if keyword in item:
-                play_list.append(item)
-        self.listWidget_PlayList.clear()
-        self.listWidget_PlayList.addItems(play_list)
+        """ 槽 按下搜索按钮（服务端检索  从第一页开始） """
+        self.play_list_search = self.lineEdit_Search.text().strip()
+        self.play_list_offset = 0
+        self.sendRtspRequest(self.DESCRIBE)
+
+    def __onPresentTimer(self):
+        """ 槽 呈现定时器（GUI 线程  取出已到期且解码完成的最新帧显示） """
+        if not self.state == self.PLAYING:
+            return
+        self.__feed()
+        entry = self.jitter_buffer.pop(time.monotonic(), lambda item: item[2].done())
+        if entry is not None:
+            frame_number, subtitle, decoding = entry
+            self.frame_number = frame_number
+            self.read_ahead.moveTo(frame_number)
+            if DISPLAY_MODE:
+                print('@ %s' % self.frame_number)
+            image = decoding.result()
+            if image is None:
+                self.decode_errors += 1
+            else:
+                self.updateScreen(image, subtitle)
+        # 媒体结尾  窗口中的帧已全部呈现 -- 关闭 RTP 线程
+        elif self.rtp_end_seen and not len(self.jitter_buffer) and (self.read_ahead.last() or 0) <= self.feed_number:
+            self.rtp_teardown_flag = True
+        # 倒放到达第一帧（服务端不再发送） -- 关闭 RTP 线程
+        elif self.frame_speed < 0 and not len(self.jitter_buffer) and self.frame_number + self.read_ahead.step < 0:
+            self.rtp_teardown_flag = True
+        # 定期刷新信息栏（缓冲帧数  丢弃 / 迟到帧数）
+        if time.monotonic() >= self.stats_deadline:
+            self.stats_deadline = time.monotonic() + STATS_INTERVAL
+            self.updateWindow()
+
+    def __feed(self):
+        """ 将预读窗口中播放位置前方 DECODE_AHEAD 个帧间隔内的新帧提交解码并写入抖动缓冲（GUI 线程  倒放时前方为帧序号递减方向） """
+        now = time.monotonic()
+        direction = 1 if self.frame_speed > 0 else -1
+        horizon = round(DECODE_AHEAD * max(1.0, abs(self.frame_speed)))
+        for frame_number in range(self.feed_number + direction, self.frame_number + direction * (horizon + 1), direction):
+            entry = self.read_ahead.get(frame_number)
+            if entry is not None:
+                frame, subtitle = entry
+                decoding = self.decode_pool.submit(decodeFrame, frame)
+                self.jitter_buffer.push(self.presentTime(frame_number), (frame_number, subtitle, decoding), now)
+                self.feed_number = frame_number
+
+    def presentTime(self, frame_number):
+        """ 返回帧的呈现时刻（RTP 时钟单位  按播放速率换算  倒放时帧序号越小越晚  本地窗口中的帧与新接收的帧共用一个播放时钟） """
+        return round(frame_number * RTP_CLOCK_RATE / (self.frame_rate * self.frame_speed))
+
+    def __onPlayListReceived(self, page, replace):
+        """ 槽 收到播放列表的一页（第一页替换  后续页追加） """
+        if replace:
+            self.play_list = page
+            self.listWidget_PlayList.clear()
+        else:
+            self.play_list += page
+        self.listWidget_PlayList.addItems(page)
+
+    def __onPlayListScrolled(self, value):
+        """ 槽 播放列表滚动（滚动到底部时请求下一页） """
+        if value == self.listWidget_PlayList.verticalScrollBar().maximum() and self.play_list_next is not None \
+                and not self.play_list_pending:
+            self.play_list_offset = self.play_list_next
+            self.sendRtspRequest(self.DESCRIBE)
 
     def __onPlaybackRateChanged(self):
         """ 槽 播放速度改变 """
@@ -686,6 +848,18 @@ class Client(QMainWindow, Ui_MainWindow):
             self.frame_speed = 1.5
         elif index == 5:
             self.frame_speed = 2.0
+        elif index == 6:
+            self.frame_speed = 4.0
+        elif index == 7:
+            self.frame_speed = 8.0
+        elif index == 8:
+            self.frame_speed = 16.0
+        elif index == 9:
+            self.frame_speed = -1.0
+        elif index == 10:
+            self.frame_speed = -4.0
+        elif index == 11:
+            self.frame_speed = -16.0
         else:
             self.frame_speed = 1.0
         if self.state == self.PLAYING:
@@ -751,20 +925,29 @@ class Client(QMainWindow, Ui_MainWindow):
     '''
 
 
+def decodeFrame(frame):
+    """ 解码一帧 JPEG（解码线程中执行  QImage 可在非 GUI 线程使用）  失败时返回 None """
+    image = QImage.fromData(frame, 'JPG')
+    return None if image.isNull() else image
+
+
 def main(argv):
     """ 程序主入口 """
+    global RTP_RECV_BUFFER_SIZE
     ip = SERVER_ADDR
     port = SERVER_PORT
     try:
-        opts, args = getopt.getopt(argv, 'ip', ['ip=', 'port='])
+        opts, args = getopt.getopt(argv, 'ip', ['ip=', 'port=', 'rcvbuf='])
     except getopt.GetoptError:
-        print('usage: Client.py --ip <ip> --port <port>')
+        print('usage: Client.py --ip <ip> --port <port> [--rcvbuf <KB>]')
         sys.exit(2)
     for opt, arg in opts:
         if opt in ('-i', '--ip'):
             ip = arg
         if opt in ('-p', '--port'):
             port = int(arg)
+        if opt == '--rcvbuf':
+            RTP_RECV_BUFFER_SIZE = int(arg) * 1024
     # 创建图形界面
     app = QApplication(sys.argv)
     client = Client(ip, port)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+FRAME_MAX_PENDING = 4   # 同时组装中的最大帧数
+
+
+class PendingFrame:
+    """ 组装中的帧 """
+
+    def __init__(self):
+        """ 类构造方法 """
+        self.fragments = {}     # 序列号 -> 分片数据
+        self.received = 0       # 已收到的字节数
+        self.size = None        # 帧总长度（收到 marker 分片后确定）
+        self.last_seq = None    # marker 分片的序列号
+
+
+class FrameAssembler:
+    """ 帧重组类（按帧序号归并分片  按序列号排序  容忍乱序  丢弃不完整帧）
+
+    倒放时帧序号递减  迟到与丢弃的判断按播放方向 direction（1 / -1）进行
+    """
+
+    def __init__(self, max_pending=FRAME_MAX_PENDING):
+        """ 类构造方法 """
+        self.max_pending = max_pending
+        self.pending = OrderedDict()    # 帧序号 -> PendingFrame
+        self.last_frame = None          # 最近一个完成帧的帧序号
+        self.direction = 1              # 播放方向（1 为正放  -1 为倒放）
+        self.completed = 0              # 完成帧数
+        self.dropped = 0                # 丢弃的不完整帧数
+        self.duplicates = 0             # 重复分片数
+        self.late = 0                   # 迟到分片数
+
+    def reset(self, direction=1):
+        """ 清空组装状态（重新播放/跳转/改变播放方向时调用） """
+        self.pending.clear()
+        self.last_frame = None
+        self.direction = direction
+
+    def feed(self, rtp_packet):
+        """ 输入一个 RTP 数据包  帧组装完成时返回帧数据  否则返回 None """
+        frame_number = rtp_packet.frame()
+        if self.last_frame is not None and (frame_number - self.last_frame) * self.direction <= 0:
+            self.late += 1
+            return None
+        frame = self.pending.get(frame_number)
+        if frame is None:
+            frame = PendingFrame()
+            self.pending[frame_number] = frame
+            if len(self.pending) > self.max_pending:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+        seqnum = rtp_packet.seqnum()
+        if seqnum in frame.fragments:
+            self.duplicates += 1
+            return None
+        # 负载可能指向接收环  需复制保存
+        payload = bytes(rtp_packet.get_payload())
+        frame.fragments[seqnum] = payload
+        frame.received += len(payload)
+        if rtp_packet.marker() == 1:
+            frame.size = rtp_packet.size()
+            frame.last_seq = seqnum
+        if frame.size is None or frame.received != frame.size:
+            return None
+        # 帧完成  以 marker 分片为终点按序列号（16 位回绕）排序拼接
+        del self.pending[frame_number]
+        for other in [other for other in self.pending if (other - frame_number) * self.direction < 0]:
+            del self.pending[other]
+            self.dropped += 1
+        self.last_frame = frame_number
+        self.completed += 1
+        order = sorted(frame.fragments, key=lambda seq: (seq - frame.last_seq - 1) & 0xFFFF)
+        return b''.join(frame.fragments[seq] for seq in order)
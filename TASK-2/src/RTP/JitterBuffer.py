@@ -0,0 +1,108 @@
+import bisect
+import threading
+
+JITTER_BUFFER_DELAY = 0.2       # 播放延迟（秒）  吸收网络抖动与解码耗时
+JITTER_BUFFER_FRAMES = 30       # 最大缓冲帧数（超出时丢弃最早的帧）
+
+
+class JitterBuffer:
+    """ 抖动缓冲类（按时间戳排序的有界缓冲  写入线程写入  呈现线程按播放时钟取出到期帧）
+
+    时间戳可为 RTP 时间戳或帧序号（clock_rate 为对应的时钟频率 / 帧率）
+    第一帧到达时建立播放时钟：时间戳为 ts 的帧在 到达时刻 + delay + (ts - 第一帧 ts) / clock_rate 到期
+    """
+
+    def __init__(self, clock_rate, delay=JITTER_BUFFER_DELAY, capacity=JITTER_BUFFER_FRAMES):
+        """ 类构造方法 """
+        self.clock_rate = clock_rate
+        self.delay = delay
+        self.start_delay = delay         # 本次播放时钟的延迟（本地已有后续帧时可为 0）
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.timestamps = []             # 缓冲中各帧的扩展时间戳（升序）
+        self.items = []                  # 与 timestamps 对应的帧
+        self.base_timestamp = None       # 播放时钟起点的扩展时间戳
+        self.base_time = 0.0             # 播放时钟起点的本地时刻（已含播放延迟）
+        self.last_timestamp = None       # 最近写入帧的扩展时间戳（用于时间戳回绕）
+        self.presented_timestamp = None  # 最近取出帧的扩展时间戳
+        self.pushed = 0                  # 写入帧数
+        self.presented = 0               # 取出（呈现）帧数
+        self.dropped = 0                 # 缓冲已满时丢弃的帧数
+        self.late = 0                    # 迟到帧数（到达时已过呈现位置  或被更新的到期帧跳过）
+        self.max_depth = 0               # 最大缓冲帧数
+
+    def extend(self, timestamp):
+        """ 返回 32 位时间戳扩展为不回绕的时间戳（以最近写入的时间戳为参照） """
+        if self.last_timestamp is None:
+            return timestamp
+        delta = (timestamp - self.last_timestamp) & 0xFFFFFFFF
+        if delta >= 0x80000000:
+            delta -= 0x100000000
+        return self.last_timestamp + delta
+
+    def push(self, timestamp, item, now):
+        """ 写入一帧（now 为到达时刻）  迟到帧返回 False """
+        with self.lock:
+            timestamp = self.extend(timestamp)
+            if self.presented_timestamp is not None and timestamp <= self.presented_timestamp:
+                self.late += 1
+                return False
+            if self.base_timestamp is None:
+                self.base_timestamp = timestamp
+                self.base_time = now + self.start_delay
+            self.last_timestamp = timestamp
+            index = bisect.bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(index, timestamp)
+            self.items.insert(index, item)
+            self.pushed += 1
+            if len(self.items) > self.capacity:
+                del self.timestamps[0]
+                del self.items[0]
+                self.dropped += 1
+            self.max_depth = max(self.max_depth, len(self.items))
+            return True
+
+    def dueTime(self, timestamp):
+        """ 返回扩展时间戳对应的到期时刻 """
+        return self.base_time + (timestamp - self.base_timestamp) / self.clock_rate
+
+    def pop(self, now, ready=None):
+        """ 取出已到期帧中最新的可呈现帧（ready(item) 为假表示尚未就绪  如仍在解码）  没有时返回 None
+
+        被取出帧跳过的更早到期帧计为迟到  未就绪的到期帧留在缓冲中等待
+        """
+        with self.lock:
+            chosen = -1
+            for index, timestamp in enumerate(self.timestamps):
+                if self.dueTime(timestamp) > now:
+                    break
+                if ready is None or ready(self.items[index]):
+                    chosen = index
+            if chosen < 0:
+                return None
+            item = self.items[chosen]
+            self.presented_timestamp = self.timestamps[chosen]
+            self.late += chosen
+            self.presented += 1
+            del self.timestamps[:chosen + 1]
+            del self.items[:chosen + 1]
+            return item
+
+    def reset(self, delay=None):
+        """ 清空缓冲并重建播放时钟（重新播放 / 跳转时调用  delay 为本次播放时钟的延迟  默认为 self.delay） """
+        with self.lock:
+            self.start_delay = self.delay if delay is None else delay
+            self.timestamps.clear()
+            self.items.clear()
+            self.base_timestamp = None
+            self.last_timestamp = None
+            self.presented_timestamp = None
+
+    def __len__(self):
+        """ 返回缓冲帧数 """
+        return len(self.items)
+
+    def stats(self):
+        """ 返回缓冲统计 """
+        return {'depth': len(self.items), 'max_depth': self.max_depth, 'delay_ms': round(self.delay * 1000),
+                'pushed': self.pushed, 'presented': self.presented, 'dropped': self.dropped, 'late': self.late}
@@ -0,0 +1,67 @@
+import socket
+import random
+import threading
+from collections import deque
+
+
+class PortExhausted(OSError):
+    """ 端口池中没有可绑定的端口 """
+    pass
+
+
+class PortPool:
+    """ RTP/RTCP 端口对分配类（RTP 使用偶数端口  其后的奇数端口留给 RTCP  O(1) 分配与回收）
+
+    多个工作进程共用端口范围时按端口对序号分区（序号 mod worker_count == worker_index）
+    """
+
+    def __init__(self, min_port, max_port, worker_index=0, worker_count=1):
+        """ 类构造方法 """
+        first = min_port + (min_port & 1)           # 第一个偶数端口
+        ports = [port for port in range(first, max_port, 2) if (port // 2) % worker_count == worker_index]
+        random.shuffle(ports)                       # 打乱初始顺序  端口不可预测
+        self.free = deque(ports)                    # 空闲 RTP 端口（分配取队首  回收放队尾  延后重用）
+        self.used = set()                           # 已分配的 RTP 端口
+        self.size = len(ports)                      # 端口对总数
+        self.lock = threading.Lock()                # 多线程访问锁
+        self.bind_failures = 0                      # 端口被其他程序占用的次数
+        self.exhausted = 0                          # 无可用端口的次数
+
+    def open(self, host='', rtcp=False):
+        """ 分配端口对并绑定 RTP 套接字（rtcp=True 时同时绑定 RTCP 套接字）
+
+        返回 (RTP 套接字, RTP 端口) 或 (RTP 套接字, RTCP 套接字, RTP 端口)  无可用端口时抛出 PortExhausted
+        """
+        with self.lock:
+            # 被其他程序占用的端口移到队尾  最多尝试一轮
+            for attempt in range(len(self.free)):
+                port = self.free.popleft()
+                sockets = []
+                try:
+                    for offset in ((0, 1) if rtcp else (0,)):
+                        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                        sockets.append(sock)
+                        sock.bind((host, port + offset))
+                except OSError:
+                    for sock in sockets:
+                        sock.close()
+                    self.free.append(port)
+                    self.bind_failures += 1
+                    continue
+                self.used.add(port)
+                return tuple(sockets) + (port,)
+            self.exhausted += 1
+            raise PortExhausted('no free RTP port pair (%d in use)' % len(self.used))
+
+    def release(self, port):
+        """ 回收端口对（调用方负责关闭套接字） """
+        with self.lock:
+            if port in self.used:
+                self.used.remove(port)
+                self.free.append(port)
+
+    def stats(self):
+        """ 返回端口池统计 """
+        with self.lock:
+            return {'pairs': self.size, 'free': len(self.free), 'used': len(self.used),
+                    'bind_failures': self.bind_failures, 'exhausted': self.exhausted}
@@ -0,0 +1,102 @@
+import threading
+
+READ_AHEAD_FRAMES = 100     # 播放位置前方（尚未播放）保留的帧间隔数  由服务端突发发送填充
+READ_BEHIND_FRAMES = 50     # 播放位置后方（已播放）保留的帧间隔数  供小幅后退跳转
+
+
+class ReadAheadWindow:
+    """ 预读窗口类（播放位置附近已接收的压缩帧  按帧序号索引  窗口外的帧淘汰  接收线程写入  GUI 线程读取）
+
+    暂停后恢复与窗口内的跳转直接从本地帧开始呈现  无需等待服务端
+    倍速 / 倒放时前方为播放方向  窗口范围按速率放大（服务端每个帧间隔只发送途经的一帧）
+    """
+
+    def __init__(self, ahead=READ_AHEAD_FRAMES, behind=READ_BEHIND_FRAMES):
+        """ 类构造方法 """
+        self.ahead = ahead
+        self.behind = behind
+        self.lock = threading.Lock()
+        self.frames = {}        # 帧序号 -> (帧数据, 字幕)
+        self.bytes = 0          # 窗口中帧数据总字节数
+        self.position = 0       # 播放位置（最近呈现的帧序号）
+        self.scale = 1.0        # 播放速率（负数为倒放）
+        self.step = 1           # 相邻两个帧间隔的帧序号差（整数倍速时为速率  否则为播放方向 ±1）
+        self.hits = 0           # 从本地窗口开始的播放 / 跳转次数
+        self.misses = 0         # 需等待服务端的播放 / 跳转次数
+        self.rejected = 0       # 超出窗口而丢弃的帧数
+
+    def add(self, frame_number, frame, subtitle):
+        """ 写入一帧（超出窗口的帧丢弃）  返回是否写入 """
+        with self.lock:
+            low, high = self.bounds(self.position)
+            if not low <= frame_number <= high:
+                self.rejected += 1
+                return False
+            previous = self.frames.get(frame_number)
+            if previous is not None:
+                self.bytes -= len(previous[0])
+            self.frames[frame_number] = (frame, subtitle)
+            self.bytes += len(frame)
+            return True
+
+    def get(self, frame_number):
+        """ 返回 (帧数据, 字幕)  不在窗口中时返回 None """
+        return self.frames.get(frame_number)
+
+    def bounds(self, position):
+        """ 返回播放位置为 position 时窗口的 (最小帧序号, 最大帧序号) """
+        span = max(1.0, abs(self.scale))
+        ahead, behind = round(self.ahead * span), round(self.behind * span)
+        return (position - behind, position + ahead) if self.scale > 0 else (position - ahead, position + behind)
+
+    def setScale(self, scale):
+        """ 设置播放速率（之后按新的方向与步长判断窗口范围与连续帧） """
+        self.scale = scale
+        step = int(scale) if scale == int(scale) else 1
+        self.step = step if scale > 0 else -abs(step)
+
+    def contiguous(self, frame_number):
+        """ 返回从 frame_number 起按播放方向（步长 step）连续已接收的帧数 """
+        count = 0
+        while frame_number + count * self.step in self.frames:
+            count += 1
+        return count
+
+    def last(self):
+        """ 返回窗口中最大的帧序号  窗口为空时返回 None """
+        with self.lock:
+            return max(self.frames, default=None)
+
+    def seek(self, position, needed):
+        """ 移动播放位置（开始播放 / 恢复 / 跳转）  返回其后连续已接收的帧数（不少于 needed 帧时计为命中） """
+        self.moveTo(position)
+        count = self.contiguous(position + self.step)
+        if count >= needed:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return count
+
+    def moveTo(self, position):
+        """ 移动播放位置  淘汰窗口外的帧 """
+        with self.lock:
+            self.position = position
+            low, high = self.bounds(position)
+            for frame_number in [frame_number for frame_number in self.frames if not low <= frame_number <= high]:
+                self.bytes -= len(self.frames.pop(frame_number)[0])
+
+    def clear(self):
+        """ 清空窗口（关闭会话时调用） """
+        with self.lock:
+            self.frames.clear()
+            self.bytes = 0
+            self.position = 0
+
+    def __len__(self):
+        """ 返回窗口中的帧数 """
+        return len(self.frames)
+
+    def stats(self):
+        """ 返回窗口统计 """
+        return {'frames': len(self.frames), 'bytes': self.bytes, 'ahead': self.contiguous(self.position + self.step),
+                'hits': self.hits, 'misses': self.misses, 'rejected': self.rejected}
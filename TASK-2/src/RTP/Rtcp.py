@@ -0,0 +1,188 @@
+import time
+import struct
+from collections import namedtuple
+
+RTCP_VERSION = 2
+RTCP_SR = 200               # 发送方报告
+RTCP_RR = 201               # 接收方报告
+RTCP_PT_MIN = 192           # RTCP 负载类型范围（RFC 5761：与 RTP 复用同一端口时按第二字节区分）
+RTCP_PT_MAX = 223
+RTCP_RECV_SIZE = 2048
+
+NTP_EPOCH_OFFSET = 2208988800   # 1900-01-01 到 1970-01-01 的秒数
+MAX_DROPOUT = 3000              # 序列号向前跳跃上限（RFC 3550 A.1）
+MAX_MISORDER = 100              # 序列号乱序上限
+
+HEADER_STRUCT = struct.Struct('!BBHI')          # V/P/RC  PT  长度（32 位字 - 1）  SSRC
+SENDER_INFO_STRUCT = struct.Struct('!IIIII')    # NTP 秒  NTP 小数  RTP 时间戳  发送包数  发送字节数
+REPORT_BLOCK_STRUCT = struct.Struct('!IIIIII')  # SSRC  丢包率(8)+累计丢包(24)  扩展最高序列号  抖动  LSR  DLSR
+
+SenderInfo = namedtuple('SenderInfo', 'ntp_seconds ntp_fraction rtp_timestamp packet_count octet_count')
+ReportBlock = namedtuple('ReportBlock', 'ssrc fraction_lost cumulative_lost highest_seq jitter lsr dlsr')
+RtcpReport = namedtuple('RtcpReport', 'kind ssrc sender_info blocks')
+
+
+def isRtcp(data):
+    """ 是否为 RTCP 数据包 """
+    return len(data) >= 8 and data[0] >> 6 == RTCP_VERSION and RTCP_PT_MIN <= data[1] <= RTCP_PT_MAX
+
+
+def ntpTime(now=None):
+    """ 返回 NTP 时间戳 (秒, 小数)（now 为 time.time() 秒数） """
+    if now is None:
+        now = time.time()
+    seconds = int(now)
+    return (seconds + NTP_EPOCH_OFFSET) & 0xFFFFFFFF, int((now - seconds) * 4294967296) & 0xFFFFFFFF
+
+
+def ntpMiddle(now=None):
+    """ 返回 NTP 时间戳中间 32 位（LSR / DLSR / RTT 计算使用  单位 1/65536 秒） """
+    seconds, fraction = ntpTime(now)
+    return ((seconds & 0xFFFF) << 16) | (fraction >> 16)
+
+
+def packReportBlock(block):
+    """ 编码报告块 """
+    lost = max(-0x800000, min(block.cumulative_lost, 0x7FFFFF)) & 0xFFFFFF
+    return REPORT_BLOCK_STRUCT.pack(block.ssrc & 0xFFFFFFFF, (block.fraction_lost & 0xFF) << 24 | lost,
+                                    block.highest_seq & 0xFFFFFFFF, int(block.jitter) & 0xFFFFFFFF,
+                                    block.lsr & 0xFFFFFFFF, block.dlsr & 0xFFFFFFFF)
+
+
+def buildSenderReport(ssrc, rtp_timestamp, packet_count, octet_count, blocks=(), now=None):
+    """ 构造发送方报告（SR） """
+    seconds, fraction = ntpTime(now)
+    body = SENDER_INFO_STRUCT.pack(seconds, fraction, rtp_timestamp & 0xFFFFFFFF,
+                                   packet_count & 0xFFFFFFFF, octet_count & 0xFFFFFFFF)
+    body += b''.join(packReportBlock(block) for block in blocks)
+    return HEADER_STRUCT.pack(RTCP_VERSION << 6 | len(blocks), RTCP_SR, (len(body) + 8) // 4 - 1, ssrc & 0xFFFFFFFF) + body
+
+
+def buildReceiverReport(ssrc, blocks):
+    """ 构造接收方报告（RR） """
+    body = b''.join(packReportBlock(block) for block in blocks)
+    return HEADER_STRUCT.pack(RTCP_VERSION << 6 | len(blocks), RTCP_RR, (len(body) + 8) // 4 - 1, ssrc & 0xFFFFFFFF) + body
+
+
+def parseRtcp(data):
+    """ 分析复合 RTCP 包  返回其中 SR / RR 报告列表（忽略其他类型与不完整的包） """
+    reports = []
+    offset = 0
+    while offset + HEADER_STRUCT.size <= len(data):
+        first, kind, length, ssrc = HEADER_STRUCT.unpack_from(data, offset)
+        end = offset + (length + 1) * 4
+        if first >> 6 != RTCP_VERSION or end > len(data):
+            break
+        if kind in (RTCP_SR, RTCP_RR):
+            position = offset + HEADER_STRUCT.size
+            sender_info = None
+            if kind == RTCP_SR:
+                if position + SENDER_INFO_STRUCT.size > end:
+                    break
+                sender_info = SenderInfo(*SENDER_INFO_STRUCT.unpack_from(data, position))
+                position += SENDER_INFO_STRUCT.size
+            blocks = []
+            for index in range(first & 0x1F):
+                if position + REPORT_BLOCK_STRUCT.size > end:
+                    break
+                source, lost, highest_seq, jitter, lsr, dlsr = REPORT_BLOCK_STRUCT.unpack_from(data, position)
+                cumulative_lost = lost & 0xFFFFFF
+                if cumulative_lost & 0x800000:
+                    cumulative_lost -= 0x1000000
+                blocks.append(ReportBlock(source, lost >> 24, cumulative_lost, highest_seq, jitter, lsr, dlsr))
+                position += REPORT_BLOCK_STRUCT.size
+            reports.append(RtcpReport(kind, ssrc, sender_info, blocks))
+        offset = end
+    return reports
+
+
+class ReceptionStats:
+    """ RTP 接收统计类（RFC 3550 附录 A.1 / A.3 / A.8：扩展最高序列号  累计丢包  到达间隔抖动） """
+
+    def __init__(self, clock_rate):
+        """ 类构造方法 """
+        self.clock_rate = clock_rate    # RTP 时间戳时钟频率
+        self.ssrc = None                # 发送方 SSRC
+        self.base_seq = 0               # 第一个序列号
+        self.max_seq = 0                # 最高序列号（16 位）
+        self.cycles = 0                 # 序列号回绕次数 * 65536
+        self.bad_seq = None             # 大幅跳跃后期待的下一个序列号
+        self.received = 0               # 已接收数据包数
+        self.expected_prior = 0         # 上次报告时的期望数
+        self.received_prior = 0         # 上次报告时的接收数
+        self.transit = None             # 上一个数据包的传输时间（时间戳单位）
+        self.jitter = 0.0               # 到达间隔抖动（时间戳单位）
+        self.last_sr = 0                # 最近 SR 的 NTP 中间 32 位
+        self.last_sr_arrival = 0.0      # 最近 SR 的到达时刻（time.monotonic）
+
+    def reset(self, ssrc, seqnum):
+        """ 从新的发送方 / 序列号重新开始统计 """
+        self.ssrc = ssrc
+        self.base_seq = seqnum
+        self.max_seq = seqnum
+        self.cycles = 0
+        self.bad_seq = None
+        self.received = 0
+        self.expected_prior = 0
+        self.received_prior = 0
+        self.transit = None
+        self.jitter = 0.0
+
+    def update(self, ssrc, seqnum, timestamp, arrival):
+        """ 记录一个到达的 RTP 数据包（arrival 为到达时刻  秒） """
+        if ssrc != self.ssrc:
+            self.reset(ssrc, seqnum)
+        elif self.received:
+            delta = (seqnum - self.max_seq) & 0xFFFF
+            if delta < MAX_DROPOUT:
+                # 正常前进（可能回绕）
+                if seqnum < self.max_seq:
+                    self.cycles += 65536
+                self.max_seq = seqnum
+            elif delta <= 65536 - MAX_MISORDER:
+                # 大幅跳跃：连续两个数据包确认后视为发送方重新开始
+                if seqnum != self.bad_seq:
+                    self.bad_seq = (seqnum + 1) & 0xFFFF
+                    return
+                self.reset(ssrc, seqnum)
+            # 其他情况为重复或乱序数据包  只计数
+        self.received += 1
+        # 到达间隔抖动 J += (|D| - J) / 16
+        transit = (int(arrival * self.clock_rate) - timestamp) & 0xFFFFFFFF
+        if self.transit is not None:
+            difference = (transit - self.transit) & 0xFFFFFFFF
+            if difference & 0x80000000:
+                difference = 0x100000000 - difference
+            self.jitter += (difference - self.jitter) / 16
+        self.transit = transit
+
+    def onSenderReport(self, report, arrival):
+        """ 记录收到的 SR（用于 LSR / DLSR） """
+        if report.sender_info is not None:
+            self.last_sr = ((report.sender_info.ntp_seconds & 0xFFFF) << 16) | (report.sender_info.ntp_fraction >> 16)
+            self.last_sr_arrival = arrival
+
+    def highestSeq(self):
+        """ 返回扩展最高序列号 """
+        return self.cycles + self.max_seq
+
+    def lost(self):
+        """ 返回累计丢包数（重复包可使其为负） """
+        return self.highestSeq() - self.base_seq + 1 - self.received
+
+    def reportBlock(self, now):
+        """ 生成报告块并开始新的报告间隔（now 为 time.monotonic） """
+        expected = self.highestSeq() - self.base_seq + 1
+        expected_interval = expected - self.expected_prior
+        received_interval = self.received - self.received_prior
+        self.expected_prior = expected
+        self.received_prior = self.received
+        lost_interval = expected_interval - received_interval
+        fraction = (lost_interval << 8) // expected_interval if expected_interval > 0 and lost_interval > 0 else 0
+        dlsr = int((now - self.last_sr_arrival) * 65536) if self.last_sr else 0
+        return ReportBlock(self.ssrc or 0, min(fraction, 255), self.lost(), self.highestSeq(), int(self.jitter), self.last_sr, dlsr)
+
+    def stats(self):
+        """ 返回接收统计 """
+        return {'received': self.received, 'lost': self.lost() if self.received else 0, 'highest_seq': self.highestSeq(),
+                'jitter_ms': round(self.jitter * 1000 / self.clock_rate, 3)}
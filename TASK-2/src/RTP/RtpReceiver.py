@@ -0,0 +1,167 @@
+import socket
+import select
+import struct
+import ctypes
+import ctypes.util
+
+
+SO_RXQ_OVFL = getattr(socket, 'SO_RXQ_OVFL', 40)   # Linux 内核丢包计数（随每个数据包以辅助数据返回）
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0x40)
+CONTROL_SIZE = socket.CMSG_SPACE(4)
+CMSG_HEADER = struct.Struct('@Nii')   # cmsghdr: cmsg_len(size_t) cmsg_level(int) cmsg_type(int)
+
+RING_SLOTS = 512                # 接收环槽位数
+RING_SLOT_SIZE = 2048           # 每个槽位字节数（需大于 RTP MTU）
+RECV_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+class iovec(ctypes.Structure):
+    _fields_ = [('iov_base', ctypes.c_void_p), ('iov_len', ctypes.c_size_t)]
+
+
+class msghdr(ctypes.Structure):
+    _fields_ = [('msg_name', ctypes.c_void_p), ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(iovec)), ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p), ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+
+class mmsghdr(ctypes.Structure):
+    _fields_ = [('msg_hdr', msghdr), ('msg_len', ctypes.c_uint)]
+
+
+def loadRecvmmsg():
+    """ 加载 libc recvmmsg  不支持时返回 None """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        recvmmsg = libc.recvmmsg
+    except (OSError, AttributeError):
+        return None
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_void_p]
+    recvmmsg.restype = ctypes.c_int
+    return recvmmsg
+
+
+class RtpReceiver:
+    """ RTP 批量接收类（预分配接收环  recvmmsg / recvmsg_into 批量读取  统计内核丢包） """
+
+    def __init__(self, sock, recv_buffer_size=RECV_BUFFER_SIZE, slots=RING_SLOTS, slot_size=RING_SLOT_SIZE):
+        """ 类构造方法 """
+        self.sock = sock
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ring = bytearray(slots * slot_size)    # 接收环
+        self.view = memoryview(self.ring)
+        self.head = 0                               # 下一个写入槽位
+        if recv_buffer_size:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer_size)
+        self.recv_buffer_size = self.receiveBufferSize()
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+            self.overflow_supported = True
+        except OSError:
+            self.overflow_supported = False
+        self.recvmmsg = loadRecvmmsg()
+        if self.recvmmsg is not None:
+            # 每个槽位固定对应一条消息  调用时从 head 处的消息开始传入
+            ring_address = ctypes.addressof((ctypes.c_char * len(self.ring)).from_buffer(self.ring))
+            self.controls = ctypes.create_string_buffer(slots * CONTROL_SIZE)
+            self.control_address = ctypes.addressof(self.controls)
+            self.control_size = CONTROL_SIZE if self.overflow_supported else 0
+            self.iovecs = (iovec * slots)()
+            self.messages = (mmsghdr * slots)()
+            self.messages_address = ctypes.addressof(self.messages)
+            for index in range(slots):
+                self.iovecs[index].iov_base = ring_address + index * slot_size
+                self.iovecs[index].iov_len = slot_size
+                header = self.messages[index].msg_hdr
+                header.msg_iov = ctypes.pointer(self.iovecs[index])
+                header.msg_iovlen = 1
+                header.msg_control = self.control_address + index * CONTROL_SIZE
+                header.msg_controllen = self.control_size
+        # --- 统计 ---
+        self.packets = 0
+        self.batches = 0
+        self.kernel_drops = 0
+        self.truncated = 0
+
+    def receiveBufferSize(self):
+        """ 返回内核实际分配的接收缓冲区大小 """
+        return self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+
+    def receive(self, timeout=None):
+        """ 等待并批量读取数据包  返回指向接收环的 memoryview 列表（超时返回空列表）
+
+        返回的 memoryview 至少在之后接收 slots/2 个数据包前有效  需要保留的数据应及时复制
+        """
+        readable, writable, errors = select.select([self.sock], [], [], timeout)
+        if not readable:
+            return []
+        if self.head > self.slots // 2:
+            # 剩余槽位不足一半时回到环首  保证单批可用槽位
+            self.head = 0
+        if self.recvmmsg is not None:
+            packets = self.receiveMmsg()
+        else:
+            packets = self.receiveLoop()
+        self.batches += 1
+        self.packets += len(packets)
+        return packets
+
+    def receiveMmsg(self):
+        """ 一次 recvmmsg 读取全部已到达的数据包 """
+        received = self.recvmmsg(self.sock.fileno(), self.messages_address + self.head * ctypes.sizeof(mmsghdr),
+                                 self.slots - self.head, MSG_DONTWAIT, None)
+        if received < 0:
+            errno = ctypes.get_errno()
+            if errno in (11, 4):  # EAGAIN / EINTR
+                return []
+            raise OSError(errno, 'recvmmsg failed')
+        packets = []
+        for slot in range(self.head, self.head + received):
+            header = self.messages[slot].msg_hdr
+            start = slot * self.slot_size
+            if header.msg_controllen:
+                self.parseOverflow(slot)
+            # 内核改写了 msg_controllen（无辅助数据时为 0）与 msg_flags  每个槽位读取后均恢复  否则之后的批次收不到丢包计数
+            flags = header.msg_flags
+            header.msg_controllen = self.control_size
+            header.msg_flags = 0
+            if flags & socket.MSG_TRUNC:
+                self.truncated += 1
+                continue
+            packets.append(self.view[start:start + self.messages[slot].msg_len])
+        self.head += received
+        return packets
+
+    def receiveLoop(self):
+        """ 逐个 recvmsg_into 读取  直到无数据 """
+        packets = []
+        while self.head < self.slots:
+            start = self.head * self.slot_size
+            try:
+                size, ancdata, flags, address = self.sock.recvmsg_into([self.view[start:start + self.slot_size]],
+                                                                       CONTROL_SIZE, MSG_DONTWAIT)
+            except (BlockingIOError, InterruptedError):
+                break
+            self.head += 1
+            for level, kind, data in ancdata:
+                if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL and len(data) >= 4:
+                    self.kernel_drops = struct.unpack('=I', data[:4])[0]
+            if flags & socket.MSG_TRUNC:
+                self.truncated += 1
+                continue
+            packets.append(self.view[start:start + size])
+        return packets
+
+    def parseOverflow(self, slot):
+        """ 解析槽位的 SO_RXQ_OVFL 辅助数据（cmsghdr + u32 累计丢包数） """
+        offset = slot * CONTROL_SIZE
+        length, level, kind = CMSG_HEADER.unpack_from(self.controls, offset)
+        if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL and length >= socket.CMSG_LEN(4):
+            self.kernel_drops = struct.unpack_from('=I', self.controls, offset + socket.CMSG_LEN(0))[0]
+
+    def stats(self):
+        """ 返回接收统计 """
+        return {'packets': self.packets, 'batches': self.batches, 'kernel_drops': self.kernel_drops,
+                'truncated': self.truncated, 'recv_buffer': self.recv_buffer_size}
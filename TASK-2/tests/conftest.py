@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 被测模块为 src/RTP 目录下的平铺模块（按模块名导入  不依赖 PyQt5 的模块可直接测试）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src', 'RTP'))
@@ -0,0 +1,106 @@
+from FrameAssembler import FrameAssembler
+
+
+class FakePacket:
+    """ 测试用 RTP 数据包（只提供 FrameAssembler 用到的字段） """
+
+    def __init__(self, frame_number, seqnum, payload, marker=1, size=None):
+        """ 类构造方法 """
+        self.frame_number = frame_number
+        self.seq = seqnum
+        self.payload = payload
+        self.mark = marker
+        self.frame_size = len(payload) if size is None else size
+
+    def frame(self):
+        return self.frame_number
+
+    def seqnum(self):
+        return self.seq
+
+    def get_payload(self):
+        return self.payload
+
+    def marker(self):
+        return self.mark
+
+    def size(self):
+        return self.frame_size
+
+
+def fragments(frame_number, data, seqnum, chunk_size=4):
+    """ 将一帧切分为数据包（序列号连续  最后一片置 marker 并携带帧总长度） """
+    chunks = [data[offset:offset + chunk_size] for offset in range(0, len(data), chunk_size)]
+    return [FakePacket(frame_number, (seqnum + index) & 0xFFFF, chunk, int(index == len(chunks) - 1), len(data))
+            for index, chunk in enumerate(chunks)]
+
+
+def feedFrames(assembler, frame_numbers):
+    """ 依次输入各帧的单片数据包  返回各帧是否组装完成 """
+    return [assembler.feed(FakePacket(frame_number, index, b'%d' % frame_number)) is not None
+            for index, frame_number in enumerate(frame_numbers)]
+
+
+def test_forward_frames():
+    """ 正放：帧序号递增的帧全部完成  回退的帧计为迟到 """
+    assembler = FrameAssembler()
+    assert feedFrames(assembler, [46, 47, 48, 45, 49]) == [True, True, True, False, True]
+    assert assembler.late == 1 and assembler.last_frame == 49
+
+
+def test_reverse_frames():
+    """ 倒放：帧序号递减的帧全部完成（回归：曾只完成第一帧） """
+    assembler = FrameAssembler()
+    assembler.reset(-1)
+    assert feedFrames(assembler, [50, 49, 48, 47, 46]) == [True] * 5
+    assert assembler.late == 0 and assembler.last_frame == 46
+
+
+def test_reverse_late_and_drop():
+    """ 倒放：帧序号大于最近完成帧的帧为迟到  完成帧之前（序号更大）的不完整帧被丢弃 """
+    assembler = FrameAssembler()
+    assembler.reset(-4)
+    assembler.reset(-1)
+    assembler.feed(fragments(90, b'incomplete', 0)[0])
+    assert assembler.feed(FakePacket(80, 10, b'done')) == b'done'
+    assert assembler.dropped == 1 and not assembler.pending
+    assert assembler.feed(FakePacket(84, 11, b'late')) is None
+    assert assembler.late == 1
+
+
+def test_reset_switches_direction():
+    """ 改变播放方向时 reset 清除最近完成帧  新方向的第一帧不计为迟到 """
+    assembler = FrameAssembler()
+    feedFrames(assembler, [10, 11, 12])
+    assembler.reset(-1)
+    assert assembler.feed(FakePacket(11, 20, b'x')) == b'x'
+    assembler.reset(1)
+    assert assembler.feed(FakePacket(5, 21, b'y')) == b'y'
+    assert assembler.late == 0
+
+
+def test_fragments_reordered_across_seq_wrap():
+    """ 乱序到达的分片按序列号（16 位回绕）拼接 """
+    data = b'abcdefghijklmnopqrstuvwxyz'
+    packets = fragments(7, data, 0xFFFE)
+    assembler = FrameAssembler()
+    results = [assembler.feed(packet) for packet in reversed(packets)]
+    assert results[-1] == data and results[:-1] == [None] * (len(packets) - 1)
+
+
+def test_duplicate_fragment():
+    """ 重复分片只计数不重复计入长度 """
+    packets = fragments(3, b'0123456789', 100)
+    assembler = FrameAssembler()
+    assembler.feed(packets[0])
+    assert assembler.feed(packets[0]) is None
+    assert [assembler.feed(packet) for packet in packets[1:]][-1] == b'0123456789'
+    assert assembler.duplicates == 1
+
+
+def test_max_pending():
+    """ 组装中的帧超过上限时丢弃最早的帧 """
+    assembler = FrameAssembler(max_pending=2)
+    for frame_number in (1, 2, 3):
+        assembler.feed(fragments(frame_number, b'12345678', frame_number * 10)[0])
+    assert list(assembler.pending) == [2, 3] and assembler.dropped == 1
@@ -0,0 +1,92 @@
+from JitterBuffer import JitterBuffer
+
+CLOCK_RATE = 90000
+FRAME = 9000    # 10 fps 的帧间隔（RTP 时钟单位）
+
+
+def test_due_time():
+    """ 第一帧到达时建立播放时钟：到期时刻 = 到达时刻 + 延迟 + 时间戳差 / 时钟频率 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.2)
+    buffer.push(1000, 'a', now=10.0)
+    buffer.push(1000 + FRAME, 'b', now=10.05)
+    assert buffer.pop(10.19) is None
+    assert buffer.pop(10.2) == 'a'
+    assert buffer.pop(10.29) is None
+    assert buffer.pop(10.3) == 'b'
+    assert buffer.presented == 2
+
+
+def test_reorders_by_timestamp():
+    """ 乱序写入的帧按时间戳顺序取出 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.0)
+    for index in (0, 2, 1, 3):
+        buffer.push(index * FRAME, index, now=0.0)
+    assert [buffer.pop(index * 0.1) for index in range(4)] == [0, 1, 2, 3]
+    assert buffer.late == 0
+
+
+def test_pop_skips_to_latest_due():
+    """ 多帧同时到期时取出最新一帧  被跳过的帧计为迟到 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.0)
+    for index in range(4):
+        buffer.push(index * FRAME, index, now=0.0)
+    assert buffer.pop(0.25) == 2
+    assert buffer.late == 2 and len(buffer) == 1
+
+
+def test_late_push():
+    """ 时间戳不晚于已呈现帧的帧写入时计为迟到 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.0)
+    buffer.push(2 * FRAME, 'b', now=0.0)
+    buffer.pop(0.0)
+    assert not buffer.push(FRAME, 'a', now=0.0)
+    assert buffer.late == 1 and len(buffer) == 0
+
+
+def test_ready_predicate():
+    """ 未就绪（仍在解码）的到期帧留在缓冲中  就绪后取出 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.0)
+    buffer.push(0, {'done': False}, now=0.0)
+    assert buffer.pop(1.0, lambda item: item['done']) is None
+    buffer.items[0]['done'] = True
+    assert buffer.pop(1.0, lambda item: item['done']) == {'done': True}
+
+
+def test_capacity():
+    """ 超出容量时丢弃最早的帧 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=1.0, capacity=3)
+    for index in range(5):
+        buffer.push(index * FRAME, index, now=0.0)
+    assert len(buffer) == 3 and buffer.dropped == 2
+    assert buffer.items == [2, 3, 4] and buffer.max_depth == 3
+
+
+def test_timestamp_wrap():
+    """ 32 位时间戳回绕后按扩展时间戳继续排序 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.0)
+    buffer.push(0xFFFFFFFF - FRAME + 1, 'before', now=0.0)
+    buffer.push(0, 'after', now=0.0)
+    assert buffer.pop(0.0) == 'before'
+    assert buffer.pop(0.1) == 'after'
+    assert buffer.late == 0
+
+
+def test_reverse_presentation_times():
+    """ 倒放时客户端以负的呈现时刻写入（帧序号 / 负速率）  帧序号递减的帧按顺序取出 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.0)
+    for frame_number in (50, 49, 48):
+        buffer.push(round(frame_number * CLOCK_RATE / (10 * -1.0)), frame_number, now=0.0)
+    assert [buffer.pop(index * 0.1) for index in range(3)] == [50, 49, 48]
+
+
+def test_reset():
+    """ reset 清空缓冲并以指定延迟重建播放时钟 """
+    buffer = JitterBuffer(CLOCK_RATE, delay=0.2)
+    buffer.push(0, 'a', now=0.0)
+    buffer.pop(0.2)
+    buffer.reset(0)
+    assert len(buffer) == 0
+    assert buffer.push(0, 'b', now=5.0)
+    assert buffer.pop(5.0) == 'b'
+    buffer.reset()
+    assert buffer.start_delay == 0.2